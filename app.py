@@ -27,39 +27,42 @@
 
 # print(image_documents)
 
-from llama_cloud_services import LlamaParse
 from dotenv import load_dotenv
 import os
 
+from figure_store import FigureStore, openai_captioner, write_figure_markdown
+from pdf_parsing import PDFPageParser, write_markdown
+
 load_dotenv()
 LLAMA_CLOUD_API_KEY = os.getenv("LLAMACLOUD_API_KEY")
 
-parser = LlamaParse(
-    api_key=LLAMA_CLOUD_API_KEY,
-    parse_mode="parse_page_with_agent",
-    result_type="markdown",
-    verbose=True,
+# One file and one caption per distinct figure, kept across runs; repeated logos and headers are never captioned
+figures = FigureStore(
+    db_file="./figure_cache.db",
+    image_dir="./images",
+    captioner=openai_captioner() if os.getenv("OPENAI_API_KEY") else None,
 )
 
-result = parser.parse("DARPA XAI Program Update_removed.pdf")
-
-# Save the whole document as a markdown file
-markdown_documents = result.get_markdown_documents(split_by_page=False)
-with open("whole_document.md", "w", encoding="utf-8") as f:
-    for doc in markdown_documents:
-        f.write(doc.text)
-
-
-# Save images and their generated text in a second markdown file
-image_documents = result.get_image_documents(
+# Pages are parsed in parallel ranges and cached per (file hash, page, parse_mode);
+# without an API key the parser falls back to local pypdf text extraction
+parser = PDFPageParser(
+    api_key=LLAMA_CLOUD_API_KEY,
+    parse_mode="parse_page_with_agent",
+    image_download_dir="./images",
     include_screenshot_images=True,
     include_object_images=True,
-    image_download_dir="./images"
+    figure_store=figures,
 )
 
-with open("images_with_text.md", "w", encoding="utf-8") as f:
-    for img_doc in image_documents:
-        f.write(f"![Image]((img_doc.image_path))\n\n")
-        f.write(f"{img_doc.text}\n\n")
+# Guarded so worker processes spawned for local parsing don't re-run the script
+if __name__ == "__main__":
+    pages = parser.parse("DARPA XAI Program Update_removed.pdf")
+
+    # Save the whole document as a markdown file
+    write_markdown(pages, "whole_document.md")
 
 
+    # Save each distinct figure once, with its pages and caption, in a second markdown file
+    report = figures.process(pages)
+    figures.print_summary(report)
+    write_figure_markdown(report.figures, "images_with_text.md")
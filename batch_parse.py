@@ -0,0 +1,178 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+from pydantic import BaseModel
+
+from figure_store import FigureStore, openai_captioner, write_figure_markdown
+from pdf_parsing import PDFPageParser, write_markdown
+
+# Written last, so its presence means the other outputs are complete
+PARSE_INFO_FILE = "parse_info.json"
+
+class ParseJobResult(BaseModel):
+    """Outcome of parsing one PDF in a batch"""
+    pdf_path: str
+    output_dir: str
+    status: str  # "parsed", "skipped" or "failed"
+    pages: int = 0
+    images: int = 0
+    figures: int = 0
+    captions_generated: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+def find_pdfs(inputs: List[str]) -> List[Path]:
+    """Expand directories (recursively) and glob patterns into a sorted, de-duplicated list of PDFs"""
+
+    pdfs = set()
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            pdfs.update(p.resolve() for p in path.rglob("*") if p.suffix.lower() == ".pdf")
+        else:
+            pdfs.update(Path(p).resolve() for p in glob.glob(item, recursive=True) if p.lower().endswith(".pdf"))
+    return sorted(pdfs)
+
+def output_dir_for(pdf_path: Path, output_root: str) -> Path:
+    """Give every PDF its own folder; the path hash keeps same-named files apart"""
+
+    path_hash = hashlib.sha256(str(pdf_path).encode("utf-8")).hexdigest()[:8]
+    safe_stem = "".join(c for c in pdf_path.stem if c.isalnum() or c in (' ', '-', '_')).strip().replace(' ', '_')
+    return Path(output_root) / f"{safe_stem}_{path_hash}"
+
+def is_up_to_date(pdf_path: Path, output_dir: Path, parse_mode: str) -> bool:
+    """Check the recorded source size/mtime and parse mode without re-reading the PDF"""
+
+    info_file = output_dir / PARSE_INFO_FILE
+    if not info_file.exists():
+        return False
+    with open(info_file, 'r', encoding='utf-8') as f:
+        info = json.load(f)
+    stat = pdf_path.stat()
+    return (info.get("source_size") == stat.st_size
+            and info.get("source_mtime") == stat.st_mtime
+            and info.get("requested_parse_mode") == parse_mode)
+
+def parse_one_pdf(pdf_path: str, output_dir: str, parse_mode: str, api_key: Optional[str],
+                  cache_db_file: str, figure_db_file: str = "./figure_cache.db") -> ParseJobResult:
+    """Parse a single PDF into its own output folder (runs in a worker process)"""
+
+    start = time.perf_counter()
+    out = Path(output_dir)
+    try:
+        out.mkdir(parents=True, exist_ok=True)
+        # One shared folder of distinct figures, so a logo or chart reused across documents is stored once
+        figures = FigureStore(
+            db_file=figure_db_file,
+            image_dir=str(out.parent / "figures"),
+            captioner=openai_captioner() if os.getenv("OPENAI_API_KEY") else None,
+        )
+        # Files are already spread across processes, so parse each one's pages inline
+        parser = PDFPageParser(
+            parse_mode=parse_mode,
+            api_key=api_key,
+            cache_db_file=cache_db_file,
+            image_download_dir=str(out / "images"),
+            use_process_pool=False,
+            figure_store=figures,
+        )
+        pages = parser.parse(pdf_path)
+        report = figures.process(pages)
+
+        write_markdown(pages, str(out / "whole_document.md"))
+        write_figure_markdown(report.figures, str(out / "images_with_text.md"))
+
+        stat = Path(pdf_path).stat()
+        with open(out / PARSE_INFO_FILE, 'w', encoding='utf-8') as f:
+            json.dump({
+                "source": pdf_path,
+                "source_size": stat.st_size,
+                "source_mtime": stat.st_mtime,
+                "requested_parse_mode": parse_mode,
+                "parse_modes": sorted({page.parse_mode for page in pages}),
+                "pages": len(pages),
+                "figures": report.model_dump(exclude={"figures"}),
+                "parsed_at": datetime.now().isoformat(),
+            }, f, indent=2)
+
+        return ParseJobResult(pdf_path=pdf_path, output_dir=output_dir, status="parsed",
+                              pages=len(pages), images=report.images, figures=len(report.figures),
+                              captions_generated=report.captions_generated, seconds=time.perf_counter() - start)
+    except Exception as e:
+        return ParseJobResult(pdf_path=pdf_path, output_dir=output_dir, status="failed",
+                              seconds=time.perf_counter() - start, error=str(e))
+
+def run_batch_parse(inputs: List[str], output_root: str = "./parsed_documents", workers: Optional[int] = None,
+                    parse_mode: str = "parse_page_with_agent", api_key: Optional[str] = None,
+                    cache_db_file: str = "./parsed_pages.db", force: bool = False,
+                    figure_db_file: str = "./figure_cache.db") -> List[ParseJobResult]:
+    """Parse every PDF under `inputs` with a process pool, skipping ones whose outputs are current"""
+
+    results: List[ParseJobResult] = []
+    jobs = []
+    for pdf_path in find_pdfs(inputs):
+        out = output_dir_for(pdf_path, output_root)
+        if not force and is_up_to_date(pdf_path, out, parse_mode):
+            results.append(ParseJobResult(pdf_path=str(pdf_path), output_dir=str(out), status="skipped"))
+        else:
+            jobs.append((str(pdf_path), str(out)))
+
+    print(f"📚 {len(jobs) + len(results)} PDFs found, {len(results)} up to date, {len(jobs)} to parse")
+    if not jobs:
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [
+            pool.submit(parse_one_pdf, pdf_path, out, parse_mode, api_key, cache_db_file, figure_db_file)
+            for pdf_path, out in jobs
+        ]
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            status = "✅" if result.status == "parsed" else "❌"
+            detail = f"{result.pages} pages, {result.images} images -> {result.figures} figures" \
+                if result.status == "parsed" else result.error
+            print(f"{status} [{done}/{len(jobs)}] {Path(result.pdf_path).name} ({result.seconds:.1f}s, {detail})")
+            results.append(result)
+
+    return results
+
+def print_parse_report(results: List[ParseJobResult], total_seconds: float) -> None:
+    parsed = [r for r in results if r.status == "parsed"]
+    skipped = sum(1 for r in results if r.status == "skipped")
+    failed = sum(1 for r in results if r.status == "failed")
+    pages = sum(r.pages for r in parsed)
+    print(f"\n{'='*80}")
+    print(f"📊 {len(parsed)} parsed, {skipped} skipped, {failed} failed in {total_seconds:.1f}s "
+          f"({len(parsed) / total_seconds if total_seconds else 0:.2f} files/sec, {pages} pages)")
+    if parsed:
+        images = sum(r.images for r in parsed)
+        captions = sum(r.captions_generated for r in parsed)
+        print(f"🖼️  {images} images -> {sum(r.figures for r in parsed)} figures; "
+              f"{captions} captions generated, {images - captions} images not captioned again")
+    print(f"{'='*80}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse many PDFs in parallel, one output folder per document")
+    parser.add_argument("inputs", nargs="+", help="PDF files, directories or glob patterns (e.g. 'papers/**/*.pdf')")
+    parser.add_argument("--output-dir", default="./parsed_documents", help="Root folder for per-document outputs")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: number of cores)")
+    parser.add_argument("--parse-mode", default="parse_page_with_agent", help="LlamaParse mode, or 'local' for pypdf text only")
+    parser.add_argument("--cache-db", default="./parsed_pages.db", help="Shared per-page parse cache")
+    parser.add_argument("--figure-db", default="./figure_cache.db", help="Shared figure hashes and captions")
+    parser.add_argument("--force", action="store_true", help="Re-process files even if outputs are up to date")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    start = time.perf_counter()
+    results = run_batch_parse(args.inputs, args.output_dir, args.workers, args.parse_mode,
+                              os.getenv("LLAMACLOUD_API_KEY"), args.cache_db, args.force, args.figure_db)
+    print_parse_report(results, time.perf_counter() - start)
@@ -0,0 +1,158 @@
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import List, Optional
+from uuid import uuid4
+from pydantic import BaseModel, Field
+
+from router import AdvancedResearchPipelineAgent
+
+class TopicRequest(BaseModel):
+    """A single topic to research in a batch run"""
+    topic: str
+    focus_areas: List[str] = Field(default_factory=list)
+
+class BatchResult(BaseModel):
+    """Outcome and timing of one topic in a batch run"""
+    topic: str
+    success: bool
+    duration_seconds: float
+    filepath: Optional[str] = None
+    error: Optional[str] = None
+
+def load_topics(topics_file: str) -> List[TopicRequest]:
+    """Load topics from a JSON list or a JSONL file of {"topic", "focus_areas"} objects"""
+
+    text = Path(topics_file).read_text(encoding="utf-8").strip()
+    if not text:
+        return []
+
+    if text.startswith("["):
+        records = json.loads(text)
+    else:
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    return [TopicRequest(**record) for record in records]
+
+async def run_topic(pipeline: AdvancedResearchPipelineAgent, request: TopicRequest,
+                    output_dir: str = "./generated_papers", parallel_sections: bool = False,
+                    collect_only: bool = False, session_id: Optional[str] = None) -> BatchResult:
+    """Generate and save one topic's paper (or only its research bundle), reporting failure instead of raising"""
+
+    print(f"🎯 Starting: {request.topic}")
+    start = time.perf_counter()
+    # Each topic gets its own session so concurrent runs don't share history
+    session_id = session_id or f"batch-{uuid4()}"
+    try:
+        if collect_only:
+            with pipeline.metrics.trace(request.topic, "collect"):
+                await pipeline.collect_research(request.topic, request.focus_areas, session_id=session_id)
+            result = BatchResult(
+                topic=request.topic,
+                success=True,
+                duration_seconds=time.perf_counter() - start,
+                filepath=str(pipeline.bundle_store.path_for(request.topic, request.focus_areas))
+            )
+            print(f"✅ Collected: {request.topic} ({result.duration_seconds:.1f}s)")
+            return result
+        if parallel_sections:
+            paper_content = await pipeline.generate_research_paper_parallel(
+                request.topic, request.focus_areas, session_id=session_id
+            )
+        else:
+            paper_content = await pipeline.generate_research_paper(
+                request.topic, request.focus_areas, session_id=session_id
+            )
+        filepath = pipeline.save_paper(paper_content, request.topic, output_dir)
+        result = BatchResult(
+            topic=request.topic,
+            success=True,
+            duration_seconds=time.perf_counter() - start,
+            filepath=filepath
+        )
+        print(f"✅ Finished: {request.topic} ({result.duration_seconds:.1f}s)")
+    except Exception as e:
+        result = BatchResult(
+            topic=request.topic,
+            success=False,
+            duration_seconds=time.perf_counter() - start,
+            error=str(e)
+        )
+        print(f"❌ Error generating paper for '{request.topic}': {str(e)}")
+    return result
+
+async def run_batch(pipeline: AdvancedResearchPipelineAgent, topics: List[TopicRequest],
+                    concurrency: int = 4, output_dir: str = "./generated_papers",
+                    parallel_sections: bool = False, collect_only: bool = False) -> List[BatchResult]:
+    """Generate papers for all topics concurrently, saving each one as soon as it finishes
+
+    With collect_only, only the research phase runs and each topic's research bundle is saved instead.
+    """
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(request: TopicRequest) -> BatchResult:
+        async with semaphore:
+            return await run_topic(pipeline, request, output_dir, parallel_sections, collect_only)
+
+    return await asyncio.gather(*(run_one(request) for request in topics))
+
+def print_batch_report(results: List[BatchResult], total_seconds: float) -> None:
+    """Print per-topic status and timing for a finished batch"""
+
+    succeeded = sum(1 for r in results if r.success)
+    print(f"\n{'='*80}")
+    print(f"📊 BATCH REPORT: {succeeded}/{len(results)} succeeded in {total_seconds:.1f}s")
+    print(f"{'='*80}")
+    for r in results:
+        status = "✅" if r.success else "❌"
+        detail = r.filepath if r.success else r.error
+        print(f"{status} {r.duration_seconds:7.1f}s  {r.topic}  →  {detail}")
+
+async def main(topics_file: str, concurrency: int = 4, output_dir: str = "./generated_papers",
+               parallel_sections: bool = False, report_file: Optional[str] = None,
+               metrics_file: Optional[str] = None, prometheus_file: Optional[str] = None,
+               collect_only: bool = False) -> List[BatchResult]:
+    """Run a batch of topics through one shared pipeline"""
+
+    topics = load_topics(topics_file)
+    print(f"🚀 Running {len(topics)} topics with concurrency {concurrency}")
+
+    # One pipeline shares its tools and database handles across all topics
+    pipeline = AdvancedResearchPipelineAgent(metrics_file=metrics_file)
+
+    start = time.perf_counter()
+    results = await run_batch(pipeline, topics, concurrency, output_dir, parallel_sections, collect_only)
+    print_batch_report(results, time.perf_counter() - start)
+
+    if report_file:
+        with open(report_file, 'w', encoding='utf-8') as f:
+            for r in results:
+                f.write(r.model_dump_json() + "\n")
+        print(f"📄 Report saved to: {report_file}")
+
+    pipeline.metrics.print_summary()
+    pipeline.print_model_report(papers=sum(1 for r in results if r.success) or None)
+    if prometheus_file:
+        pipeline.metrics.write_prometheus(prometheus_file)
+        print(f"📈 Metrics snapshot saved to: {prometheus_file}")
+
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate research papers for many topics concurrently")
+    parser.add_argument("topics_file", help="JSON list or JSONL file of {\"topic\", \"focus_areas\"} objects")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum papers generated at once")
+    parser.add_argument("--output-dir", default="./generated_papers", help="Directory for generated papers")
+    parser.add_argument("--parallel-sections", action="store_true", help="Write each paper's sections concurrently")
+    parser.add_argument("--collect-only", action="store_true",
+                        help="Only research each topic and save its research bundle for writing later")
+    parser.add_argument("--report", help="Optional JSONL file for per-topic results")
+    parser.add_argument("--metrics-file", help="Optional JSONL file for per-stage metric events")
+    parser.add_argument("--prometheus-file", help="Optional Prometheus text snapshot written at the end")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.topics_file, args.concurrency, args.output_dir, args.parallel_sections, args.report,
+                     args.metrics_file, args.prometheus_file, args.collect_only))
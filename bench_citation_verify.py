@@ -0,0 +1,172 @@
+import argparse
+import json
+import random
+import time
+from typing import Dict, List, Tuple
+
+from pydantic import BaseModel
+
+from citation_verifier import CitationVerifier, PassageIndex, cited_sentences
+from context_budget import STOPWORDS, WORD_PATTERN
+from research_bundle import BundleSource
+
+# What the verifier should say about each kind of synthetic sentence
+EXPECTED_STATUS = {
+    "quoted": "supported",            # a span copied from a passage of the cited source
+    "paraphrased": "supported",       # the same span reordered, with a fifth of its words swapped
+    "wrong_source": "unsupported",    # copied from a passage of a different source than the one cited
+    "unsupported": "unsupported",     # words from the corpus that no passage puts together
+    "not_retrieved": "not_retrieved",  # cites an author that no retrieved source has
+}
+
+class CitationBenchResult(BaseModel):
+    sources: int
+    passages: int
+    sentences: int
+    citations: int
+    index_seconds: float
+    parse_seconds: float
+    check_seconds: float
+    sentences_per_second: float
+    baseline_seconds_estimate: float
+    accuracy: Dict[str, float]
+
+def _word(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(length))
+
+def build_corpus(rng: random.Random, sources: int, passages_per_source: int, passage_words: int,
+                 vocabulary: int) -> Tuple[List[BundleSource], List[str]]:
+    """Sources with Zipf-distributed prose, so common words are in most passages like in real text"""
+
+    words = list({_word(rng, rng.randint(4, 10)) for _ in range(vocabulary)})
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    fillers = sorted(STOPWORDS)
+    surnames = list({_word(rng, rng.randint(4, 8)).capitalize() for _ in range(max(sources * 3 // 4, 1))})
+
+    corpus = []
+    for _ in range(sources):
+        passages = []
+        for _ in range(passages_per_source):
+            text = rng.choices(words, weights, k=passage_words)
+            for i in range(0, len(text), 4):
+                text[i] = rng.choice(fillers)
+            passages.append(" ".join(text).capitalize() + ".")
+        corpus.append(BundleSource(title=" ".join(rng.choices(words[:2000], k=6)).capitalize(),
+                                   authors=f"{_word(rng, 5).capitalize()} {rng.choice(surnames)}, "
+                                           f"{_word(rng, 5).capitalize()} {rng.choice(surnames)}",
+                                   year=rng.randint(2010, 2024), passages=passages))
+    return corpus, words
+
+def build_sentences(rng: random.Random, corpus: List[BundleSource], words: List[str],
+                    count: int) -> List[Tuple[str, str]]:
+    """(kind, sentence with its citation) pairs, an equal share of each kind"""
+
+    def cite(source: BundleSource) -> str:
+        surname = source.authors.split(",")[0].split()[-1]
+        return f"({surname} et al., {source.year})"
+
+    def span(source: BundleSource) -> List[str]:
+        tokens = WORD_PATTERN.findall(rng.choice(source.passages).lower())
+        start = rng.randint(0, max(len(tokens) - 25, 0))
+        return tokens[start:start + rng.randint(15, 25)]
+
+    sentences = []
+    kinds = list(EXPECTED_STATUS)
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        source = rng.choice(corpus)
+        if kind == "quoted":
+            tokens = span(source)
+        elif kind == "paraphrased":
+            tokens = span(source)
+            for _ in range(len(tokens) // 5):
+                tokens[rng.randrange(len(tokens))] = rng.choice(words)
+            cut = rng.randrange(len(tokens))
+            tokens = tokens[cut:] + tokens[:cut]
+        elif kind == "wrong_source":
+            tokens = span(rng.choice([other for other in rng.sample(corpus, 2) if other is not source]))
+        else:
+            tokens = rng.choices(words, k=rng.randint(15, 25))
+        citation = f"(Nobodyknows et al., {source.year})" if kind == "not_retrieved" else cite(source)
+        sentences.append((kind, f"{' '.join(tokens).capitalize()} {citation}."))
+    return sentences
+
+def naive_seconds(corpus: List[BundleSource], claims: List[str], sample: int = 20) -> float:
+    """Per-sentence Python loop over every passage (word-set overlap), extrapolated from a sample"""
+
+    passages = [set(WORD_PATTERN.findall(p.lower())) - STOPWORDS for source in corpus for p in source.passages]
+    start = time.perf_counter()
+    for claim in claims[:sample]:
+        terms = set(WORD_PATTERN.findall(claim.lower())) - STOPWORDS
+        max(len(terms & passage) / max(len(terms), 1) for passage in passages)
+    return (time.perf_counter() - start) / min(sample, len(claims)) * len(claims)
+
+def benchmark(sources: int, passages_per_source: int, passage_words: int, sentences: int, vocabulary: int,
+              seed: int = 7) -> CitationBenchResult:
+    rng = random.Random(seed)
+    print(f"🧪 Building {sources} sources x {passages_per_source} passages and {sentences} cited sentences")
+    corpus, words = build_corpus(rng, sources, passages_per_source, passage_words, vocabulary)
+    labelled = build_sentences(rng, corpus, words, sentences)
+
+    start = time.perf_counter()
+    index = PassageIndex(corpus)
+    index_seconds = time.perf_counter() - start
+
+    # Paragraphs of 25 sentences, parsed the same way as a paper's sections
+    start = time.perf_counter()
+    parsed = []
+    for i in range(0, len(labelled), 25):
+        parsed.extend(cited_sentences(" ".join(sentence for _, sentence in labelled[i:i + 25]), "bench"))
+    parse_seconds = time.perf_counter() - start
+    if len(parsed) != len(labelled):
+        raise ValueError(f"Parsed {len(parsed)} cited sentences out of {len(labelled)}")
+
+    start = time.perf_counter()
+    checks = CitationVerifier(report_dir=None).check_sentences(parsed, index)
+    check_seconds = time.perf_counter() - start
+
+    hits: Dict[str, List[bool]] = {kind: [] for kind in EXPECTED_STATUS}
+    for (kind, _), check in zip(labelled, checks):
+        hits[kind].append(check.status == EXPECTED_STATUS[kind])
+    return CitationBenchResult(
+        sources=len(corpus),
+        passages=index.size,
+        sentences=len(parsed),
+        citations=len(checks),
+        index_seconds=round(index_seconds, 3),
+        parse_seconds=round(parse_seconds, 3),
+        check_seconds=round(check_seconds, 3),
+        sentences_per_second=round(len(parsed) / check_seconds, 1),
+        baseline_seconds_estimate=round(naive_seconds(corpus, [s.claim for s in parsed]), 1),
+        accuracy={kind: round(sum(values) / len(values), 3) for kind, values in hits.items() if values}
+    )
+
+def print_result(result: CitationBenchResult) -> None:
+    total = result.index_seconds + result.parse_seconds + result.check_seconds
+    print(f"\n📚 {result.sentences} cited sentences vs {result.passages} passages from {result.sources} sources")
+    print(f"{'index build':<22}{result.index_seconds:>8.2f}s")
+    print(f"{'sentence parsing':<22}{result.parse_seconds:>8.2f}s")
+    print(f"{'scoring':<22}{result.check_seconds:>8.2f}s  ({result.sentences_per_second:.0f} sentences/s)")
+    print(f"{'total':<22}{total:>8.2f}s  (per-sentence Python loop: ~{result.baseline_seconds_estimate:.0f}s)")
+    print(f"\n{'sentence kind':<16}{'expected':<16}{'correct':>8}")
+    for kind, accuracy in result.accuracy.items():
+        print(f"{kind:<16}{EXPECTED_STATUS[kind]:<16}{accuracy:>8.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Citation verification speed and accuracy on a synthetic corpus")
+    parser.add_argument("--sources", type=int, default=2000, help="Retrieved sources")
+    parser.add_argument("--passages-per-source", type=int, default=10, help="Passages per source")
+    parser.add_argument("--passage-words", type=int, default=80, help="Words per passage")
+    parser.add_argument("--sentences", type=int, default=3000, help="Cited sentences to verify")
+    parser.add_argument("--vocabulary", type=int, default=30000, help="Distinct words in the corpus")
+    parser.add_argument("--json", help="Also write the result to this JSON file")
+    args = parser.parse_args()
+
+    bench_result = benchmark(args.sources, args.passages_per_source, args.passage_words, args.sentences,
+                             args.vocabulary)
+    print_result(bench_result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(bench_result.model_dump(), f, indent=2)
+        print(f"📄 Results written to {args.json}")
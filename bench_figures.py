@@ -0,0 +1,193 @@
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple, TYPE_CHECKING
+
+from pydantic import BaseModel
+
+from figure_store import FigureStore
+from pdf_parsing import ParsedImage, ParsedPage
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+class FigureBenchResult(BaseModel):
+    run: str
+    images: int
+    image_bytes: int
+    figures: int
+    caption_calls: int
+    caption_calls_without_dedup: int
+    bytes_kept: int
+    seconds: float
+    false_merges: int
+    missed_duplicates: int
+
+def _chart(rng: random.Random, size: Tuple[int, int]) -> "Image.Image":
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    width, height = size
+    if rng.random() < 0.5:
+        bars = rng.randint(4, 10)
+        for i in range(bars):
+            top = rng.randint(height // 8, height - 40)
+            left = 40 + i * (width - 80) // bars
+            draw.rectangle([left, top, left + (width - 80) // bars - 8, height - 30],
+                           fill=tuple(rng.randint(0, 200) for _ in range(3)))
+    else:
+        for _ in range(rng.randint(1, 3)):
+            points = [(40 + i * (width - 80) // 11, rng.randint(30, height - 30)) for i in range(12)]
+            draw.line(points, fill=tuple(rng.randint(0, 200) for _ in range(3)), width=4)
+    draw.line([(40, height - 30), (width - 40, height - 30)], fill="black", width=2)
+    draw.line([(40, 20), (40, height - 30)], fill="black", width=2)
+    return image
+
+def _slide(rng: random.Random, header: "Image.Image", title: int, bullets: int,
+           chart: "Image.Image" = None) -> "Image.Image":
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGB", (1280, 720), "white")
+    image.paste(header, (0, 0))
+    draw = ImageDraw.Draw(image)
+    title_rng = random.Random(title)
+    draw.rectangle([60, 100, 60 + title_rng.randint(300, 900), 140], fill=(30, 30, 90))
+    for i in range(bullets):
+        draw.rectangle([80, 180 + i * 60, 80 + title_rng.randint(200, 560), 200 + i * 60], fill=(90, 90, 90))
+    if chart is not None:
+        image.paste(chart.resize((480, 300)), (720, 300))
+    return image
+
+def _save(image: "Image.Image", path: Path, rng: random.Random, reencode: bool) -> None:
+    # Repeated figures come back re-encoded or rescaled, as they do when a deck embeds the same chart twice
+    if reencode and rng.random() < 0.5:
+        scale = rng.uniform(0.8, 0.95)
+        image = image.resize((int(image.width * scale), int(image.height * scale)))
+    if reencode and rng.random() < 0.7:
+        image.save(path.with_suffix(".jpg"), quality=rng.randint(70, 92))
+        path.with_suffix(".jpg").rename(path)
+    else:
+        image.save(path, format="PNG")
+
+def build_deck(rng: random.Random, image_dir: Path, slides: int, charts: int,
+               build_steps: int) -> Tuple[List[ParsedPage], Dict[str, str]]:
+    """Pages of a slide deck with a logo, header band and bullet icons on every slide, charts re-encoded on
+    several slides, and slide renders from one template with builds (one more bullet each), like a parsed
+    presentation. Each image is labelled with the figure it really is."""
+    from PIL import Image, ImageDraw
+
+    image_dir.mkdir(parents=True, exist_ok=True)
+    logo = Image.new("RGB", (120, 60), "white")
+    ImageDraw.Draw(logo).ellipse([10, 5, 110, 55], fill=(0, 80, 160))
+    header = Image.new("RGB", (1280, 70), (0, 40, 90))
+    ImageDraw.Draw(header).rectangle([20, 20, 400, 50], fill="white")
+    icon = Image.new("RGB", (16, 16), (0, 80, 160))
+    chart_images = [_chart(rng, (640, 400)) for _ in range(charts)]
+
+    pages, labels = [], {}
+    for number in range(1, slides + 1):
+        group = (number - 1) // build_steps
+        step = (number - 1) % build_steps
+        chart_id = group % charts if group % 3 != 2 else None
+        items = [("logo", logo, False), ("header", header, False), ("icon", icon, False)]
+        if chart_id is not None:
+            items.append((f"chart-{chart_id}", chart_images[chart_id], True))
+        chart = chart_images[chart_id] if chart_id is not None else None
+        # Every render is a distinct figure: builds and text-only slides look alike but must not be merged
+        items.append((f"slide-{number}", _slide(rng, header, group, 2 + step, chart), False))
+
+        images = []
+        for i, (label, image, reencode) in enumerate(items):
+            path = image_dir / f"page_{number}_img_{i}.png"
+            _save(image, path, rng, reencode)
+            labels[str(path)] = label
+            images.append(ParsedImage(image_path=str(path), text=""))
+        pages.append(ParsedPage(page=number, markdown="", images=images, parse_mode="bench"))
+    return pages, labels
+
+def _accuracy(pages: List[ParsedPage], labels: Dict[str, str],
+              originals: Dict[Tuple[int, int], str]) -> Tuple[int, int]:
+    """Figures holding more than one true image, and true images split over more than one figure"""
+
+    labels_per_hash, hashes_per_label = defaultdict(set), defaultdict(set)
+    for page in pages:
+        for i, image in enumerate(page.images):
+            label = labels[originals[(page.page, i)]]
+            labels_per_hash[image.image_hash].add(label)
+            hashes_per_label[label].add(image.image_hash)
+    return (sum(len(found) - 1 for found in labels_per_hash.values()),
+            sum(len(found) - 1 for found in hashes_per_label.values()))
+
+def benchmark(slides: int, charts: int, build_steps: int, max_distance: int, max_pixel_difference: int,
+              seed: int = 3) -> List[FigureBenchResult]:
+    workdir = Path(tempfile.mkdtemp(prefix="bench_figures_"))
+    calls: List[str] = []
+    store = FigureStore(db_file=str(workdir / "figure_cache.db"), image_dir=str(workdir / "figures"),
+                        max_distance=max_distance, max_pixel_difference=max_pixel_difference,
+                        captioner=lambda path: calls.append(path) or f"Caption of {path}")
+    results = []
+    try:
+        # The second run re-parses the same deck, as a rerun or a deck shared by two documents would
+        for run in ("first run", "second run"):
+            rng = random.Random(seed)
+            pages, labels = build_deck(rng, workdir / run.replace(" ", "_"), slides, charts, build_steps)
+            originals = {(page.page, i): image.image_path for page in pages for i, image in enumerate(page.images)}
+            image_bytes = sum(Path(path).stat().st_size for path in originals.values())
+            print(f"🧪 {run}: {slides} slides, {len(originals)} images, {image_bytes / 1024:.0f} KiB")
+
+            calls.clear()
+            start = time.perf_counter()
+            report = store.process(pages)
+            seconds = time.perf_counter() - start
+            false_merges, missed = _accuracy(pages, labels, originals)
+            results.append(FigureBenchResult(
+                run=run,
+                images=report.images,
+                image_bytes=image_bytes,
+                figures=len(report.figures),
+                caption_calls=len(calls),
+                caption_calls_without_dedup=report.images,
+                bytes_kept=store.stats()["bytes"],
+                seconds=round(seconds, 3),
+                false_merges=false_merges,
+                missed_duplicates=missed
+            ))
+            store.print_summary(report)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+def print_results(results: List[FigureBenchResult]) -> None:
+    print(f"\n{'run':<12}{'images':>8}{'figures':>9}{'captions':>10}{'no dedup':>10}{'KiB in':>9}{'KiB kept':>10}"
+          f"{'seconds':>9}{'merged':>8}{'missed':>8}")
+    for r in results:
+        print(f"{r.run:<12}{r.images:>8}{r.figures:>9}{r.caption_calls:>10}{r.caption_calls_without_dedup:>10}"
+              f"{r.image_bytes / 1024:>9.0f}{r.bytes_kept / 1024:>10.0f}{r.seconds:>9.2f}{r.false_merges:>8}"
+              f"{r.missed_duplicates:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Captioning calls and disk use with figure deduplication, on a synthetic slide deck")
+    parser.add_argument("--slides", type=int, default=60, help="Slides in the deck")
+    parser.add_argument("--charts", type=int, default=12, help="Distinct charts reused across slides")
+    parser.add_argument("--build-steps", type=int, default=3, help="Slides per build (one more bullet each)")
+    parser.add_argument("--max-distance", type=int, default=4, help="pHash bits two near-duplicates may differ by")
+    parser.add_argument("--max-pixel-difference", type=int, default=48,
+                        help="Largest thumbnail pixel difference of a near-duplicate (255 matches on pHash alone)")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    bench_results = benchmark(args.slides, args.charts, args.build_steps, args.max_distance,
+                              args.max_pixel_difference)
+    print_results(bench_results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([r.model_dump() for r in bench_results], f, indent=2)
+        print(f"📄 Results written to {args.json}")
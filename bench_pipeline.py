@@ -0,0 +1,470 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import BaseModel, Field
+
+# Everything the pipeline imports lazily is imported up front, so cold-import cost
+# (slowed further by tracemalloc) doesn't land in the first scenario's timings
+from agno.agent import Agent  # noqa: F401
+from agno.db.sqlite import SqliteDb
+from agno.knowledge.embedder.base import Embedder
+from agno.knowledge.knowledge import Knowledge  # noqa: F401
+from agno.models.base import Model
+from agno.models.metrics import Metrics
+from agno.models.response import ModelResponse
+from agno.tools.reasoning import ReasoningTools  # noqa: F401
+from agno.vectordb.search import SearchType
+
+from batch_runner import TopicRequest, run_batch
+from checkpoint_store import CheckpointStore
+from citation_verifier import CitationVerifier
+from model_router import DEFAULT_POLICY, HANDOFF_PROMPT, SINGLE_TIER_POLICY
+from paper_cache import PaperResultCache
+from paper_store import ArxivPaperStore
+from rate_limiter import DEFAULT_LIMITS, configure_rate_limiter
+from reference_index import ReferenceIndex
+from research_bundle import BundleStore
+from router import AdvancedResearchPipelineAgent, ResearchOutline, ResearchPaper, PAPER_SECTIONS
+from session_store import SessionStore
+from embedding_cache import CachedEmbedder, EmbeddingCache
+from vector_index import IndexedLanceDb
+from tool_cache import ToolResultCache
+
+# Rough chars-per-token ratio used for the fake token counts and prompt size estimates
+CHARS_PER_TOKEN = 4
+
+ROUTING_POLICIES = {"tiered": DEFAULT_POLICY, "single": SINGLE_TIER_POLICY}
+
+BENCH_TOPICS = [
+    TopicRequest(topic="Large Language Models in Scientific Research",
+                 focus_areas=["Automated literature review", "Hypothesis generation"]),
+    TopicRequest(topic="Quantum Computing Applications in Drug Discovery",
+                 focus_areas=["Molecular simulation", "Protein folding"]),
+    TopicRequest(topic="Federated Learning for Healthcare Data",
+                 focus_areas=["Privacy preservation", "Communication efficiency"]),
+    TopicRequest(topic="Graph Neural Networks for Materials Science",
+                 focus_areas=["Crystal property prediction", "Inverse design"]),
+]
+
+class BenchRecorder:
+    """Counters shared by the fake model and backends; survives the deepcopy agno makes for reasoning"""
+
+    def __init__(self):
+        self.stage_seconds: Dict[str, float] = defaultdict(float)
+        self.stage_calls: Dict[str, int] = defaultdict(int)
+        self.tool_calls: Dict[str, int] = defaultdict(int)
+        self.backend_calls: Dict[str, int] = defaultdict(int)
+        self.prompt_chars: Dict[str, List[int]] = defaultdict(list)
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def record_stage(self, stage: str, seconds: float) -> None:
+        self.stage_seconds[stage] += seconds
+        self.stage_calls[stage] += 1
+
+def canned_text(label: str, words: int) -> str:
+    sentence = f"This {label} sentence summarizes prior findings on the topic (Doe et al., 2024)."
+    return " ".join([sentence] * max(1, words // 12))
+
+def canned_references(count: int = 18) -> List[str]:
+    return [
+        f"Doe, J., Roe, R. ({2015 + i % 10}). Benchmark reference {i + 1}. arXiv:24{i:02d}.{10000 + i}"
+        for i in range(count)
+    ]
+
+def canned_paper(topic: str) -> ResearchPaper:
+    """A deterministic full paper roughly the size of a real ~2800 word generation"""
+    return ResearchPaper(
+        title=f"A Survey of {topic}",
+        abstract=canned_text("abstract", 250),
+        **{section: canned_text(section.replace('_', ' '), 380) for section in PAPER_SECTIONS},
+        references=canned_references(),
+        key_insights=[f"Key insight {i + 1} about {topic}" for i in range(4)],
+        research_gaps_identified=[f"Research gap {i + 1} in {topic}" for i in range(3)]
+    )
+
+def canned_outline(topic: str) -> ResearchOutline:
+    return ResearchOutline(
+        title=f"A Survey of {topic}",
+        abstract=canned_text("abstract", 250),
+        research_notes=canned_text("research note", 1500),
+        outline=[{"section": section, "key_points": [f"Point {i + 1} for {section}" for i in range(3)]}
+                 for section in PAPER_SECTIONS],
+        references=canned_references(),
+        key_insights=[f"Key insight {i + 1} about {topic}" for i in range(4)],
+        research_gaps_identified=[f"Research gap {i + 1} in {topic}" for i in range(3)]
+    )
+
+@dataclass
+class FakeChatModel(Model):
+    """Scripted chat model: searches once, then answers with a canned paper, outline or section"""
+
+    id: str = "fake-chat"
+    name: Optional[str] = "FakeChat"
+    provider: Optional[str] = "Benchmark"
+    supports_native_structured_outputs: bool = True
+    latency: float = 0.0
+    recorder: BenchRecorder = field(default_factory=BenchRecorder)
+
+    def _respond(self, messages: List[Any], response_format: Any, tools: Optional[List[Dict[str, Any]]]) -> Tuple[str, ModelResponse]:
+        prompt = "".join(m.get_content_string() for m in messages if m.content is not None)
+        user_prompt = next((m.get_content_string() for m in messages if m.role == "user"), "")
+        topic_match = re.search(r'"([^"]+)"', user_prompt)
+        topic = topic_match.group(1) if topic_match else "benchmark topic"
+        schema_name = getattr(response_format, "__name__", None)
+        tool_names = {t.get("function", {}).get("name") for t in tools or []}
+
+        response = ModelResponse(role="assistant")
+        if messages and messages[-1].content == HANDOFF_PROMPT and any(m.role == "tool" for m in messages):
+            # The router's small tier has searched enough and hands the write-up to the large model
+            kind = "handoff"
+            response.content = "READY"
+        elif schema_name == "ReasoningSteps":
+            kind = "reasoning"
+            response.content = json.dumps({"reasoning_steps": [{
+                "title": "Plan the research", "action": "I will search Exa and ArXiv",
+                "result": "I have a plan", "reasoning": "Both sources are needed", "next_action": "final_answer",
+            }]})
+        elif "search_exa" in tool_names and not any(m.role == "tool" for m in messages):
+            # First turn of a research run: exercise the real tool-calling path
+            kind = "tool_request"
+            response.tool_calls = [
+                {"id": f"call_exa_{hashlib.md5(topic.encode()).hexdigest()[:8]}", "type": "function",
+                 "function": {"name": "search_exa", "arguments": json.dumps({"query": topic, "num_results": 10})}},
+                {"id": f"call_arxiv_{hashlib.md5(topic.encode()).hexdigest()[:8]}", "type": "function",
+                 "function": {"name": "search_arxiv_and_return_articles",
+                              "arguments": json.dumps({"query": topic, "num_articles": 10})}},
+            ]
+            for call in response.tool_calls:
+                self.recorder.tool_calls[call["function"]["name"]] += 1
+        elif schema_name == "ResearchPaper":
+            kind = "paper"
+            response.content = canned_paper(topic).model_dump_json()
+        elif schema_name == "ResearchOutline":
+            kind = "outline"
+            response.content = canned_outline(topic).model_dump_json()
+        elif schema_name == "PaperFrontMatter":
+            kind = "front_matter"
+            outline = canned_outline(topic)
+            response.content = json.dumps({"title": outline.title, "abstract": outline.abstract})
+        else:
+            kind = "section"
+            response.content = canned_text("section", 380)
+
+        input_tokens = len(prompt) // CHARS_PER_TOKEN
+        output_tokens = len(response.content or json.dumps(response.tool_calls)) // CHARS_PER_TOKEN
+        response.response_usage = Metrics(input_tokens=input_tokens, output_tokens=output_tokens,
+                                          total_tokens=input_tokens + output_tokens)
+        self.recorder.prompt_chars[kind].append(len(prompt))
+        self.recorder.input_tokens += input_tokens
+        self.recorder.output_tokens += output_tokens
+        return kind, response
+
+    def invoke(self, messages: List[Any], response_format: Any = None, tools: Optional[List[Dict[str, Any]]] = None,
+               **kwargs) -> ModelResponse:
+        start = time.perf_counter()
+        time.sleep(self.latency)
+        kind, response = self._respond(messages, response_format, tools)
+        self.recorder.record_stage(f"model:{kind}", time.perf_counter() - start)
+        return response
+
+    async def ainvoke(self, messages: List[Any], response_format: Any = None,
+                      tools: Optional[List[Dict[str, Any]]] = None, **kwargs) -> ModelResponse:
+        start = time.perf_counter()
+        await asyncio.sleep(self.latency)
+        kind, response = self._respond(messages, response_format, tools)
+        self.recorder.record_stage(f"model:{kind}", time.perf_counter() - start)
+        return response
+
+    def invoke_stream(self, *args, **kwargs):
+        yield self.invoke(*args, **kwargs)
+
+    async def ainvoke_stream(self, *args, **kwargs):
+        yield await self.ainvoke(*args, **kwargs)
+
+    def _parse_provider_response(self, response: Any, **kwargs) -> ModelResponse:
+        return response
+
+    def _parse_provider_response_delta(self, response: Any) -> ModelResponse:
+        return response
+
+class FakeExa:
+    """Stands in for exa_py.Exa with fixed results and a configurable delay"""
+
+    def __init__(self, recorder: BenchRecorder, latency: float = 0.0):
+        self.recorder = recorder
+        self.latency = latency
+
+    def search_and_contents(self, query: str, num_results: int = 5, **kwargs) -> SimpleNamespace:
+        start = time.perf_counter()
+        time.sleep(self.latency)
+        results = [
+            SimpleNamespace(url=f"https://example.org/{hashlib.md5(query.encode()).hexdigest()[:8]}/{i}",
+                            title=f"{query} study {i + 1}", author="Doe, J.", published_date="2024-01-01",
+                            text=canned_text(f"result {i + 1} on {query}", 400), highlights=[f"Highlight {i + 1}"])
+            for i in range(num_results)
+        ]
+        self.recorder.backend_calls["exa.search"] += 1
+        self.recorder.record_stage("tool:search_exa", time.perf_counter() - start)
+        return SimpleNamespace(results=results)
+
+class FakeArxivClient:
+    """Stands in for arxiv.Client, returning canned results after a configurable delay"""
+
+    def __init__(self, recorder: BenchRecorder, latency: float = 0.0):
+        self.recorder = recorder
+        self.latency = latency
+
+    def results(self, search: Any) -> List[Any]:
+        start = time.perf_counter()
+        time.sleep(self.latency)
+        query = search.query or ",".join(search.id_list)
+        results = []
+        for i in range(search.max_results or 10):
+            short_id = f"24{i:02d}.{int(hashlib.md5(query.encode()).hexdigest()[:4], 16) % 90000 + 10000}v1"
+            results.append(SimpleNamespace(
+                title=f"{query} preprint {i + 1}",
+                get_short_id=lambda short_id=short_id: short_id,
+                entry_id=f"http://arxiv.org/abs/{short_id}",
+                authors=[SimpleNamespace(name="Jane Doe"), SimpleNamespace(name="Richard Roe")],
+                primary_category="cs.LG",
+                categories=["cs.LG", "cs.AI"],
+                published=datetime(2024, 1, 1),
+                pdf_url=f"http://arxiv.org/pdf/{short_id}",
+                links=[SimpleNamespace(href=f"http://arxiv.org/abs/{short_id}")],
+                summary=canned_text(f"preprint {i + 1} on {query}", 200),
+                comment=None,
+            ))
+        self.recorder.backend_calls["arxiv.search"] += 1
+        self.recorder.record_stage("tool:search_arxiv", time.perf_counter() - start)
+        return results
+
+@dataclass
+class HashEmbedder(Embedder):
+    """Deterministic offline embedder so the temporary LanceDB table never calls OpenAI"""
+
+    dimensions: Optional[int] = 64
+
+    def get_embedding(self, text: str) -> List[float]:
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return [digest[i % len(digest)] / 255.0 for i in range(self.dimensions)]
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self.get_embedding(text), None
+
+def build_offline_pipeline(workdir: str, recorder: BenchRecorder, model_latency: float = 0.0,
+                           tool_latency: float = 0.0, small_model_latency: Optional[float] = None,
+                           routing_policy: Optional[Dict[str, str]] = None) -> AdvancedResearchPipelineAgent:
+    """Create a pipeline whose model, search backends and databases are all local and temporary"""
+
+    # The real tool classes are kept; only their network clients are swapped after construction
+    os.environ.setdefault("EXA_API_KEY", "benchmark-placeholder")
+    # The fakes never throttle, so provider budgets would only add waits that production tiers don't share
+    for name in DEFAULT_LIMITS:
+        configure_rate_limiter(name, requests_per_minute=None, tokens_per_minute=None, max_concurrency=1000)
+
+    pipeline = AdvancedResearchPipelineAgent(lazy=True, routing_policy=routing_policy)
+    pipeline.model = FakeChatModel(latency=model_latency, recorder=recorder)
+    # Small models answer faster; by default the fake one takes half the large model's latency
+    pipeline.small_model = FakeChatModel(id="fake-chat-small", recorder=recorder,
+                                         latency=model_latency / 2 if small_model_latency is None else small_model_latency)
+    pipeline.tool_cache = ToolResultCache(db_file=str(Path(workdir) / "tool_cache.db"))
+    pipeline.paper_store = ArxivPaperStore(root_dir=str(Path(workdir) / "papers"))
+    pipeline.vector_db = IndexedLanceDb(table_name="research_knowledge", uri=str(Path(workdir) / "vectordb"),
+                                        embedder=CachedEmbedder(embedder=HashEmbedder(),
+                                                                cache=EmbeddingCache(str(Path(workdir) / "embeddings"))),
+                                        search_type=SearchType.hybrid)
+    pipeline.contents_db = SqliteDb(db_file=str(Path(workdir) / "content.db"))
+    pipeline.session_store = SessionStore(db_file=str(Path(workdir) / "sessions.db"))
+    pipeline.reference_index = ReferenceIndex(db_file=str(Path(workdir) / "references.db"))
+    # Every scenario must do the full work, so similar topics don't reuse each other's research
+    pipeline.paper_cache = PaperResultCache(db_file=str(Path(workdir) / "paper_cache.db"), similarity_threshold=None)
+    pipeline.bundle_store = BundleStore(root_dir=str(Path(workdir) / "bundles"))
+    pipeline.checkpoints = CheckpointStore(db_file=str(Path(workdir) / "checkpoints.db"), metrics=pipeline.metrics)
+    pipeline.citation_verifier = CitationVerifier(report_dir=str(Path(workdir) / "citation_reports"),
+                                                  metrics=pipeline.metrics)
+
+    exa_tools, arxiv_tools = pipeline.tools[0], pipeline.tools[1]
+    exa_tools.exa = FakeExa(recorder, tool_latency)
+    arxiv_tools.client = FakeArxivClient(recorder, tool_latency)
+
+    # Debug logging would print every prompt and dominate both the output and the timings
+    pipeline.research_agent.debug_mode = False
+    pipeline.outline_agent.debug_mode = False
+    return pipeline
+
+def time_stages(pipeline: AdvancedResearchPipelineAgent, recorder: BenchRecorder) -> None:
+    """Wrap the pipeline's stage methods on this instance so each call adds to the stage timings"""
+
+    def wrap_sync(name: str) -> None:
+        method = getattr(pipeline, name)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                recorder.record_stage(f"stage:{name}", time.perf_counter() - start)
+        setattr(pipeline, name, timed)
+
+    def wrap_async(name: str) -> None:
+        method = getattr(pipeline, name)
+
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                recorder.record_stage(f"stage:{name}", time.perf_counter() - start)
+        setattr(pipeline, name, timed)
+
+    for name in ("format_research_paper", "save_paper"):
+        wrap_sync(name)
+    for name in ("build_research_outline", "write_section"):
+        wrap_async(name)
+
+class ScenarioResult(BaseModel):
+    """Measurements for one benchmark scenario"""
+    scenario: str
+    topics: int
+    papers: int
+    total_seconds: float
+    seconds_per_topic: float
+    peak_memory_mb: float
+    stage_seconds: Dict[str, float] = Field(default_factory=dict)
+    stage_calls: Dict[str, int] = Field(default_factory=dict)
+    tool_calls: Dict[str, int] = Field(default_factory=dict)
+    backend_calls: Dict[str, int] = Field(default_factory=dict)
+    prompt_chars: Dict[str, Dict[str, int]] = Field(default_factory=dict)
+    input_tokens: int = 0
+    output_tokens: int = 0
+    model_tiers: Dict[str, Any] = Field(default_factory=dict)
+
+async def _run_scenario(scenario: str, pipeline: AdvancedResearchPipelineAgent, topics: List[TopicRequest],
+                        output_dir: str, concurrency: int) -> int:
+    if scenario == "sync":
+        for request in topics:
+            # The sync path runs its own event loop, so hand it a worker thread
+            paper = await asyncio.to_thread(pipeline.generate_research_paper_sync, request.topic, request.focus_areas)
+            pipeline.save_paper(paper, request.topic, output_dir)
+        return len(topics)
+    if scenario == "async":
+        for request in topics:
+            paper = await pipeline.generate_research_paper(request.topic, request.focus_areas)
+            pipeline.save_paper(paper, request.topic, output_dir)
+        return len(topics)
+    if scenario == "parallel":
+        for request in topics:
+            paper = await pipeline.generate_research_paper_parallel(request.topic, request.focus_areas)
+            pipeline.save_paper(paper, request.topic, output_dir)
+        return len(topics)
+    if scenario == "multi":
+        results = await run_batch(pipeline, topics, concurrency, output_dir)
+        return sum(1 for r in results if r.success)
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+def run_scenario(scenario: str, topics: List[TopicRequest], model_latency: float = 0.0,
+                 tool_latency: float = 0.0, concurrency: int = 4, routing: str = "tiered") -> ScenarioResult:
+    """Run one scenario against a fresh offline pipeline in its own temporary directory"""
+
+    recorder = BenchRecorder()
+    with tempfile.TemporaryDirectory() as workdir:
+        previous_cwd = os.getcwd()
+        # Anything the pipeline writes to a relative path also lands in the scratch directory
+        os.chdir(workdir)
+        try:
+            tracemalloc.start()
+            start = time.perf_counter()
+            pipeline = build_offline_pipeline(workdir, recorder, model_latency, tool_latency,
+                                              routing_policy=ROUTING_POLICIES[routing])
+            recorder.record_stage("stage:construct", time.perf_counter() - start)
+            time_stages(pipeline, recorder)
+
+            papers = asyncio.run(_run_scenario(scenario, pipeline, topics, str(Path(workdir) / "papers_out"),
+                                               concurrency))
+            total_seconds = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            os.chdir(previous_cwd)
+
+    return ScenarioResult(
+        scenario=scenario if routing == "tiered" else f"{scenario} ({routing})",
+        topics=len(topics),
+        papers=papers,
+        total_seconds=total_seconds,
+        seconds_per_topic=total_seconds / len(topics) if topics else 0.0,
+        peak_memory_mb=peak / (1024 * 1024),
+        stage_seconds=dict(recorder.stage_seconds),
+        stage_calls=dict(recorder.stage_calls),
+        tool_calls=dict(recorder.tool_calls),
+        backend_calls=dict(recorder.backend_calls),
+        prompt_chars={
+            kind: {"calls": len(sizes), "max": max(sizes), "mean": sum(sizes) // len(sizes)}
+            for kind, sizes in recorder.prompt_chars.items()
+        },
+        input_tokens=recorder.input_tokens,
+        output_tokens=recorder.output_tokens,
+        model_tiers=pipeline.model_router.report(papers)
+    )
+
+def print_scenario_report(result: ScenarioResult) -> None:
+    print(f"\n{'='*80}")
+    print(f"⏱️  {result.scenario}: {result.papers}/{result.topics} papers in {result.total_seconds:.2f}s "
+          f"({result.seconds_per_topic:.2f}s/topic, peak {result.peak_memory_mb:.1f} MB)")
+    print(f"{'='*80}")
+    print(f"{'stage':<36}{'calls':>8}{'total (s)':>12}")
+    for stage, seconds in sorted(result.stage_seconds.items()):
+        print(f"{stage:<36}{result.stage_calls[stage]:>8}{seconds:>12.3f}")
+    print(f"🔧 Tool calls: {result.tool_calls}  (backend calls after cache: {result.backend_calls})")
+    print(f"{'prompt kind':<36}{'calls':>8}{'mean chars':>12}{'max chars':>12}")
+    for kind, sizes in sorted(result.prompt_chars.items()):
+        print(f"{kind:<36}{sizes['calls']:>8}{sizes['mean']:>12}{sizes['max']:>12}")
+    print(f"🔢 Estimated tokens: {result.input_tokens} in, {result.output_tokens} out")
+    if result.model_tiers:
+        print(f"{'model tier':<36}{'calls':>8}{'seconds':>12}{'est. $':>12}")
+        for tier, entry in result.model_tiers["tiers"].items():
+            print(f"{tier + ' (' + str(entry['model']) + ')':<36}{sum(entry['calls'].values()):>8}"
+                  f"{entry['seconds']:>12.3f}{entry['cost_usd']:>12.4f}")
+        print(f"💸 Per paper at list prices: ${result.model_tiers.get('cost_usd_per_paper', 0.0):.4f} "
+              f"({result.model_tiers['handoffs']} hand-offs to the large model)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the research pipeline offline with a fake model and search backends")
+    parser.add_argument("--scenarios", nargs="+", default=["sync", "async", "parallel", "multi"],
+                        choices=["sync", "async", "parallel", "multi"], help="Scenarios to run")
+    parser.add_argument("--topics", type=int, default=len(BENCH_TOPICS), help="Topics per scenario")
+    parser.add_argument("--model-latency", type=float, default=0.05, help="Seconds per fake model call")
+    parser.add_argument("--tool-latency", type=float, default=0.1, help="Seconds per fake Exa/ArXiv call")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent topics in the multi scenario")
+    parser.add_argument("--routing", nargs="+", default=["tiered"], choices=list(ROUTING_POLICIES),
+                        help="Model routing policies to run each scenario with (tiered, single or both)")
+    parser.add_argument("--json", help="Optional file to write results to")
+    args = parser.parse_args()
+
+    topics = (BENCH_TOPICS * (args.topics // len(BENCH_TOPICS) + 1))[:args.topics]
+    results = []
+    for scenario in args.scenarios:
+        for routing in args.routing:
+            result = run_scenario(scenario, topics, args.model_latency, args.tool_latency, args.concurrency, routing)
+            print_scenario_report(result)
+            results.append(result)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump([r.model_dump() for r in results], f, indent=2)
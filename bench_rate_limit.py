@@ -0,0 +1,209 @@
+import argparse
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from rate_limiter import RateLimiter
+
+CHARS_PER_TOKEN = 4
+COMPLETION_TOKENS = 50
+
+
+class RateLimitedEndpoint:
+    """Local OpenAI-compatible chat endpoint that enforces request and token windows like the real API"""
+
+    def __init__(self, requests_per_window: int, tokens_per_window: int, window_seconds: float = 2.0,
+                 latency: float = 0.05):
+        self.requests_per_window = requests_per_window
+        self.tokens_per_window = tokens_per_window
+        self.window_seconds = window_seconds
+        self.latency = latency
+        self.accepted = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._window: Deque[Tuple[float, int]] = deque()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def admit(self, tokens: int) -> Optional[float]:
+        """Count the request against the window, or return seconds until it would fit"""
+
+        with self._lock:
+            now = time.monotonic()
+            while self._window and self._window[0][0] <= now - self.window_seconds:
+                self._window.popleft()
+            used = sum(t for _, t in self._window)
+            if len(self._window) >= self.requests_per_window or used + tokens > self.tokens_per_window:
+                self.rejected += 1
+                return max(0.01, self._window[0][0] + self.window_seconds - now) if self._window else 0.01
+            self._window.append((now, tokens))
+            self.accepted += 1
+            return None
+
+    def start(self) -> str:
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                prompt_tokens = sum(len(str(m.get("content") or "")) for m in body.get("messages", [])) // CHARS_PER_TOKEN
+                retry_after = endpoint.admit(prompt_tokens + COMPLETION_TOKENS)
+                if retry_after is not None:
+                    payload = {"error": {"message": "Rate limit reached for requests", "type": "requests",
+                                         "code": "rate_limit_exceeded"}}
+                    self._send(429, payload, {"retry-after": f"{retry_after:.3f}",
+                                              "retry-after-ms": str(int(retry_after * 1000))})
+                    return
+                time.sleep(endpoint.latency)
+                self._send(200, {
+                    "id": "chatcmpl-bench", "object": "chat.completion", "created": int(time.time()),
+                    "model": body.get("model", "fake"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": "ok"}}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": COMPLETION_TOKENS,
+                              "total_tokens": prompt_tokens + COMPLETION_TOKENS},
+                })
+
+            def _send(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+class RateLimitBenchResult(BaseModel):
+    strategy: str
+    requests: int
+    succeeded: int
+    failed: int
+    responses_429: int
+    seconds: float
+    requests_per_second: float
+    endpoint_limit_per_second: float
+
+def make_model(base_url: str) -> Any:
+    from agno.models.openai import OpenAIChat
+
+    # SDK retries are off so each strategy's own retry behaviour is what gets measured
+    return OpenAIChat(id="gpt-4.1", api_key="benchmark-placeholder", base_url=base_url, max_retries=0)
+
+async def _invoke(model: Any, prompt: str) -> Any:
+    from agno.models.message import Message
+
+    return await model.ainvoke(messages=[Message(role="user", content=prompt)],
+                               assistant_message=Message(role="assistant"))
+
+async def run_fixed_delay(base_url: str, prompts: List[str], concurrency: int, retries: int,
+                          delay: float) -> Tuple[int, int]:
+    """The agent's old behaviour: every failed call waits the same fixed delay and tries again"""
+
+    model = make_model(base_url)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(prompt: str) -> bool:
+        async with semaphore:
+            for attempt in range(retries + 1):
+                try:
+                    await _invoke(model, prompt)
+                    return True
+                except Exception:
+                    if attempt < retries:
+                        await asyncio.sleep(delay)
+            return False
+
+    results = await asyncio.gather(*(one(prompt) for prompt in prompts))
+    return sum(results), len(results) - sum(results)
+
+async def run_limited(base_url: str, prompts: List[str], concurrency: int, limiter: RateLimiter) -> Tuple[int, int]:
+    model = limiter.instrument_model(make_model(base_url))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(prompt: str) -> bool:
+        async with semaphore:
+            try:
+                await _invoke(model, prompt)
+                return True
+            except Exception:
+                return False
+
+    results = await asyncio.gather(*(one(prompt) for prompt in prompts))
+    return sum(results), len(results) - sum(results)
+
+def benchmark(requests: int, concurrency: int, requests_per_window: int, tokens_per_window: int,
+              window_seconds: float, prompt_tokens: int) -> List[RateLimitBenchResult]:
+    prompts = [f"request {i} " + "x" * (prompt_tokens * CHARS_PER_TOKEN) for i in range(requests)]
+    per_minute = 60 / window_seconds
+    endpoint_rps = min(requests_per_window, tokens_per_window // (prompt_tokens + COMPLETION_TOKENS)) / window_seconds
+    strategies = {
+        # agno's retries=2, delay_between_retries=3, with the delay scaled to the test window
+        "fixed delay (agent retries)": lambda url: run_fixed_delay(url, prompts, concurrency, 2, window_seconds * 1.5),
+        "adaptive, budgets unknown": lambda url: run_limited(url, prompts, concurrency, RateLimiter(
+            "bench", max_concurrency=concurrency, base_delay=window_seconds / 8, output_token_reserve=COMPLETION_TOKENS)),
+        "adaptive, budgets configured": lambda url: run_limited(url, prompts, concurrency, RateLimiter(
+            "bench", requests_per_minute=requests_per_window * per_minute,
+            tokens_per_minute=tokens_per_window * per_minute, max_concurrency=concurrency,
+            base_delay=window_seconds / 8, output_token_reserve=COMPLETION_TOKENS)),
+    }
+
+    results = []
+    for name, strategy in strategies.items():
+        endpoint = RateLimitedEndpoint(requests_per_window, tokens_per_window, window_seconds)
+        base_url = endpoint.start()
+        try:
+            print(f"🧪 {name}: {requests} requests, concurrency {concurrency}")
+            start = time.perf_counter()
+            succeeded, failed = asyncio.run(strategy(base_url))
+            seconds = time.perf_counter() - start
+        finally:
+            endpoint.stop()
+        results.append(RateLimitBenchResult(
+            strategy=name, requests=requests, succeeded=succeeded, failed=failed, responses_429=endpoint.rejected,
+            seconds=seconds, requests_per_second=succeeded / seconds, endpoint_limit_per_second=endpoint_rps
+        ))
+    return results
+
+def print_results(results: List[RateLimitBenchResult]) -> None:
+    print(f"\n{'strategy':<32}{'ok':>6}{'failed':>8}{'429s':>7}{'seconds':>9}{'req/s':>8}{'limit/s':>9}")
+    for r in results:
+        print(f"{r.strategy:<32}{r.succeeded:>6}{r.failed:>8}{r.responses_429:>7}{r.seconds:>9.1f}"
+              f"{r.requests_per_second:>8.2f}{r.endpoint_limit_per_second:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput and 429s against a local rate-limited chat endpoint")
+    parser.add_argument("--requests", type=int, default=120, help="Chat requests per strategy")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight from the client")
+    parser.add_argument("--requests-per-window", type=int, default=10, help="Endpoint request limit per window")
+    parser.add_argument("--tokens-per-window", type=int, default=20000, help="Endpoint token limit per window")
+    parser.add_argument("--window-seconds", type=float, default=2.0, help="Length of the endpoint's limit window")
+    parser.add_argument("--prompt-tokens", type=int, default=1500, help="Approximate prompt size per request")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    bench_results = benchmark(args.requests, args.concurrency, args.requests_per_window, args.tokens_per_window,
+                              args.window_seconds, args.prompt_tokens)
+    print_results(bench_results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([r.model_dump() for r in bench_results], f, indent=2)
+        print(f"📄 Results written to {args.json}")
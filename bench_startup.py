@@ -0,0 +1,65 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+REPO_DIR = Path(__file__).resolve().parent
+
+# Runs in a fresh interpreter so every sample pays the real cold-import cost
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import router
+imported = time.perf_counter()
+pipeline = router.AdvancedResearchPipelineAgent(lazy=sys.argv[1] == "lazy")
+constructed = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "construct_ms": (constructed - imported) * 1000,
+    "modules": len(sys.modules),
+}))
+"""
+
+def run_probe(mode: str, workdir: str) -> Dict[str, float]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_DIR), env.get("PYTHONPATH")]))
+    if mode == "eager":
+        # Eager construction resolves credentials; placeholders are enough since nothing is called
+        for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_S3_REGION", "EXA_API_KEY", "OPENAI_API_KEY"):
+            env.setdefault(name, "benchmark-placeholder")
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, mode], cwd=workdir, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def summarize(samples: List[Dict[str, float]]) -> Dict[str, float]:
+    return {
+        "import_ms_median": statistics.median(s["import_ms"] for s in samples),
+        "construct_ms_median": statistics.median(s["construct_ms"] for s in samples),
+        "modules_loaded": samples[-1]["modules"],
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure `import router` and pipeline constructor cost")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh-interpreter samples per mode")
+    parser.add_argument("--json", help="Optional file to write results to")
+    args = parser.parse_args()
+
+    results = {}
+    # A scratch directory keeps the databases created by eager mode out of the repo
+    with tempfile.TemporaryDirectory() as workdir:
+        for mode in ("lazy", "eager"):
+            results[mode] = summarize([run_probe(mode, workdir) for _ in range(args.repeat)])
+
+    print(f"{'mode':<8}{'import (ms)':>14}{'construct (ms)':>17}{'modules':>10}")
+    for mode, r in results.items():
+        print(f"{mode:<8}{r['import_ms_median']:>14.1f}{r['construct_ms_median']:>17.1f}{r['modules_loaded']:>10}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,195 @@
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+from agno.knowledge.embedder.base import Embedder
+from agno.vectordb.search import SearchType
+from pydantic import BaseModel
+
+from vector_index import IndexedLanceDb
+
+VOCABULARY_SIZE = 5000
+WORDS_PER_CHUNK = 60
+
+
+class IndexBenchResult(BaseModel):
+    rows: int
+    config: str
+    build_seconds: float = 0.0
+    recall_at_k: Optional[float] = None
+    p50_ms: float
+    p95_ms: float
+
+@dataclass
+class QueryEmbedder(Embedder):
+    """Returns pre-computed vectors for benchmark query strings; the corpus is embedded synthetically"""
+
+    vectors: Optional[Dict[str, List[float]]] = None
+
+    def get_embedding(self, text: str) -> List[float]:
+        return self.vectors[text]
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self.get_embedding(text), None
+
+class SyntheticCorpus:
+    """Clustered unit vectors with matching topic words, generated reproducibly in chunks"""
+
+    def __init__(self, dimensions: int, clusters: int = 256, seed: int = 7):
+        rng = np.random.default_rng(seed)
+        self.dimensions = dimensions
+        self.centroids = self._normalize(rng.standard_normal((clusters, dimensions)).astype(np.float32))
+        # Each cluster has its own topic words, so keyword and vector relevance agree
+        self.topic_words = rng.integers(0, VOCABULARY_SIZE, size=(clusters, 12))
+        self.seed = seed
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def chunk(self, start: int, size: int) -> Tuple[np.ndarray, np.ndarray]:
+        rng = np.random.default_rng((self.seed, start))
+        clusters = rng.integers(0, len(self.centroids), size=size)
+        noise = rng.standard_normal((size, self.dimensions)).astype(np.float32) * 0.08
+        return self._normalize(self.centroids[clusters] + noise), clusters
+
+    def text(self, cluster: int, rng: np.random.Generator) -> str:
+        topic = rng.choice(self.topic_words[cluster], size=WORDS_PER_CHUNK // 3)
+        filler = rng.integers(0, VOCABULARY_SIZE, size=WORDS_PER_CHUNK - len(topic))
+        return " ".join(f"w{word}" for word in np.concatenate([topic, filler]))
+
+    def table(self, start: int, vectors: np.ndarray, clusters: np.ndarray) -> pa.Table:
+        rng = np.random.default_rng((self.seed, start, 1))
+        payloads = [
+            json.dumps({"name": f"chunk-{start + i}", "meta_data": {}, "content": self.text(cluster, rng),
+                        "usage": None, "content_id": None})
+            for i, cluster in enumerate(clusters)
+        ]
+        return pa.table({
+            "vector": pa.FixedSizeListArray.from_arrays(pa.array(vectors.ravel()), self.dimensions),
+            "id": [f"{start + i}" for i in range(len(vectors))],
+            "payload": payloads,
+        })
+
+def update_top_k(best_scores: np.ndarray, best_ids: np.ndarray, scores: np.ndarray, offset: int,
+                 k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge one chunk's cosine scores into the running exact top-k per query"""
+
+    ids = np.broadcast_to(np.arange(offset, offset + scores.shape[1]), scores.shape)
+    merged_scores = np.concatenate([best_scores, scores], axis=1)
+    merged_ids = np.concatenate([best_ids, ids], axis=1)
+    top = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(merged_scores, top, axis=1), np.take_along_axis(merged_ids, top, axis=1)
+
+def build_table(workdir: str, rows: int, dimensions: int, queries: int, k: int,
+                chunk_rows: int = 50000) -> Tuple[IndexedLanceDb, Dict[str, List[float]], np.ndarray]:
+    """Write `rows` synthetic chunks and compute exact top-k neighbours for perturbed-chunk queries"""
+
+    corpus = SyntheticCorpus(dimensions)
+    rng = np.random.default_rng(11)
+    query_clusters = rng.integers(0, len(corpus.centroids), size=queries)
+    query_vectors = corpus._normalize(
+        corpus.centroids[query_clusters] + rng.standard_normal((queries, dimensions)).astype(np.float32) * 0.08
+    )
+    query_texts = [" ".join(f"w{w}" for w in rng.choice(corpus.topic_words[c], size=4)) + f" q{i}"
+                   for i, c in enumerate(query_clusters)]
+    embedder = QueryEmbedder(dimensions=dimensions, vectors=dict(zip(query_texts, query_vectors.tolist())))
+
+    vector_db = IndexedLanceDb(table_name="bench_knowledge", uri=workdir, embedder=embedder,
+                               search_type=SearchType.vector, index_threshold=rows + 1)
+    best_scores = np.full((queries, k), -np.inf, dtype=np.float32)
+    best_ids = np.zeros((queries, k), dtype=np.int64)
+    for start in range(0, rows, chunk_rows):
+        vectors, clusters = corpus.chunk(start, min(chunk_rows, rows - start))
+        vector_db.table.add(corpus.table(start, vectors, clusters))
+        best_scores, best_ids = update_top_k(best_scores, best_ids, query_vectors @ vectors.T, start, k)
+    return vector_db, embedder.vectors, best_ids
+
+def time_queries(search: Any, queries: List[str], k: int,
+                 truth: Optional[np.ndarray] = None) -> Tuple[Optional[float], float, float]:
+    """Run every query once (after one warm-up) and return recall@k, p50 and p95 latency in ms"""
+
+    search(queries[0], k)
+    latencies, hits = [], 0
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        results = search(query, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if truth is not None:
+            hits += len({int(row["id"]) for row in results} & set(truth[i].tolist()))
+    recall = hits / (len(queries) * k) if truth is not None else None
+    return recall, float(np.percentile(latencies, 50)), float(np.percentile(latencies, 95))
+
+def benchmark_size(rows: int, dimensions: int, queries: int, k: int, index_types: List[str],
+                   nprobes: List[int]) -> List[IndexBenchResult]:
+    workdir = tempfile.mkdtemp(prefix="bench_vector_index_")
+    try:
+        print(f"🧪 Building {rows:,} synthetic {dimensions}-d chunks...")
+        vector_db, query_vectors, truth = build_table(workdir, rows, dimensions, queries, k)
+        query_texts = list(query_vectors)
+        results = []
+
+        recall, p50, p95 = time_queries(vector_db.vector_search, query_texts, k, truth)
+        results.append(IndexBenchResult(rows=rows, config="exact scan", recall_at_k=recall, p50_ms=p50, p95_ms=p95))
+
+        start = time.perf_counter()
+        vector_db.ensure_indexes()
+        fts_seconds = time.perf_counter() - start
+        _, p50, p95 = time_queries(vector_db.keyword_search, query_texts, k)
+        results.append(IndexBenchResult(rows=rows, config="full-text (BM25)", build_seconds=fts_seconds,
+                                        p50_ms=p50, p95_ms=p95))
+
+        for index_type in index_types:
+            vector_db.index_type = index_type
+            vector_db.index_threshold = 0
+            start = time.perf_counter()
+            vector_db.ensure_indexes()
+            build_seconds = time.perf_counter() - start
+            for probes in nprobes:
+                vector_db.nprobes = probes
+                recall, p50, p95 = time_queries(vector_db.vector_search, query_texts, k, truth)
+                results.append(IndexBenchResult(rows=rows, config=f"{index_type} nprobes={probes}",
+                                                build_seconds=build_seconds, recall_at_k=recall, p50_ms=p50, p95_ms=p95))
+                build_seconds = 0.0
+            recall, p50, p95 = time_queries(vector_db.hybrid_search, query_texts, k, truth)
+            results.append(IndexBenchResult(rows=rows, config=f"{index_type} hybrid+RRF nprobes={vector_db.nprobes}",
+                                            recall_at_k=recall, p50_ms=p50, p95_ms=p95))
+        return results
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def print_results(results: List[IndexBenchResult], k: int) -> None:
+    print(f"\n{'rows':>10}  {'config':<36}{'build (s)':>10}{f'recall@{k}':>11}{'p50 ms':>9}{'p95 ms':>9}")
+    for result in results:
+        recall = f"{result.recall_at_k:.3f}" if result.recall_at_k is not None else "-"
+        build = f"{result.build_seconds:.1f}" if result.build_seconds else ""
+        print(f"{result.rows:>10,}  {result.config:<36}{build:>10}{recall:>11}{result.p50_ms:>9.2f}{result.p95_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recall@k and query latency of the knowledge table indexes on synthetic data")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000], help="Table sizes in chunks")
+    parser.add_argument("--dimensions", type=int, default=384, help="Embedding dimensions")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per configuration")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query")
+    parser.add_argument("--index-types", nargs="+", default=["IVF_PQ", "IVF_HNSW_SQ"], help="ANN indexes to compare")
+    parser.add_argument("--nprobes", type=int, nargs="+", default=[10, 20, 50], help="IVF partitions probed per query")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    all_results: List[IndexBenchResult] = []
+    for rows in args.sizes:
+        size_results = benchmark_size(rows, args.dimensions, args.queries, args.k, args.index_types, args.nprobes)
+        print_results(size_results, args.k)
+        all_results.extend(size_results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([result.model_dump() for result in all_results], f, indent=2)
+        print(f"📄 Results written to {args.json}")
@@ -0,0 +1,347 @@
+import argparse
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+from context_budget import record_tool_sources
+from paper_cache import normalize_focus_areas, normalize_topic
+
+if TYPE_CHECKING:
+    from pipeline_metrics import PipelineMetrics
+
+_active_run: ContextVar[Optional["CheckpointRun"]] = ContextVar("checkpoint_run", default=None)
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def model_call_key(messages: List[Any], response_format: Any = None, tools: Optional[List[Any]] = None) -> str:
+    """What a model call depends on; system messages are left out because they carry the current time"""
+
+    history = [
+        [message.role, message.content, message.tool_calls, message.tool_call_id]
+        for message in messages if message.role != "system"
+    ]
+    tool_names = sorted(str(tool.get("function", {}).get("name")) for tool in tools or [] if isinstance(tool, dict))
+    return _digest([history, getattr(response_format, "__name__", response_format), tool_names])
+
+class CheckpointRun:
+    """One generation attempt; steps saved by an earlier attempt of the same run are replayed instead of re-run"""
+
+    def __init__(self, store: "CheckpointStore", run_key: str, saved_steps: int):
+        self.store = store
+        self.run_key = run_key
+        self.saved_steps = saved_steps
+        self.completed = False
+        self.skipped: Dict[str, int] = {"model": 0, "tool": 0}
+        self.skipped_seconds = 0.0
+        self.skipped_tokens = 0
+
+    @property
+    def resumed(self) -> bool:
+        return self.saved_steps > 0
+
+    def complete(self) -> None:
+        """Mark the run finished; its checkpoints are dropped once the block exits"""
+
+        self.completed = True
+
+    def replay(self, kind: str, step_key: str) -> Optional[Any]:
+        step = self.store.load_step(self.run_key, kind, step_key)
+        if step is None:
+            return None
+        value, seconds, tokens = step
+        self.skipped[kind] += 1
+        self.skipped_seconds += seconds
+        self.skipped_tokens += tokens
+        return value
+
+    def record(self, kind: str, name: Optional[str], step_key: str, value: Any, seconds: float, tokens: int = 0) -> None:
+        self.store.save_step(self.run_key, kind, name, step_key, value, seconds, tokens)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "saved_steps": self.saved_steps,
+            "skipped_model_calls": self.skipped["model"],
+            "skipped_tool_calls": self.skipped["tool"],
+            "skipped_tokens": self.skipped_tokens,
+            "skipped_seconds": round(self.skipped_seconds, 3),
+        }
+
+class CheckpointStore:
+    """Step-level checkpoints (model responses, reasoning, tool results) so failed generations resume, not restart"""
+
+    def __init__(self, db_file: str = "./research_checkpoints.db", max_age_seconds: float = 7 * 24 * 3600,
+                 metrics: Optional["PipelineMetrics"] = None):
+        self.db_file = db_file
+        self.max_age_seconds = max_age_seconds
+        self.metrics = metrics
+
+        # Tool calls run on worker threads as well as the event loop, so share one connection behind a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS generation_runs (
+                run_key TEXT PRIMARY KEY,
+                topic TEXT NOT NULL,
+                focus_areas TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                last_error TEXT
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS checkpoint_steps (
+                run_key TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                step_key TEXT NOT NULL,
+                name TEXT,
+                value BLOB NOT NULL,
+                seconds REAL NOT NULL,
+                tokens INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (run_key, kind, step_key)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(topic: str, focus_areas: Optional[List[str]], model_id: str, prompt_version: str, mode: str) -> str:
+        return _digest([normalize_topic(topic), normalize_focus_areas(focus_areas), model_id, prompt_version, mode])
+
+    def load_step(self, run_key: str, kind: str, step_key: str) -> Optional[Tuple[Any, float, int]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, seconds, tokens FROM checkpoint_steps WHERE run_key = ? AND kind = ? AND step_key = ?",
+                (run_key, kind, step_key)
+            ).fetchone()
+        # Local, self-written file: pickling keeps agno's response objects intact for replay
+        return (pickle.loads(row[0]), row[1], row[2]) if row else None
+
+    def save_step(self, run_key: str, kind: str, name: Optional[str], step_key: str, value: Any, seconds: float,
+                  tokens: int = 0) -> None:
+        try:
+            blob = pickle.dumps(value)
+        except Exception:
+            # Something that can't be stored is simply redone on resume
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO checkpoint_steps (run_key, kind, step_key, name, value, seconds, tokens, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_key, kind, step_key, name, blob, seconds, tokens, time.time())
+            )
+            self._conn.execute("UPDATE generation_runs SET updated_at = ? WHERE run_key = ?", (time.time(), run_key))
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Drop checkpoints of runs that have not been touched within the max age"""
+
+        cutoff = time.time() - self.max_age_seconds
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM checkpoint_steps WHERE run_key IN (SELECT run_key FROM generation_runs WHERE updated_at < ?)",
+                (cutoff,)
+            )
+            removed = self._conn.execute("DELETE FROM generation_runs WHERE updated_at < ?", (cutoff,)).rowcount
+            self._conn.commit()
+        return removed
+
+    @contextmanager
+    def run(self, topic: str, focus_areas: Optional[List[str]], model_id: str, prompt_version: str,
+            mode: str) -> Iterator[CheckpointRun]:
+        """Checkpoint every model and tool step inside the block, resuming an unfinished earlier attempt"""
+
+        self.purge_expired()
+        run_key = self.make_key(topic, focus_areas, model_id, prompt_version, mode)
+        now = time.time()
+        with self._lock:
+            saved_steps = self._conn.execute(
+                "SELECT COUNT(*) FROM checkpoint_steps WHERE run_key = ?", (run_key,)
+            ).fetchone()[0]
+            self._conn.execute(
+                "INSERT INTO generation_runs (run_key, topic, focus_areas, mode, status, attempts, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'running', 1, ?, ?) ON CONFLICT(run_key) DO UPDATE SET "
+                "status = 'running', attempts = attempts + 1, updated_at = excluded.updated_at, last_error = NULL",
+                (run_key, topic, json.dumps(normalize_focus_areas(focus_areas)), mode, now, now)
+            )
+            self._conn.commit()
+
+        run = CheckpointRun(self, run_key, saved_steps)
+        if run.resumed:
+            print(f"⏯️  Resuming '{topic}' from its last checkpoint ({saved_steps} saved steps)")
+        token = _active_run.set(run)
+        error = None
+        try:
+            yield run
+        except BaseException as e:
+            error = str(e)[:500] or type(e).__name__
+            raise
+        finally:
+            try:
+                _active_run.reset(token)
+            except ValueError:
+                _active_run.set(None)
+            self._finish(run, topic, error)
+
+    def _finish(self, run: CheckpointRun, topic: str, error: Optional[str]) -> None:
+        with self._lock:
+            if run.completed:
+                # The finished paper lives in the result cache; its steps are no longer needed
+                self._conn.execute("DELETE FROM checkpoint_steps WHERE run_key = ?", (run.run_key,))
+                self._conn.execute("UPDATE generation_runs SET status = 'completed', updated_at = ? WHERE run_key = ?",
+                                   (time.time(), run.run_key))
+            else:
+                # The last model response is what the run ended on (e.g. an answer that didn't parse as a paper).
+                # The next attempt sends the same messages, so replaying it would fail the same way every time
+                self._conn.execute(
+                    "DELETE FROM checkpoint_steps WHERE run_key = ? AND kind = 'model' AND step_key = ("
+                    "SELECT step_key FROM checkpoint_steps WHERE run_key = ? AND kind = 'model' "
+                    "ORDER BY created_at DESC LIMIT 1)",
+                    (run.run_key, run.run_key)
+                )
+                self._conn.execute(
+                    "UPDATE generation_runs SET status = 'failed', last_error = ?, updated_at = ? WHERE run_key = ?",
+                    (error or "no paper was produced", time.time(), run.run_key)
+                )
+            self._conn.commit()
+
+        if run.resumed:
+            report = run.report()
+            print(f"⏭️  Resumed run skipped {report['skipped_model_calls']} model calls "
+                  f"({report['skipped_tokens']:,} tokens) and {report['skipped_tool_calls']} tool calls, "
+                  f"~{report['skipped_seconds']:.1f}s of work")
+            if self.metrics is not None:
+                self.metrics.record("checkpoint_resume", report["skipped_seconds"], topic,
+                                    status="ok" if run.completed else "error", **report)
+
+    def instrument_model(self, model: Any) -> Any:
+        """Replay checkpointed provider responses (generation and reasoning) and checkpoint new ones"""
+
+        if getattr(model, "_checkpoints_instrumented", False):
+            return model
+        invoke, ainvoke = model.invoke, model.ainvoke
+
+        def step_key(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+            messages = kwargs.get("messages", args[0] if args else [])
+            return model_call_key(messages, kwargs.get("response_format"), kwargs.get("tools"))
+
+        def record(run: CheckpointRun, key: str, response: Any, start: float) -> None:
+            usage = getattr(response, "response_usage", None)
+            tokens = (getattr(usage, "input_tokens", 0) or 0) + (getattr(usage, "output_tokens", 0) or 0)
+            run.record("model", getattr(model, "id", None), key, response, time.perf_counter() - start, tokens)
+
+        def checkpointed_invoke(*args, **kwargs):
+            run = _active_run.get()
+            if run is None:
+                return invoke(*args, **kwargs)
+            key = step_key(args, kwargs)
+            response = run.replay("model", key)
+            if response is None:
+                start = time.perf_counter()
+                response = invoke(*args, **kwargs)
+                record(run, key, response, start)
+            return response
+
+        async def checkpointed_ainvoke(*args, **kwargs):
+            run = _active_run.get()
+            if run is None:
+                return await ainvoke(*args, **kwargs)
+            key = step_key(args, kwargs)
+            response = run.replay("model", key)
+            if response is None:
+                start = time.perf_counter()
+                response = await ainvoke(*args, **kwargs)
+                record(run, key, response, start)
+            return response
+
+        model.invoke = checkpointed_invoke
+        model.ainvoke = checkpointed_ainvoke
+        model._checkpoints_instrumented = True
+        return model
+
+    def tool_hook(self, function_name: str, function_call: Callable, arguments: Dict[str, Any]) -> Any:
+        """agno tool hook that replays checkpointed search, paper and reasoning tool results"""
+
+        run = _active_run.get()
+        if run is None:
+            return function_call(**arguments)
+        key = _digest([function_name, arguments])
+        result = run.replay("tool", key)
+        if result is not None:
+            # The tool itself doesn't run, so its results are added to the run's collected sources here
+            record_tool_sources(result, str(arguments.get("query", "")), function_name)
+            return result
+        start = time.perf_counter()
+        result = function_call(**arguments)
+        # Failed calls are retried on resume rather than replayed
+        if result is not None and not (isinstance(result, str) and result.startswith("Error")):
+            run.record("tool", function_name, key, result, time.perf_counter() - start)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Runs per status plus the checkpointed steps and bytes waiting to be resumed"""
+
+        with self._lock:
+            runs = dict(self._conn.execute("SELECT status, COUNT(*) FROM generation_runs GROUP BY status").fetchall())
+            steps, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM checkpoint_steps"
+            ).fetchone()
+        return {"runs": runs, "steps": steps, "bytes": size}
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Runs that failed or were interrupted and will resume on their next attempt"""
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.topic, r.focus_areas, r.mode, r.status, r.attempts, r.updated_at, r.last_error, "
+                "(SELECT COUNT(*) FROM checkpoint_steps s WHERE s.run_key = r.run_key) "
+                "FROM generation_runs r WHERE r.status != 'completed' ORDER BY r.updated_at DESC"
+            ).fetchall()
+        keys = ("topic", "focus_areas", "mode", "status", "attempts", "updated_at", "last_error", "saved_steps")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def discard(self, topic: str, focus_areas: Optional[List[str]] = None) -> int:
+        """Drop the checkpoints of a topic so its next run starts from scratch"""
+
+        with self._lock:
+            run_keys = [row[0] for row in self._conn.execute(
+                "SELECT run_key, focus_areas FROM generation_runs WHERE topic = ?", (topic,)
+            ) if focus_areas is None or row[1] == json.dumps(normalize_focus_areas(focus_areas))]
+            for run_key in run_keys:
+                self._conn.execute("DELETE FROM checkpoint_steps WHERE run_key = ?", (run_key,))
+                self._conn.execute("DELETE FROM generation_runs WHERE run_key = ?", (run_key,))
+            self._conn.commit()
+        return len(run_keys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or discard generation checkpoints")
+    parser.add_argument("command", choices=["pending", "stats", "discard", "purge"])
+    parser.add_argument("--db-file", default="./research_checkpoints.db", help="Checkpoint database")
+    parser.add_argument("--topic", help="Topic to discard (discard only)")
+    args = parser.parse_args()
+
+    store = CheckpointStore(db_file=args.db_file)
+    if args.command == "pending":
+        for run in store.pending():
+            print(f"⏸️  {run['topic']} [{run['mode']}] {run['status']} after {run['attempts']} attempt(s), "
+                  f"{run['saved_steps']} saved steps: {run['last_error']}")
+    elif args.command == "stats":
+        print(f"📊 {store.stats()}")
+    elif args.command == "discard":
+        if not args.topic:
+            parser.error("discard needs --topic")
+        print(f"🗑️  Discarded {store.discard(args.topic)} run(s) for: {args.topic}")
+    else:
+        print(f"🗑️  Purged {store.purge_expired()} expired run(s)")
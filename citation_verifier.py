@@ -0,0 +1,518 @@
+import argparse
+import re
+import time
+import unicodedata
+from datetime import datetime
+from itertools import chain
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from context_budget import STOPWORDS, WORD_PATTERN, normalize_url
+from reference_index import normalize_title, parse_reference
+from research_bundle import BundleSource
+from router import PAPER_SECTIONS
+
+if TYPE_CHECKING:
+    from pipeline_metrics import PipelineMetrics
+    from router import ResearchPaper
+
+# "(Smith et al., 2023)", "(Smith & Lee, 2021; Chen, 2020a)", "(see Smith et al. 2023)"
+PARENTHETICAL_CITATION_PATTERN = re.compile(r"\(([^()]{0,300}?\b(?:19|20)\d{2}[a-z]?)\)")
+# "Smith et al. (2023) show ...", "Smith and Lee (2021) find ..."
+NARRATIVE_CITATION_PATTERN = re.compile(
+    r"\b([^\W\d_][\w'’\-]*)(?:\s+et\s+al\.?|\s+(?:and|&)\s+[^\W\d_][\w'’\-]*)?\s+\(((?:19|20)\d{2})[a-z]?\)"
+)
+CITATION_YEAR_PATTERN = re.compile(r"\b((?:19|20)\d{2})[a-z]?\b")
+NAME_PATTERN = re.compile(r"[^\W\d_][\w'’\-]*")
+# Sentence ends, except after the abbreviations citations and academic prose are full of
+SENTENCE_END_PATTERN = re.compile(
+    r"(?<=[.!?])(?<!\bal\.)(?<!e\.g\.)(?<!i\.e\.)(?<!\bvs\.)(?<!\bFig\.)(?<!\bcf\.)\s+(?=[\"“(\[]?[A-Z0-9])"
+)
+
+# Words inside a citation's parentheses that are not author names
+CITATION_FILLERS = {"see", "e", "g", "eg", "i", "ie", "cf", "also", "for", "example", "et", "al", "and", "in", "n", "d"}
+
+# Consecutive content words per shingle: long enough that shared shingles mean shared phrasing
+SHINGLE_WORDS = 3
+SHINGLE_PRIME = np.uint64(1_000_003)
+# Sentences scored against every passage at once; bounds the score matrix at BLOCK x passages
+BLOCK_SENTENCES = 64
+# Passages of the cited source that get the (exact) phrase comparison
+PHRASE_CANDIDATES = 3
+# Share of the support score from content-word overlap; the rest is from shared phrasing
+TERM_WEIGHT = 0.7
+MAX_PASSAGE_CHARS = 300
+
+class Citation(BaseModel):
+    """One "(Author et al., Year)" citation as written in the paper"""
+    text: str
+    surname: str
+    year: Optional[int] = None
+
+class CitedSentence(BaseModel):
+    """A sentence of the paper with its citations; `claim` is the sentence without them"""
+    section: str
+    sentence: str
+    claim: str
+    citations: List[Citation]
+
+class CitationCheck(BaseModel):
+    """How well the best passage of the cited source supports one cited sentence"""
+    section: str
+    sentence: str
+    citation: str
+    status: str  # supported, weak, unsupported or not_retrieved
+    score: float
+    term_overlap: float
+    phrase_overlap: float
+    source_title: Optional[str] = None
+    source_url: Optional[str] = None
+    passage: Optional[str] = None
+
+class ReferenceCheck(BaseModel):
+    """Whether one entry of the paper's references was among the retrieved sources"""
+    reference: str
+    retrieved: bool
+    matched_by: Optional[str] = None
+    source_title: Optional[str] = None
+
+class CitationReport(BaseModel):
+    """Result of verifying one paper's citations and references against the retrieved sources"""
+    topic: Optional[str] = None
+    created_at: str
+    sources: int
+    passages: int
+    sentences: int
+    seconds: float
+    citations: List[CitationCheck] = Field(default_factory=list)
+    references: List[ReferenceCheck] = Field(default_factory=list)
+
+    def counts(self) -> Dict[str, int]:
+        counts = {"supported": 0, "weak": 0, "unsupported": 0, "not_retrieved": 0}
+        for check in self.citations:
+            counts[check.status] += 1
+        counts["references_not_retrieved"] = sum(not check.retrieved for check in self.references)
+        return counts
+
+    @property
+    def flagged(self) -> List[CitationCheck]:
+        return [check for check in self.citations if check.status in ("unsupported", "not_retrieved")]
+
+def _name_key(name: str) -> str:
+    """ASCII lower-case letters only, so "Müller" in a citation matches "Muller" in an author list"""
+
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z]", "", ascii_name.lower())
+
+def source_surnames(authors: Optional[str]) -> List[str]:
+    """Surname keys of an author string such as "Jane Smith, B. Lee and Carlos Ruiz" """
+
+    keys = []
+    for name in re.split(r"\s*(?:[,;&]|\band\b)\s*", authors or ""):
+        words = [word for word in NAME_PATTERN.findall(name) if _name_key(word) not in CITATION_FILLERS]
+        if words:
+            keys.append(_name_key(words[-1]))
+    return [key for key in keys if key]
+
+def parse_citations(sentence: str) -> List[Citation]:
+    """Every parenthetical and narrative author-year citation in a sentence"""
+
+    citations = []
+    for match in PARENTHETICAL_CITATION_PATTERN.finditer(sentence):
+        for part in match.group(1).split(";"):
+            year = CITATION_YEAR_PATTERN.search(part)
+            names = [word for word in NAME_PATTERN.findall(part[:year.start()] if year else "")
+                     if word[0].isupper() and _name_key(word) not in CITATION_FILLERS]
+            if year and names:
+                citations.append(Citation(text=part.strip(), surname=names[0], year=int(year.group(1))))
+    for match in NARRATIVE_CITATION_PATTERN.finditer(sentence):
+        if match.group(1)[0].isupper() and _name_key(match.group(1)) not in CITATION_FILLERS:
+            citations.append(Citation(text=match.group(0), surname=match.group(1), year=int(match.group(2))))
+    return citations
+
+def split_sentences(text: str) -> List[str]:
+    sentences = []
+    for line in text.splitlines():
+        # Markdown headings, bullets and numbering are not part of the sentence
+        line = re.sub(r"^\s*(?:#+|[-*+]|\d+[.)])\s+", "", line).strip()
+        if line:
+            sentences.extend(part.strip() for part in SENTENCE_END_PATTERN.split(line) if part.strip())
+    return sentences
+
+def cited_sentences(text: str, section: str = "") -> List[CitedSentence]:
+    """Sentences of `text` that cite something, each with its citations parsed"""
+
+    results = []
+    for sentence in split_sentences(text):
+        citations = parse_citations(sentence)
+        if citations:
+            claim = PARENTHETICAL_CITATION_PATTERN.sub("", NARRATIVE_CITATION_PATTERN.sub("", sentence))
+            results.append(CitedSentence(section=section, sentence=sentence, claim=claim, citations=citations))
+    return results
+
+def paper_citations(paper: "ResearchPaper") -> List[CitedSentence]:
+    sections = ["abstract", *PAPER_SECTIONS]
+    return list(chain.from_iterable(cited_sentences(getattr(paper, section), section) for section in sections))
+
+def _stem(word: str) -> str:
+    # Plurals only: cheap, and enough for "models"/"model" without merging unrelated words
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+def _unique(values: np.ndarray) -> np.ndarray:
+    # Sort-based; np.unique's hash table is several times slower on millions of int64 keys
+    values = np.sort(values)
+    return values[np.concatenate(([True], values[1:] != values[:-1]))] if len(values) else values
+
+def _ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Indices start..start+length of every (start, length) pair, concatenated"""
+
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.arange(total) + np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+
+def _shingles(ids: np.ndarray, offsets: np.ndarray, size: int = SHINGLE_WORDS) -> Tuple[np.ndarray, np.ndarray]:
+    """Hashes of each text's runs of `size` consecutive terms, sorted and unique per text, with per-text offsets"""
+
+    texts = len(offsets) - 1
+    if len(ids) < size:
+        return np.zeros(0, dtype=np.uint64), np.zeros(texts + 1, dtype=np.int64)
+    owner = np.repeat(np.arange(texts), np.diff(offsets))
+    starts = np.arange(len(ids) - size + 1)
+    starts = starts[owner[starts] == owner[starts + size - 1]]
+    hashes = np.zeros(len(starts), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for k in range(size):
+            hashes = hashes * SHINGLE_PRIME + ids[starts + k].astype(np.uint64)
+    owner = owner[starts]
+    order = np.lexsort((hashes, owner))
+    hashes, owner = hashes[order], owner[order]
+    keep = np.ones(len(hashes), dtype=bool)
+    keep[1:] = (hashes[1:] != hashes[:-1]) | (owner[1:] != owner[:-1])
+    hashes, owner = hashes[keep], owner[keep]
+    return hashes, np.searchsorted(owner, np.arange(texts + 1))
+
+class PassageIndex:
+    """Inverted index and shingle sketches over every passage of the retrieved sources
+
+    Passages are stored in source order, so each source's passages are one contiguous range of passage ids.
+    """
+
+    UNKNOWN = -2  # a content word no passage contains
+    SKIPPED = -1  # a stopword
+
+    def __init__(self, sources: Sequence[BundleSource]):
+        self.sources = list(sources)
+        self.passages = [passage for source in self.sources for passage in source.passages]
+        counts = [len(source.passages) for source in self.sources]
+        self.source_start = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        self.passage_source = np.repeat(np.arange(len(self.sources)), counts)
+
+        self._terms: Dict[str, int] = {}
+        self._word_terms: Dict[str, int] = {}
+        self._building = True
+        ids, offsets = self.encode(self.passages)
+        self._building = False
+
+        # Postings: for each term, the sorted ids of the passages containing it
+        size = max(len(self.passages), 1)
+        owner = np.repeat(np.arange(len(self.passages)), np.diff(offsets))
+        pairs = _unique(ids * size + owner)
+        self._postings = pairs % size
+        self._indptr = np.searchsorted(pairs // size, np.arange(len(self._terms) + 1))
+        # Forward index: sorted (passage, term) keys, for scoring a sentence against a few chosen passages
+        self._forward = _unique(owner * max(len(self._terms), 1) + ids)
+        self.idf = np.log1p(size / np.maximum(np.diff(self._indptr), 1))
+        self.unknown_idf = float(np.log1p(size))
+        self._shingles, self._shingle_offsets = _shingles(ids, offsets)
+
+        self._by_surname: Dict[str, List[int]] = {}
+        for i, source in enumerate(self.sources):
+            for key in source_surnames(source.authors):
+                self._by_surname.setdefault(key, []).append(i)
+
+    @property
+    def size(self) -> int:
+        return len(self.passages)
+
+    @property
+    def terms(self) -> int:
+        return len(self._terms)
+
+    def _word_term(self, word: str) -> int:
+        if word in STOPWORDS or len(word) < 2:
+            return self.SKIPPED
+        term = _stem(word)
+        if term not in self._terms:
+            if not self._building:
+                return self.UNKNOWN
+            self._terms[term] = len(self._terms)
+        return self._terms[term]
+
+    def encode(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Term ids of all texts concatenated (stopwords dropped, unseen words UNKNOWN), and each text's offsets"""
+
+        words_per_text = [WORD_PATTERN.findall(text.lower()) for text in texts]
+        words = list(chain.from_iterable(words_per_text))
+        for word in set(words).difference(self._word_terms):
+            self._word_terms[word] = self._word_term(word)
+        ids = np.fromiter(map(self._word_terms.__getitem__, words), dtype=np.int64, count=len(words))
+        owner = np.repeat(np.arange(len(texts)), [len(w) for w in words_per_text])
+        keep = ids != self.SKIPPED
+        return ids[keep], np.searchsorted(owner[keep], np.arange(len(texts) + 1))
+
+    def _weighted_terms(self, ids: np.ndarray, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Each text's distinct terms (grouped by text) with IDF weights summing to 1 per text"""
+
+        texts, width = len(offsets) - 1, len(self._terms) + 2
+        owner = np.repeat(np.arange(texts), np.diff(offsets))
+        keys = _unique(owner * width + ids + 2)
+        owner, terms = keys // width, keys % width - 2
+        weights = np.where(terms >= 0, self.idf[np.maximum(terms, 0)], self.unknown_idf)
+        weights /= np.maximum(np.bincount(owner, weights, minlength=texts), 1e-12)[owner]
+        return owner, terms, weights
+
+    def pair_overlap(self, ids: np.ndarray, offsets: np.ndarray, texts: np.ndarray,
+                     passages: np.ndarray) -> np.ndarray:
+        """term_overlap for chosen (text, passage) pairs only, looked up in the forward index"""
+
+        owner, terms, weights = self._weighted_terms(ids, offsets)
+        starts = np.searchsorted(owner, np.arange(len(offsets)))
+        lengths = starts[texts + 1] - starts[texts]
+        picked = _ranges(starts[texts], lengths)
+        terms, weights = terms[picked], weights[picked]
+        keys = np.repeat(passages, lengths) * max(len(self._terms), 1) + np.maximum(terms, 0)
+        positions = np.minimum(np.searchsorted(self._forward, keys), max(len(self._forward) - 1, 0))
+        found = (terms >= 0) & (self._forward[positions] == keys) if len(self._forward) else np.zeros(len(keys), bool)
+        return np.bincount(np.repeat(np.arange(len(texts)), lengths), weights * found, minlength=len(texts))
+
+    def term_overlap(self, ids: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+        """(texts x passages) share of each text's IDF-weighted content words that occur in each passage"""
+
+        texts = len(offsets) - 1
+        owner, terms, weights = self._weighted_terms(ids, offsets)
+        known = terms >= 0
+        terms, owner, weights = terms[known], owner[known], weights[known]
+        lengths = self._indptr[terms + 1] - self._indptr[terms]
+        passages = self._postings[_ranges(self._indptr[terms], lengths)]
+        cells = np.repeat(owner, lengths) * self.size + passages
+        return np.bincount(cells, np.repeat(weights, lengths), minlength=texts * self.size).reshape(texts, self.size)
+
+    def phrase_overlap(self, shingles: np.ndarray, passage: int) -> float:
+        """Share of a text's (sorted, unique) shingles that also occur in a passage"""
+
+        sketch = self._shingles[self._shingle_offsets[passage]:self._shingle_offsets[passage + 1]]
+        if not len(shingles) or not len(sketch):
+            return 0.0
+        positions = np.minimum(np.searchsorted(sketch, shingles), len(sketch) - 1)
+        return float(np.mean(sketch[positions] == shingles))
+
+    def resolve(self, citation: Citation) -> List[int]:
+        """Sources whose authors include the cited surname, published within a year of the cited year"""
+
+        return [i for i in self._by_surname.get(_name_key(citation.surname), [])
+                if citation.year is None or self.sources[i].year is None
+                or abs(self.sources[i].year - citation.year) <= 1]
+
+    def source_passages(self, sources: List[int]) -> np.ndarray:
+        return np.concatenate([np.arange(self.source_start[i], self.source_start[i + 1]) for i in sources]) \
+            if sources else np.zeros(0, dtype=np.int64)
+
+class CitationVerifier:
+    """Checks every cited sentence of a paper against the passages of the sources retrieved while researching it"""
+
+    def __init__(self, support_threshold: float = 0.5, weak_threshold: float = 0.3,
+                 report_dir: Optional[str] = "./citation_reports", metrics: Optional["PipelineMetrics"] = None):
+        self.support_threshold = support_threshold
+        self.weak_threshold = weak_threshold
+        self.report_dir = report_dir
+        self.metrics = metrics
+
+    def _status(self, score: float) -> str:
+        if score >= self.support_threshold:
+            return "supported"
+        return "weak" if score >= self.weak_threshold else "unsupported"
+
+    def check_sentences(self, sentences: Sequence[CitedSentence], index: PassageIndex) -> List[CitationCheck]:
+        """Find the best-supporting passage of the cited source for every citation of every sentence
+
+        Citations of retrieved sources are scored against that source's passages, all in one pass over the
+        forward index. The rest are scored against every passage through the inverted index, in blocks of
+        sentences, so the report can point at what the sentence should have cited.
+        """
+
+        if not index.size or not index.terms:
+            # Nothing to score against (e.g. only title-only search results): no citation can be supported
+            empty = np.zeros(0, dtype=np.int64)
+            return [self._check(sentence, citation, index, empty, np.zeros(0), empty, False)
+                    for sentence in sentences for citation in sentence.citations]
+
+        ids, offsets = index.encode([sentence.claim for sentence in sentences])
+        shingles, shingle_offsets = _shingles(ids, offsets)
+        cited = [[index.source_passages(index.resolve(citation)) for citation in sentence.citations]
+                 for sentence in sentences]
+
+        pair_texts = [np.full(len(passages), i) for i, per_citation in enumerate(cited) for passages in per_citation]
+        pair_passages = [passages for per_citation in cited for passages in per_citation]
+        pair_scores = index.pair_overlap(ids, offsets, np.concatenate(pair_texts or [[]]).astype(np.int64),
+                                         np.concatenate(pair_passages or [[]]).astype(np.int64))
+
+        anywhere: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        unresolved = [i for i, per_citation in enumerate(cited) if any(not len(p) for p in per_citation)]
+        for block in range(0, len(unresolved) if index.size else 0, BLOCK_SENTENCES):
+            rows = np.asarray(unresolved[block:block + BLOCK_SENTENCES])
+            lengths = offsets[rows + 1] - offsets[rows]
+            scores = index.term_overlap(ids[_ranges(offsets[rows], lengths)], np.concatenate(([0], np.cumsum(lengths))))
+            top = np.argpartition(-scores, min(PHRASE_CANDIDATES, index.size) - 1, axis=1)[:, :PHRASE_CANDIDATES]
+            for position, row in enumerate(rows):
+                anywhere[int(row)] = (top[position], scores[position, top[position]])
+
+        checks, cursor = [], 0
+        for i, sentence in enumerate(sentences):
+            sketch = shingles[shingle_offsets[i]:shingle_offsets[i + 1]]
+            for citation, passages in zip(sentence.citations, cited[i]):
+                if len(passages):
+                    scores = pair_scores[cursor:cursor + len(passages)]
+                    cursor += len(passages)
+                    checks.append(self._check(sentence, citation, index, passages, scores, sketch, True))
+                else:
+                    passages, scores = anywhere.get(i, (np.zeros(0, dtype=np.int64), np.zeros(0)))
+                    checks.append(self._check(sentence, citation, index, passages, scores, sketch, False))
+        return checks
+
+    def _check(self, sentence: CitedSentence, citation: Citation, index: PassageIndex, passages: np.ndarray,
+               scores: np.ndarray, sketch: np.ndarray, retrieved: bool) -> CitationCheck:
+        best, best_terms, best_phrase, best_score = None, 0.0, 0.0, 0.0
+        for position in np.argsort(-scores, kind="stable")[:PHRASE_CANDIDATES]:
+            passage = int(passages[position])
+            terms, phrase = float(scores[position]), index.phrase_overlap(sketch, passage)
+            score = TERM_WEIGHT * terms + (1 - TERM_WEIGHT) * phrase
+            if best is None or score > best_score:
+                best, best_terms, best_phrase, best_score = passage, terms, phrase, score
+
+        source = index.sources[int(index.passage_source[best])] if best is not None else None
+        passage = index.passages[best] if best is not None else None
+        return CitationCheck(
+            section=sentence.section,
+            sentence=sentence.sentence,
+            citation=citation.text,
+            status=self._status(best_score) if retrieved else "not_retrieved",
+            score=round(best_score, 3),
+            term_overlap=round(best_terms, 3),
+            phrase_overlap=round(best_phrase, 3),
+            source_title=source.title if source else None,
+            source_url=source.url if source else None,
+            passage=passage[:MAX_PASSAGE_CHARS] if passage else None
+        )
+
+    def check_references(self, references: Sequence[str], index: PassageIndex) -> List[ReferenceCheck]:
+        """Match each reference entry to a retrieved source by DOI, arXiv ID, URL, title, then first author and year"""
+
+        by_key: Dict[str, int] = {}
+        for i, source in enumerate(index.sources):
+            keys = [f"doi:{source.doi}" if source.doi else None,
+                    f"arxiv:{source.arxiv_id}" if source.arxiv_id else None,
+                    f"url:{normalize_url(source.url)}" if source.url else None,
+                    f"title:{normalize_title(source.title)}" if normalize_title(source.title) else None]
+            for key in keys:
+                if key:
+                    by_key.setdefault(key, i)
+
+        checks = []
+        for reference in references:
+            record = parse_reference(reference)
+            keys = [("doi", f"doi:{record.doi}" if record.doi else None),
+                    ("arxiv", f"arxiv:{record.arxiv_id}" if record.arxiv_id else None),
+                    ("url", f"url:{normalize_url(record.url)}" if record.url else None),
+                    ("title", f"title:{record.normalized_title}" if record.normalized_title else None)]
+            match = next(((kind, by_key[key]) for kind, key in keys if key and key in by_key), None)
+            if match is None and record.authors:
+                surnames = source_surnames(record.authors)
+                sources = index.resolve(Citation(text=reference, surname=surnames[0], year=record.year)) \
+                    if surnames else []
+                match = ("author_year", sources[0]) if sources else None
+            checks.append(ReferenceCheck(
+                reference=reference,
+                retrieved=match is not None,
+                matched_by=match[0] if match else None,
+                source_title=index.sources[match[1]].title if match else None
+            ))
+        return checks
+
+    def verify(self, paper: "ResearchPaper", sources: Sequence[BundleSource],
+               topic: Optional[str] = None) -> CitationReport:
+        """Index the sources, then check every cited sentence and every reference of the paper"""
+
+        start = time.perf_counter()
+        index = PassageIndex(sources)
+        sentences = paper_citations(paper)
+        report = CitationReport(
+            topic=topic,
+            created_at=datetime.now().isoformat(),
+            sources=len(index.sources),
+            passages=index.size,
+            sentences=len(sentences),
+            seconds=0.0,
+            citations=self.check_sentences(sentences, index),
+            references=self.check_references(paper.references, index)
+        )
+        report.seconds = round(time.perf_counter() - start, 3)
+        if self.metrics is not None:
+            self.metrics.record("citation_verification", report.seconds, sentences=report.sentences,
+                                passages=report.passages, **report.counts())
+        return report
+
+    def save(self, report: CitationReport, paper_path: Optional[str] = None) -> Optional[str]:
+        """Write the report next to the paper ("<paper>.citations.json"), or into report_dir"""
+
+        if paper_path is not None:
+            path = Path(paper_path).with_suffix(".citations.json")
+        elif self.report_dir is not None:
+            Path(self.report_dir).mkdir(parents=True, exist_ok=True)
+            safe_topic = re.sub(r"[^a-z0-9]+", "_", (report.topic or "paper").lower()).strip("_")
+            path = Path(self.report_dir) / f"citations_{safe_topic}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        else:
+            return None
+        path.write_text(report.model_dump_json(indent=2), encoding="utf-8")
+        return str(path)
+
+    @staticmethod
+    def print_summary(report: CitationReport, max_flagged: int = 5) -> None:
+        counts = report.counts()
+        print(f"🔎 Citations: {counts['supported']} supported, {counts['weak']} weak, "
+              f"{counts['unsupported']} unsupported, {counts['not_retrieved']} cite unretrieved sources "
+              f"({report.sentences} sentences vs {report.passages} passages in {report.seconds:.2f}s)")
+        for check in report.flagged[:max_flagged]:
+            print(f"   ⚠️  [{check.status}] {check.citation}: {check.sentence[:120]}")
+        if counts["references_not_retrieved"]:
+            print(f"📚 {counts['references_not_retrieved']} of {len(report.references)} references were never retrieved")
+            for check in [c for c in report.references if not c.retrieved][:max_flagged]:
+                print(f"   ⚠️  {check.reference[:120]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check a paper's citations against the sources of a research bundle")
+    parser.add_argument("bundle", help="Research bundle JSON file (its sources are what was retrieved)")
+    parser.add_argument("paper", help="Paper JSON (a ResearchPaper, e.g. from the paper cache or a run)")
+    parser.add_argument("--json", help="Also write the full report to this JSON file")
+    parser.add_argument("--show", type=int, default=5, help="Flagged citations and references to print")
+    args = parser.parse_args()
+
+    from research_bundle import ResearchBundle
+    from router import ResearchPaper
+
+    bundle = ResearchBundle.model_validate_json(Path(args.bundle).read_text(encoding="utf-8"))
+    paper = ResearchPaper.model_validate_json(Path(args.paper).read_text(encoding="utf-8"))
+    verification = CitationVerifier(report_dir=None).verify(paper, bundle.sources, bundle.topic)
+    CitationVerifier.print_summary(verification, args.show)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            f.write(verification.model_dump_json(indent=2))
+        print(f"📄 Report written to {args.json}")
@@ -0,0 +1,345 @@
+import json
+import math
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING
+from urllib.parse import urlsplit
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from pipeline_metrics import PipelineMetrics
+
+# Same rough ratio the benchmark uses; good enough to budget English prose
+CHARS_PER_TOKEN = 4
+
+DOI_PATTERN = re.compile(r"\b(10\.\d{4,9}/[^\s\"'<>]+)", re.IGNORECASE)
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Common words that would otherwise dominate relevance scores
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it", "its", "of", "on",
+    "or", "that", "the", "their", "this", "to", "with", "we", "our", "using", "based", "via",
+}
+
+# Result fields holding prose that can be scored and shortened
+TEXT_FIELDS = ("text", "summary", "highlights", "content")
+
+_research_focus: ContextVar[Tuple[str, ...]] = ContextVar("research_focus", default=())
+_collected_sources: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("collected_sources", default=None)
+
+@contextmanager
+def research_focus(topic: str, focus_areas: Optional[List[str]] = None) -> Iterator[None]:
+    """Make the topic and focus areas available to tool output compaction during a run"""
+
+    token = _research_focus.set((topic, *(focus_areas or [])))
+    try:
+        yield
+    finally:
+        try:
+            _research_focus.reset(token)
+        except ValueError:
+            # An async generator may be closed from a different context than it started in
+            _research_focus.set(())
+
+@contextmanager
+def collect_tool_sources() -> Iterator[List[Dict[str, Any]]]:
+    """Gather every search/paper result shown to the model during a run, e.g. for a research bundle"""
+
+    items: List[Dict[str, Any]] = []
+    token = _collected_sources.set(items)
+    try:
+        yield items
+    finally:
+        try:
+            _collected_sources.reset(token)
+        except ValueError:
+            _collected_sources.set(None)
+
+def record_tool_sources(output: str, query: str = "", tool: str = "tool") -> None:
+    """Add a toolkit's JSON list output to the active collector, if there is one"""
+
+    items = _collected_sources.get()
+    if items is None:
+        return
+    try:
+        results = json.loads(output)
+    except (TypeError, ValueError):
+        return
+    if isinstance(results, list):
+        items.extend({**item, "_tool": tool, "_query": query} for item in results if isinstance(item, dict))
+
+class CompactionReport(BaseModel):
+    """What one compaction pass removed from a tool result"""
+    tool: str
+    input_items: int
+    kept_items: int
+    duplicates_removed: int
+    trimmed_items: int
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def _item_tokens(item: Dict[str, Any]) -> int:
+    # Serialized as an element of the indented JSON list the toolkits return
+    return estimate_tokens(json.dumps([item], indent=4, ensure_ascii=False)) - 1
+
+def _words(text: str) -> List[str]:
+    return [w for w in WORD_PATTERN.findall(text.lower()) if w not in STOPWORDS and len(w) > 1]
+
+def _item_text(item: Dict[str, Any]) -> str:
+    parts = [str(item.get("title") or "")]
+    for field in TEXT_FIELDS:
+        value = item.get(field)
+        if isinstance(value, str):
+            parts.append(value)
+        elif isinstance(value, list):
+            parts.extend(v.get("text") or "" if isinstance(v, dict) else str(v) for v in value)
+    return "\n".join(p for p in parts if p)
+
+def normalize_url(url: str) -> str:
+    """Lower-case host without www, no scheme, query, fragment or trailing slash"""
+
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return f"{host}{parts.path.rstrip('/')}"
+
+def identity_keys(item: Dict[str, Any]) -> Set[str]:
+    """DOI, arXiv ID and URL keys that identify the same source across Exa and ArXiv results"""
+    from paper_store import parse_arxiv_id
+
+    keys: Set[str] = set()
+    urls = [str(item[k]) for k in ("url", "entry_id", "pdf_url") if item.get(k)]
+    urls += [str(link) for link in item.get("links") or []]
+
+    for value in [str(item.get("doi") or ""), *urls]:
+        match = DOI_PATTERN.search(value)
+        if match:
+            keys.add(f"doi:{match.group(1).rstrip('.').lower()}")
+
+    # Only trust arXiv-looking numbers in arXiv fields and links, not in arbitrary URLs
+    arxiv_values = [str(item["id"])] if item.get("id") and ("entry_id" in item or "pdf_url" in item) else []
+    arxiv_values += [url for url in urls if "arxiv.org" in url]
+    for value in arxiv_values:
+        try:
+            keys.add(f"arxiv:{parse_arxiv_id(value)[0]}")
+        except ValueError:
+            pass
+
+    for url in urls:
+        keys.add(f"url:{normalize_url(url)}")
+    return keys
+
+def _shingles(words: List[str], size: int = 5) -> Set[int]:
+    return {hash(tuple(words[i:i + size])) for i in range(max(0, len(words) - size + 1))}
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    # Prefer ending on a sentence, then on a word
+    sentence_end = max(cut.rfind(". "), cut.rfind(".\n"))
+    if sentence_end > max_chars // 2:
+        return cut[:sentence_end + 1] + " …"
+    return cut.rsplit(" ", 1)[0] + " …"
+
+class ContextCompactor:
+    """Deduplicate, rank and trim JSON tool results to a token budget before they reach the model"""
+
+    def __init__(self, max_tokens: int = 6000, min_item_tokens: int = 120, near_duplicate_threshold: float = 0.8,
+                 metrics: Optional["PipelineMetrics"] = None):
+        self.max_tokens = max_tokens
+        self.min_item_tokens = min_item_tokens
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.metrics = metrics
+
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.duplicates_removed = 0
+
+    def deduplicate(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop items with a known DOI/arXiv/URL key or near-identical text, keeping the richer copy"""
+
+        kept: List[Dict[str, Any]] = []
+        kept_keys: List[Set[str]] = []
+        kept_shingles: List[Set[int]] = []
+        for item in items:
+            keys = identity_keys(item)
+            shingles = _shingles(_words(_item_text(item)))
+
+            duplicate_of = None
+            for i, (other_keys, other_shingles) in enumerate(zip(kept_keys, kept_shingles)):
+                if keys & other_keys:
+                    duplicate_of = i
+                    break
+                if shingles and other_shingles:
+                    overlap = len(shingles & other_shingles) / len(shingles | other_shingles)
+                    if overlap >= self.near_duplicate_threshold:
+                        duplicate_of = i
+                        break
+
+            if duplicate_of is None:
+                kept.append(item)
+                kept_keys.append(keys)
+                kept_shingles.append(shingles)
+            else:
+                kept_keys[duplicate_of] |= keys
+                if len(_item_text(item)) > len(_item_text(kept[duplicate_of])):
+                    kept[duplicate_of] = item
+                    kept_shingles[duplicate_of] = shingles
+        return kept
+
+    @staticmethod
+    def rank(items: List[Dict[str, Any]], query_terms: List[str]) -> List[Dict[str, Any]]:
+        """Order items by BM25 relevance to the query, topic and focus areas (stable for ties)"""
+
+        if not query_terms or len(items) < 2:
+            return list(items)
+
+        documents = [Counter(_words(_item_text(item))) for item in items]
+        average_length = sum(sum(doc.values()) for doc in documents) / len(documents) or 1.0
+        document_frequency = Counter(term for doc in documents for term in set(doc))
+        terms = Counter(query_terms)
+
+        def score(doc: Counter) -> float:
+            length = sum(doc.values())
+            total = 0.0
+            for term, weight in terms.items():
+                tf = doc.get(term, 0)
+                if not tf:
+                    continue
+                idf = math.log(1 + (len(documents) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+                total += weight * idf * tf * 2.2 / (tf + 1.2 * (0.25 + 0.75 * length / average_length))
+            return total
+
+        scores = [score(doc) for doc in documents]
+        order = sorted(range(len(items)), key=lambda i: -scores[i])
+        return [items[i] for i in order]
+
+    def _shrink(self, item: Dict[str, Any], max_tokens: int, query_terms: Set[str]) -> Dict[str, Any]:
+        """Shorten an item's prose fields so the whole item fits in `max_tokens`"""
+
+        item = dict(item)
+        overhead = estimate_tokens(json.dumps({k: v for k, v in item.items() if k not in TEXT_FIELDS}, indent=4))
+        available_chars = max(0, max_tokens - overhead) * CHARS_PER_TOKEN
+
+        # Paper pages (read_arxiv_papers): keep the most relevant pages, in page order
+        pages = item.get("content")
+        if isinstance(pages, list) and pages and isinstance(pages[0], dict):
+            def page_score(page: Dict[str, Any]) -> int:
+                return sum(1 for w in _words(page.get("text") or "") if w in query_terms)
+
+            budget = available_chars - sum(len(str(item.get(f) or "")) for f in ("summary",))
+            chosen, used = [], 0
+            # Each page also costs its indented {"page": .., "text": ..} wrapper
+            page_overhead = 96
+            for page in sorted(pages, key=lambda p: (-page_score(p), p.get("page", 0))):
+                text = page.get("text") or ""
+                if used + len(text) + page_overhead > budget:
+                    text = _truncate(text, max(0, budget - used - page_overhead))
+                if text:
+                    chosen.append({**page, "text": text})
+                    used += len(text) + page_overhead
+                if used >= budget:
+                    break
+            item["content"] = sorted(chosen, key=lambda p: p.get("page", 0))
+            return item
+
+        # Search results: highlights and summaries are dense, the full text is trimmed first
+        fixed = sum(len(json.dumps(item.get(f))) for f in ("summary", "highlights") if item.get(f))
+        if isinstance(item.get("text"), str):
+            item["text"] = _truncate(item["text"], max(0, available_chars - fixed))
+        if _item_tokens(item) > max_tokens and isinstance(item.get("summary"), str):
+            item["summary"] = _truncate(item["summary"], max(0, available_chars // 2))
+        return item
+
+    def compact(self, items: List[Dict[str, Any]], query: str = "", tool: str = "tool") -> Tuple[List[Dict[str, Any]], CompactionReport]:
+        """Deduplicate, rank and trim `items` to the token budget"""
+
+        tokens_before = estimate_tokens(json.dumps(items, indent=4, ensure_ascii=False))
+        unique = self.deduplicate(items)
+        query_terms = _words(" ".join((query, *_research_focus.get())))
+        ranked = self.rank(unique, query_terms)
+
+        kept: List[Dict[str, Any]] = []
+        trimmed = 0
+        remaining = self.max_tokens
+        for item in ranked:
+            cost = _item_tokens(item)
+            if cost <= remaining:
+                kept.append(item)
+                remaining -= cost
+                continue
+            if remaining < self.min_item_tokens:
+                break
+            # Field-level estimates ignore some JSON overhead, so tighten the target if the result overshoots
+            target = remaining
+            for _ in range(3):
+                shrunk = self._shrink(item, target, set(query_terms))
+                cost = _item_tokens(shrunk)
+                if cost <= remaining:
+                    break
+                target -= cost - remaining
+            kept.append(shrunk)
+            trimmed += 1
+            remaining -= cost
+
+        tokens_after = estimate_tokens(json.dumps(kept, indent=4, ensure_ascii=False))
+        report = CompactionReport(
+            tool=tool,
+            input_items=len(items),
+            kept_items=len(kept),
+            duplicates_removed=len(items) - len(unique),
+            trimmed_items=trimmed,
+            tokens_before=tokens_before,
+            tokens_after=tokens_after
+        )
+        with self._lock:
+            self.calls += 1
+            self.tokens_before += report.tokens_before
+            self.tokens_after += report.tokens_after
+            self.duplicates_removed += report.duplicates_removed
+        return kept, report
+
+    def compact_json(self, output: str, query: str = "", tool: str = "tool") -> str:
+        """Compact a toolkit's JSON list output; anything else (e.g. "Error: ...") passes through unchanged"""
+
+        start = time.perf_counter()
+        try:
+            items = json.loads(output)
+        except (TypeError, ValueError):
+            return output
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            return output
+
+        kept, report = self.compact(items, query, tool)
+        if self.metrics is not None:
+            self.metrics.record("context_compaction", time.perf_counter() - start, tool,
+                                tokens_before=report.tokens_before, tokens_after=report.tokens_after,
+                                tokens_saved=report.tokens_saved, duplicates_removed=report.duplicates_removed)
+        return json.dumps(kept, indent=4, ensure_ascii=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return totals across every compaction so far"""
+
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "tokens_before": self.tokens_before,
+                "tokens_after": self.tokens_after,
+                "tokens_saved": self.tokens_before - self.tokens_after,
+                "duplicates_removed": self.duplicates_removed,
+            }
@@ -0,0 +1,259 @@
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+import weakref
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from agno.knowledge.embedder.base import Embedder
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def embedder_key(embedder: Embedder) -> str:
+    """Vectors are only interchangeable for the same embedder class, model and output size"""
+
+    return f"{type(embedder).__name__}:{getattr(embedder, 'id', '')}:{embedder.dimensions}"
+
+class EmbeddingCache:
+    """Embeddings keyed by (embedder, content hash): float32 rows in a memory-mapped file per embedder, indexed in SQLite"""
+
+    def __init__(self, cache_dir: str = "./research_embedding_cache"):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+        # Embedding happens from worker threads and the event loop, so share one connection behind a lock
+        self._lock = threading.Lock()
+        self._maps: Dict[str, np.memmap] = {}
+        self._conn = sqlite3.connect(str(self.cache_dir / "index.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embedding_models (
+                model TEXT PRIMARY KEY,
+                dimensions INTEGER NOT NULL,
+                file TEXT NOT NULL,
+                row_count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embedding_rows (
+                model TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                row_number INTEGER NOT NULL,
+                PRIMARY KEY (model, content_hash)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    def _model(self, model: str, dimensions: int) -> Tuple[Path, int]:
+        row = self._conn.execute(
+            "SELECT file, row_count, dimensions FROM embedding_models WHERE model = ?", (model,)
+        ).fetchone()
+        if row is None:
+            file = re.sub(r"[^A-Za-z0-9_.-]+", "_", model) + ".f32"
+            self._conn.execute(
+                "INSERT INTO embedding_models (model, dimensions, file, row_count) VALUES (?, ?, ?, 0)",
+                (model, dimensions, file)
+            )
+            return self.cache_dir / file, 0
+        if row[2] != dimensions:
+            raise ValueError(f"Embedding cache for {model} holds {row[2]}-d vectors, not {dimensions}-d")
+        return self.cache_dir / row[0], row[1]
+
+    def _vectors(self, model: str, path: Path, row_count: int, dimensions: int) -> np.memmap:
+        # Rows are append-only, so a mapping stays valid; it is only widened when newer rows are needed
+        vectors = self._maps.get(model)
+        if vectors is None or len(vectors) < row_count:
+            vectors = np.memmap(path, dtype=np.float32, mode="r", shape=(row_count, dimensions))
+            self._maps[model] = vectors
+        return vectors
+
+    def _rows(self, model: str, hashes: Sequence[str]) -> Dict[str, int]:
+        found: Dict[str, int] = {}
+        unique = list(dict.fromkeys(hashes))
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(unique), 500):
+            chunk = unique[i:i + 500]
+            found.update(self._conn.execute(
+                f"SELECT content_hash, row_number FROM embedding_rows WHERE model = ? "
+                f"AND content_hash IN ({','.join('?' * len(chunk))})", (model, *chunk)
+            ).fetchall())
+        return found
+
+    def get_many(self, model: str, dimensions: int, hashes: Sequence[str]) -> List[Optional[List[float]]]:
+        """Cached vectors in input order, None for misses"""
+
+        with self._lock:
+            path, row_count = self._model(model, dimensions)
+            found = self._rows(model, hashes)
+            if self._conn.in_transaction:
+                self._conn.commit()
+            vectors = self._vectors(model, path, row_count, dimensions) if found else None
+            self.hits += sum(1 for h in hashes if h in found)
+            self.misses += sum(1 for h in hashes if h not in found)
+        return [vectors[found[h]].tolist() if h in found else None for h in hashes]
+
+    def put_many(self, model: str, dimensions: int, items: Sequence[Tuple[str, List[float]]]) -> None:
+        """Append new vectors; ones that are empty or the wrong size (failed embeddings) are not cached"""
+
+        with self._lock:
+            # The write lock serializes appends from other processes sharing the cache
+            self._conn.execute("BEGIN IMMEDIATE")
+            path, row_count = self._model(model, dimensions)
+            known = self._rows(model, [h for h, _ in items])
+            fresh: Dict[str, List[float]] = {}
+            for h, vector in items:
+                if h not in known and h not in fresh and vector is not None and len(vector) == dimensions:
+                    fresh[h] = vector
+            if not fresh:
+                self._conn.commit()
+                return
+
+            # Vectors are written before the index points at them, so a crash only leaves unused bytes
+            with open(path, "ab") as f:
+                f.seek(row_count * dimensions * 4)
+                f.truncate()
+                f.write(np.asarray(list(fresh.values()), dtype=np.float32).tobytes())
+            self._conn.executemany(
+                "INSERT INTO embedding_rows (model, content_hash, row_number) VALUES (?, ?, ?)",
+                [(model, h, row_count + i) for i, h in enumerate(fresh)]
+            )
+            self._conn.execute("UPDATE embedding_models SET row_count = ? WHERE model = ?",
+                               (row_count + len(fresh), model))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit rate plus cached vectors and bytes per embedder"""
+
+        with self._lock:
+            models = {model: {"vectors": rows, "bytes": rows * dimensions * 4} for model, rows, dimensions in
+                      self._conn.execute("SELECT model, row_count, dimensions FROM embedding_models")}
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "models": models,
+        }
+
+class _PendingBatch:
+    """Misses from concurrent coroutines on one event loop, waiting to be embedded together"""
+
+    def __init__(self):
+        self.texts: Dict[str, str] = {}
+        self.futures: Dict[str, asyncio.Future] = {}
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+@dataclass
+class CachedEmbedder(Embedder):
+    """Embedder wrapper that serves repeated texts from an EmbeddingCache and batches the misses"""
+
+    embedder: Optional[Embedder] = None
+    cache: Optional[EmbeddingCache] = None
+    batch_size: int = 100
+    coalesce_window: float = 0.01
+    embed_calls: int = 0
+    embedded_texts: int = 0
+    _pending: Any = field(default_factory=weakref.WeakKeyDictionary, repr=False)
+
+    def __post_init__(self):
+        if self.embedder is None:
+            from agno.knowledge.embedder.openai import OpenAIEmbedder
+            self.embedder = OpenAIEmbedder()
+        self.cache = self.cache or EmbeddingCache()
+        self.dimensions = self.embedder.dimensions
+        self.model = embedder_key(self.embedder)
+
+    def _store(self, texts: List[str], vectors: List[List[float]]) -> List[List[float]]:
+        self.embed_calls += 1
+        self.embedded_texts += len(texts)
+        # Round to float32 like the cache does, so a text gets the same vector whether it was a hit or a miss
+        vectors = [np.asarray(v, dtype=np.float32).tolist() if v else v for v in vectors]
+        self.cache.put_many(self.model, self.dimensions, [(content_hash(t), v) for t, v in zip(texts, vectors)])
+        return vectors
+
+    def _embed_misses(self, texts: List[str]) -> List[List[float]]:
+        if hasattr(self.embedder, "get_embeddings_batch"):
+            vectors = self.embedder.get_embeddings_batch(texts, batch_size=self.batch_size)
+        else:
+            vectors = [self.embedder.get_embedding(text) for text in texts]
+        return self._store(texts, vectors)
+
+    def get_embeddings_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        """Embed a list of texts, sending only uncached, de-duplicated texts in batches of `batch_size`"""
+
+        hashes = [content_hash(text) for text in texts]
+        results = self.cache.get_many(self.model, self.dimensions, hashes)
+        misses = list(dict.fromkeys(text for text, vector in zip(texts, results) if vector is None))
+        size = batch_size or self.batch_size
+        embedded: Dict[str, List[float]] = {}
+        for i in range(0, len(misses), size):
+            batch = misses[i:i + size]
+            embedded.update(zip(batch, self._embed_misses(batch)))
+        return [vector if vector is not None else embedded[text] for text, vector in zip(texts, results)]
+
+    def get_embedding(self, text: str) -> List[float]:
+        return self.get_embeddings_batch([text])[0]
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self.get_embedding(text), None
+
+    async def _embed_pending(self, batch: _PendingBatch) -> None:
+        texts = list(batch.texts.values())
+        try:
+            if hasattr(self.embedder, "async_get_embeddings_batch"):
+                vectors = await self.embedder.async_get_embeddings_batch(texts, batch_size=self.batch_size)
+            else:
+                vectors = await asyncio.gather(*(self.embedder.async_get_embedding(text) for text in texts))
+            vectors = await asyncio.to_thread(self._store, texts, vectors)
+        except Exception as e:
+            for future in batch.futures.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, vector in zip(batch.texts, vectors):
+            if not batch.futures[key].done():
+                batch.futures[key].set_result(vector)
+
+    def _flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        batch = self._pending.pop(loop, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        loop.create_task(self._embed_pending(batch))
+
+    async def async_get_embedding(self, text: str) -> List[float]:
+        key = content_hash(text)
+        cached = self.cache.get_many(self.model, self.dimensions, [key])[0]
+        if cached is not None:
+            return cached
+
+        # Concurrent misses (agno embeds every document of an insert at once) share one batched request
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(loop)
+        if batch is None:
+            batch = self._pending[loop] = _PendingBatch()
+            batch.timer = loop.call_later(self.coalesce_window, self._flush, loop)
+        future = batch.futures.get(key)
+        if future is None:
+            future = batch.futures[key] = loop.create_future()
+            batch.texts[key] = text
+            if len(batch.texts) >= self.batch_size:
+                self._flush(loop)
+        return await asyncio.shield(future)
+
+    async def async_get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return await self.async_get_embedding(text), None
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache hit rate plus how many embedding requests and texts actually reached the embedder"""
+
+        return {**self.cache.stats(), "embed_calls": self.embed_calls, "embedded_texts": self.embedded_texts}
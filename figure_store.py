@@ -0,0 +1,425 @@
+import argparse
+import base64
+import hashlib
+import io
+import mimetypes
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+from pydantic import BaseModel, Field, PrivateAttr
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from PIL import Image
+    from pdf_parsing import ParsedPage
+
+# 64-bit pHash: the 8x8 lowest frequencies of a 32x32 DCT, each compared with their median
+HASH_SIZE = 8
+HASH_IMAGE_SIZE = 32
+# Near-duplicates must also have about the same shape (log aspect ratio)
+MAX_ASPECT_DIFFERENCE = 0.1
+
+CAPTION_PROMPT = (
+    "Describe this figure from a document for someone who cannot see it: what kind of figure it is, what it shows, "
+    "and any labels, numbers or trends it contains. Answer in at most five sentences."
+)
+
+class StoredFigure(BaseModel):
+    """One distinct image: its canonical file and its cached caption"""
+    image_hash: str
+    sha256: str
+    image_path: str
+    width: int
+    height: int
+    size: int
+    caption: Optional[str] = None
+    caption_source: Optional[str] = None  # "parser" or "captioner"
+    first_seen: str
+
+class Figure(BaseModel):
+    """A distinct figure of a document, with every page it appears on"""
+    image_hash: str
+    image_path: str
+    caption: str = ""
+    pages: List[int] = Field(default_factory=list)
+    occurrences: int = 1
+
+class FigureReport(BaseModel):
+    """What one processing pass over a document's images did"""
+    images: int = 0
+    unique_images: int = 0
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+    missing_files: int = 0
+    decorative: int = 0
+    boilerplate: int = 0
+    captions_cached: int = 0
+    captions_from_parser: int = 0
+    captions_generated: int = 0
+    bytes_removed: int = 0
+    seconds: float = 0.0
+    figures: List[Figure] = Field(default_factory=list)
+    _parser_captioned: Set[str] = PrivateAttr(default_factory=set)
+
+    @property
+    def captions_skipped(self) -> int:
+        """Images that would have been captioned one by one and were not"""
+        return self.images - self.captions_generated
+
+def _dct_matrix(size: int) -> np.ndarray:
+    k, i = np.arange(size)[:, None], np.arange(size)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * size)) * np.sqrt(2 / size)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+_DCT = _dct_matrix(HASH_IMAGE_SIZE)
+
+def thumbnail(image: "Image.Image") -> np.ndarray:
+    """The 32x32 grayscale pixels the hash is computed from"""
+    from PIL import Image
+
+    gray = image.convert("L").resize((HASH_IMAGE_SIZE, HASH_IMAGE_SIZE), Image.Resampling.LANCZOS)
+    return np.asarray(gray, dtype=np.uint8)
+
+def perceptual_hash(image: "Image.Image") -> int:
+    """64-bit pHash: unchanged by re-encoding, rescaling and small edits, unlike a byte hash"""
+    return _hash_pixels(thumbnail(image))
+
+def _hash_pixels(pixels: np.ndarray) -> int:
+    low = (_DCT @ pixels.astype(np.float64) @ _DCT.T)[:HASH_SIZE, :HASH_SIZE].flatten()
+    # The DC term is the mean brightness, so it is left out of the median
+    bits = low > np.median(low[1:])
+    return int(np.packbits(bits).view(">u8")[0])
+
+def openai_captioner(model_id: str = "gpt-4.1-mini", api_key: Optional[str] = None) -> Callable[[str], str]:
+    """Caption an image file with an OpenAI vision model, paced by the shared small-model rate limiter"""
+    from openai import OpenAI
+    from rate_limiter import get_rate_limiter
+
+    # The rate limiter retries 429s with backoff, so the SDK's own retries are turned off
+    client = OpenAI(api_key=api_key, max_retries=0)
+    limiter = get_rate_limiter("openai_small")
+
+    def caption(image_path: str) -> str:
+        mime = mimetypes.guess_type(image_path)[0] or "image/png"
+        data = base64.b64encode(Path(image_path).read_bytes()).decode("ascii")
+        response = limiter.run(client.chat.completions.create, kwargs={
+            "model": model_id,
+            "max_tokens": 300,
+            "messages": [{"role": "user", "content": [
+                {"type": "text", "text": CAPTION_PROMPT},
+                {"type": "image_url", "image_url": {"url": f"data:{mime};base64,{data}"}},
+            ]}],
+        }, tokens=1500, usage=lambda r: getattr(getattr(r, "usage", None), "total_tokens", None))
+        return (response.choices[0].message.content or "").strip()
+
+    return caption
+
+class FigureStore:
+    """Perceptual-hash index of extracted images: one file on disk and one caption per distinct figure
+
+    Exact and near-duplicate images are collapsed onto the first copy seen, in this or any earlier run. A
+    near-duplicate is within `max_distance` bits of pHash, and no pixel of its 32x32 thumbnail differs by more
+    than `max_pixel_difference`: slides from one template hash alike, but their text blocks do not line up.
+    Images under `min_side` pixels on a side (rules, bullets, icons) and short images on `boilerplate_pages` or
+    more pages (logos, header and footer bands) are kept once but never captioned.
+    """
+
+    def __init__(self, db_file: str = "./figure_cache.db", image_dir: str = "./images", max_distance: int = 4,
+                 max_pixel_difference: int = 48, min_side: int = 32, boilerplate_pages: int = 4,
+                 boilerplate_short_side: int = 160, captioner: Optional[Callable[[str], str]] = None,
+                 max_workers: int = 4):
+        self.image_dir = Path(image_dir)
+        self.max_distance = max_distance
+        self.max_pixel_difference = max_pixel_difference
+        self.min_side = min_side
+        self.boilerplate_pages = boilerplate_pages
+        self.boilerplate_short_side = boilerplate_short_side
+        self.captioner = captioner
+        self.max_workers = max_workers
+
+        # Batch workers in separate processes share this file, so wait on locks and use WAL
+        self._conn = sqlite3.connect(db_file, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS figures (
+                image_hash TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                image_path TEXT NOT NULL,
+                width INTEGER NOT NULL,
+                height INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                thumbnail BLOB NOT NULL,
+                caption TEXT,
+                caption_source TEXT,
+                first_seen TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_figures_sha256 ON figures (sha256)")
+        self._conn.commit()
+        self._keys: List[str] = []
+        self._hashes = np.zeros(0, dtype=np.uint64)
+        self._aspects = np.zeros(0)
+        self._thumbnails = np.zeros((0, HASH_IMAGE_SIZE * HASH_IMAGE_SIZE), dtype=np.uint8)
+
+    def _load_hashes(self) -> None:
+        # Other processes may have added figures since the last pass
+        rows = self._conn.execute("SELECT image_hash, width, height, thumbnail FROM figures").fetchall()
+        self._keys = [row[0] for row in rows]
+        self._hashes = np.array([int(row[0][:16], 16) for row in rows], dtype=np.uint64)
+        self._aspects = np.array([np.log(row[1] / row[2]) for row in rows])
+        self._thumbnails = np.frombuffer(b"".join(row[3] for row in rows), dtype=np.uint8).reshape(
+            len(rows), HASH_IMAGE_SIZE * HASH_IMAGE_SIZE)
+
+    def _add_hash(self, image_hash: str, phash: int, aspect: float, pixels: np.ndarray) -> None:
+        self._keys.append(image_hash)
+        self._hashes = np.append(self._hashes, np.uint64(phash))
+        self._aspects = np.append(self._aspects, aspect)
+        self._thumbnails = np.vstack([self._thumbnails, pixels.reshape(1, -1)])
+
+    def get(self, image_hash: str) -> Optional[StoredFigure]:
+        row = self._conn.execute(
+            "SELECT image_hash, sha256, image_path, width, height, size, caption, caption_source, first_seen "
+            "FROM figures WHERE image_hash = ?", (image_hash,)
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ("image_hash", "sha256", "image_path", "width", "height", "size", "caption", "caption_source",
+                "first_seen")
+        return StoredFigure(**dict(zip(keys, row)))
+
+    def _match(self, sha256: str, phash: int, aspect: float, pixels: np.ndarray) -> Optional[str]:
+        """Stored figure with the same bytes, or else the nearest near-duplicate"""
+
+        row = self._conn.execute("SELECT image_hash FROM figures WHERE sha256 = ?", (sha256,)).fetchone()
+        if row is not None:
+            return row[0]
+        if not len(self._hashes):
+            return None
+        distances = np.bitwise_count(self._hashes ^ np.uint64(phash))
+        candidates = np.flatnonzero((distances <= self.max_distance)
+                                    & (np.abs(self._aspects - aspect) <= MAX_ASPECT_DIFFERENCE))
+        if not len(candidates):
+            return None
+        differences = np.abs(self._thumbnails[candidates].astype(np.int16) - pixels.reshape(1, -1)).max(axis=1)
+        confirmed = candidates[differences <= self.max_pixel_difference]
+        if not len(confirmed):
+            return None
+        return self._keys[int(confirmed[np.argmin(distances[confirmed])])]
+
+    def _insert(self, path: Path, sha256: str, phash: int, width: int, height: int, size: int,
+                pixels: np.ndarray) -> Tuple[str, bool]:
+        """Store a new figure keyed by its pHash, or return the figure another worker stored these bytes as
+
+        The key is claimed inside one write transaction, and the file only moved once the row is ours, so
+        workers adding figures at the same time never overwrite each other's row or file.
+        """
+        self.image_dir.mkdir(parents=True, exist_ok=True)
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute("SELECT image_hash FROM figures WHERE sha256 = ?", (sha256,)).fetchone()
+            if row is not None:
+                self._conn.commit()
+                return row[0], False
+            # A taken key with other bytes means the same pHash but different pixels: a distinct figure,
+            # kept apart by its bytes
+            base = f"{phash:016x}"
+            for image_hash in (base, f"{base}-{sha256[:8]}", f"{base}-{sha256}"):
+                target = self.image_dir / f"fig_{image_hash}{path.suffix.lower() or '.png'}"
+                inserted = self._conn.execute(
+                    "INSERT INTO figures (image_hash, sha256, image_path, width, height, size, thumbnail, "
+                    "first_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(image_hash) DO NOTHING",
+                    (image_hash, sha256, str(target), width, height, size, pixels.tobytes(),
+                     datetime.now().isoformat())
+                ).rowcount
+                if inserted:
+                    if path.resolve() != target.resolve():
+                        os.replace(path, target)
+                    self._conn.commit()
+                    return image_hash, True
+            raise ValueError(f"No free figure key for {path}")
+        except BaseException:
+            self._conn.rollback()
+            raise
+
+    def _set_caption(self, image_hash: str, caption: str, source: str) -> None:
+        self._conn.execute("UPDATE figures SET caption = ?, caption_source = ? WHERE image_hash = ?",
+                           (caption, source, image_hash))
+        self._conn.commit()
+
+    def dedupe(self, pages: List["ParsedPage"], report: Optional[FigureReport] = None) -> FigureReport:
+        """Point every image at its figure's canonical file, deleting duplicate copies from disk
+
+        Images already carrying an image_hash (e.g. from the page cache) are not read again.
+        """
+        from PIL import Image
+
+        report = report or FigureReport()
+        self._load_hashes()
+        for page in pages:
+            for image in page.images:
+                if image.image_hash is not None:
+                    continue
+                path = Path(image.image_path)
+                if not path.exists():
+                    report.missing_files += 1
+                    continue
+                data = path.read_bytes()
+                sha256 = hashlib.sha256(data).hexdigest()
+                with Image.open(io.BytesIO(data)) as img:
+                    width, height = img.size
+                    pixels = thumbnail(img)
+                phash, aspect = _hash_pixels(pixels), float(np.log(width / height))
+
+                match = self._match(sha256, phash, aspect, pixels)
+                stored = self.get(match) if match else None
+                created = False
+                if stored is None:
+                    image_hash, created = self._insert(path, sha256, phash, width, height, len(data), pixels)
+                    stored = self.get(image_hash)
+                if created:
+                    self._add_hash(stored.image_hash, phash, aspect, pixels)
+                    image.image_path, image.image_hash = stored.image_path, stored.image_hash
+                elif Path(stored.image_path).exists():
+                    if path.resolve() != Path(stored.image_path).resolve():
+                        path.unlink()
+                        report.bytes_removed += len(data)
+                    if stored.sha256 == sha256:
+                        report.exact_duplicates += 1
+                    else:
+                        report.near_duplicates += 1
+                    image.image_path, image.image_hash = stored.image_path, stored.image_hash
+                else:
+                    # The canonical file was deleted by hand: this copy takes its place
+                    self._conn.execute("UPDATE figures SET image_path = ? WHERE image_hash = ?",
+                                       (str(path), stored.image_hash))
+                    self._conn.commit()
+                    image.image_hash = stored.image_hash
+
+                # Text the parser returned with an image is its caption, for every later copy too
+                if image.text and (stored is None or not stored.caption):
+                    self._set_caption(image.image_hash, image.text, "parser")
+                    report.captions_from_parser += 1
+                    report._parser_captioned.add(image.image_hash)
+        return report
+
+    def _caption(self, figure: Figure) -> Optional[str]:
+        # A failed caption is retried on the next run rather than failing the whole document
+        try:
+            return self.captioner(figure.image_path)
+        except Exception as e:
+            print(f"⚠️  Captioning failed for {figure.image_path}: {e}")
+            return None
+
+    def _kind(self, figure: StoredFigure, pages: int) -> str:
+        if min(figure.width, figure.height) < self.min_side:
+            return "decorative"
+        if pages >= self.boilerplate_pages and min(figure.width, figure.height) <= self.boilerplate_short_side:
+            return "boilerplate"
+        return "figure"
+
+    def process(self, pages: List["ParsedPage"]) -> FigureReport:
+        """Deduplicate a document's images, caption each new figure once, and list its distinct figures"""
+
+        start = time.perf_counter()
+        report = self.dedupe(pages)
+
+        groups: "OrderedDict[str, Figure]" = OrderedDict()
+        for page in pages:
+            for image in page.images:
+                report.images += 1
+                if image.image_hash is None:
+                    continue
+                group = groups.get(image.image_hash)
+                if group is None:
+                    groups[image.image_hash] = Figure(image_hash=image.image_hash, image_path=image.image_path,
+                                                      pages=[page.page])
+                else:
+                    group.occurrences += 1
+                    if page.page not in group.pages:
+                        group.pages.append(page.page)
+        report.unique_images = len(groups)
+
+        to_caption: List[Figure] = []
+        for group in groups.values():
+            stored = self.get(group.image_hash)
+            kind = self._kind(stored, len(group.pages))
+            if kind == "decorative":
+                report.decorative += 1
+            elif kind == "boilerplate":
+                report.boilerplate += 1
+            else:
+                group.caption = stored.caption or ""
+                report.figures.append(group)
+                if not stored.caption and self.captioner is not None:
+                    to_caption.append(group)
+                elif stored.caption and group.image_hash not in report._parser_captioned:
+                    report.captions_cached += 1
+
+        if to_caption:
+            print(f"🖼️  Captioning {len(to_caption)} new figures")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                captions = list(pool.map(self._caption, to_caption))
+            for group, caption in zip(to_caption, captions):
+                if caption:
+                    group.caption = caption
+                    self._set_caption(group.image_hash, caption, "captioner")
+                    report.captions_generated += 1
+
+        captions = {figure.image_hash: figure.caption for figure in report.figures}
+        for page in pages:
+            for image in page.images:
+                if image.image_hash in captions:
+                    image.text = captions[image.image_hash]
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def stats(self) -> Dict[str, int]:
+        """Distinct figures stored, how many have captions, and their bytes on disk"""
+
+        figures, captioned, size = self._conn.execute(
+            "SELECT COUNT(*), COUNT(caption), COALESCE(SUM(size), 0) FROM figures"
+        ).fetchone()
+        return {"figures": figures, "captioned": captioned, "bytes": size}
+
+    @staticmethod
+    def print_summary(report: FigureReport) -> None:
+        print(f"🖼️  {report.images} images -> {len(report.figures)} figures "
+              f"({report.exact_duplicates} exact and {report.near_duplicates} near duplicates, "
+              f"{report.decorative} decorative, {report.boilerplate} logos/headers)")
+        print(f"💬 Captions: {report.captions_generated} generated, {report.captions_cached} cached, "
+              f"{report.captions_from_parser} from the parser; {report.captions_skipped} of {report.images} "
+              f"images not captioned again")
+        if report.bytes_removed:
+            print(f"🗑️  {report.bytes_removed / 1024:.0f} KiB of duplicate image files removed")
+
+def write_figure_markdown(figures: List[Figure], output_file: str) -> None:
+    """Save each distinct figure once, with the pages it appears on and its caption"""
+
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for figure in figures:
+            # Pages go in the alt text, so knowledge_ingest still reads only the caption as the chunk
+            pages = ", ".join(str(page) for page in figure.pages)
+            f.write(f"![Image, page{'s' if len(figure.pages) > 1 else ''} {pages}]({figure.image_path})\n\n")
+            f.write(f"{figure.caption}\n\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the figure cache")
+    parser.add_argument("command", choices=["stats", "show"], help="Cache totals, or one figure by hash")
+    parser.add_argument("image_hash", nargs="?", help="Figure hash for 'show'")
+    parser.add_argument("--db", default="./figure_cache.db", help="Figure cache database")
+    args = parser.parse_args()
+
+    store = FigureStore(db_file=args.db)
+    if args.command == "stats":
+        print(store.stats())
+    else:
+        figure = store.get(args.image_hash or "")
+        print(figure.model_dump_json(indent=2) if figure else f"No figure {args.image_hash}")
@@ -0,0 +1,523 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+from uuid import uuid4
+
+from pydantic import BaseModel, Field
+
+from batch_runner import BatchResult, TopicRequest, load_topics, run_topic
+
+if TYPE_CHECKING:
+    from router import AdvancedResearchPipelineAgent
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+STATUS_ICONS = {"queued": "⏳", "running": "🏃", "succeeded": "✅", "failed": "❌", "cancelled": "🛑"}
+
+
+class JobOptions(BaseModel):
+    """How a job's paper is generated and where it is saved"""
+    parallel_sections: bool = False
+    collect_only: bool = False
+    output_dir: str = "./generated_papers"
+
+class GenerationJob(BaseModel):
+    """A queued paper generation and everything known about its progress"""
+    id: str
+    topic: str
+    focus_areas: List[str] = Field(default_factory=list)
+    options: JobOptions = Field(default_factory=JobOptions)
+    status: str = "queued"
+    priority: int = 0
+    attempts: int = 0
+    max_attempts: int = 3
+    worker_id: Optional[str] = None
+    cancel_requested: bool = False
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    lease_expires_at: Optional[float] = None
+    filepath: Optional[str] = None
+    error: Optional[str] = None
+
+class JobQueue:
+    """Durable generation jobs in SQLite; worker processes claim them under a lease they keep renewing"""
+
+    def __init__(self, db_file: str = "./research_jobs.db", lease_seconds: float = 300.0, max_attempts: int = 3):
+        self.db_file = db_file
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+        # Every process opens its own queue. Autocommit mode lets claims take the write lock up front (BEGIN
+        # IMMEDIATE), so two workers can never claim the same job
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS generation_jobs (
+                id TEXT PRIMARY KEY,
+                topic TEXT NOT NULL,
+                focus_areas TEXT NOT NULL,
+                options TEXT NOT NULL,
+                status TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                worker_id TEXT,
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                lease_expires_at REAL,
+                filepath TEXT,
+                error TEXT
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_generation_jobs_claim ON generation_jobs (status, priority, created_at)"
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> GenerationJob:
+        values = dict(row)
+        values["focus_areas"] = json.loads(values["focus_areas"])
+        values["options"] = JobOptions.model_validate_json(values["options"])
+        values["cancel_requested"] = bool(values["cancel_requested"])
+        return GenerationJob(**values)
+
+    def submit(self, topic: str, focus_areas: Optional[List[str]] = None, options: Optional[JobOptions] = None,
+               priority: int = 0, max_attempts: Optional[int] = None) -> GenerationJob:
+        job = GenerationJob(id=uuid4().hex[:12], topic=topic, focus_areas=focus_areas or [],
+                            options=options or JobOptions(), priority=priority,
+                            max_attempts=max_attempts or self.max_attempts, created_at=time.time())
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO generation_jobs (id, topic, focus_areas, options, status, priority, max_attempts, created_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)",
+                (job.id, job.topic, json.dumps(job.focus_areas), job.options.model_dump_json(), job.priority,
+                 job.max_attempts, job.created_at)
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[GenerationJob]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM generation_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def list(self, status: Optional[str] = None, limit: int = 100) -> List[GenerationJob]:
+        """Most recent jobs first, optionally only those with one status"""
+
+        query, params = "SELECT * FROM generation_jobs", []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY created_at DESC LIMIT ?", (*params, limit)).fetchall()
+        return [self._job(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM generation_jobs GROUP BY status").fetchall()
+        return {**{status: 0 for status in JOB_STATUSES}, **{row[0]: row[1] for row in rows}}
+
+    def has_pending(self) -> bool:
+        counts = self.counts()
+        return counts["queued"] + counts["running"] > 0
+
+    def claim(self, worker_id: str) -> Optional[GenerationJob]:
+        """Take the highest-priority, oldest queued job and lease it to this worker"""
+
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT id FROM generation_jobs WHERE status = 'queued' ORDER BY priority DESC, created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE generation_jobs SET status = 'running', worker_id = ?, attempts = attempts + 1, "
+                "started_at = ?, lease_expires_at = ? WHERE id = ?",
+                (worker_id, now, now + self.lease_seconds, row[0])
+            )
+            job = conn.execute("SELECT * FROM generation_jobs WHERE id = ?", (row[0],)).fetchone()
+        return self._job(job)
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Renew the lease; False means stop working on the job (cancelled, or the lease went to another worker)"""
+
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE generation_jobs SET lease_expires_at = ? WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (time.time() + self.lease_seconds, job_id, worker_id)
+            )
+            row = conn.execute(
+                "SELECT cancel_requested FROM generation_jobs WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (job_id, worker_id)
+            ).fetchone()
+        return row is not None and not row[0]
+
+    def finish(self, job_id: str, worker_id: str, result: BatchResult) -> Optional[str]:
+        """Record an attempt's outcome; a failed attempt is queued again until the job runs out of attempts"""
+
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts, cancel_requested FROM generation_jobs "
+                "WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (job_id, worker_id)
+            ).fetchone()
+            if row is None:
+                return None
+            if result.success:
+                status = "succeeded"
+            elif row["cancel_requested"]:
+                status = "cancelled"
+            else:
+                status = "queued" if row["attempts"] < row["max_attempts"] else "failed"
+            done = status != "queued"
+            conn.execute(
+                "UPDATE generation_jobs SET status = ?, worker_id = ?, lease_expires_at = NULL, finished_at = ?, "
+                "filepath = ?, error = ? WHERE id = ?",
+                (status, worker_id if done else None, now if done else None, result.filepath, result.error, job_id)
+            )
+        return status
+
+    def finish_cancelled(self, job_id: str, worker_id: str) -> bool:
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE generation_jobs SET status = 'cancelled', lease_expires_at = NULL, finished_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'running' AND cancel_requested = 1",
+                (time.time(), job_id, worker_id)
+            ).rowcount
+        return updated > 0
+
+    def release(self, job_id: str, worker_id: str) -> bool:
+        """Hand a job back untouched (worker shutting down); the interrupted attempt doesn't count"""
+
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE generation_jobs SET status = CASE WHEN cancel_requested THEN 'cancelled' ELSE 'queued' END, "
+                "attempts = MAX(attempts - 1, 0), worker_id = NULL, lease_expires_at = NULL "
+                "WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (job_id, worker_id)
+            ).rowcount
+        return updated > 0
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """Cancel a queued job now, or ask the worker running it to stop; returns the job's status afterwards"""
+
+        with self._transaction() as conn:
+            row = conn.execute("SELECT status FROM generation_jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            if row["status"] == "queued":
+                conn.execute("UPDATE generation_jobs SET status = 'cancelled', finished_at = ? WHERE id = ?",
+                             (time.time(), job_id))
+                return "cancelled"
+            if row["status"] == "running":
+                conn.execute("UPDATE generation_jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+            return row["status"]
+
+    def retry(self, job_id: str) -> bool:
+        """Put a failed or cancelled job back on the queue with a fresh set of attempts"""
+
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE generation_jobs SET status = 'queued', attempts = 0, cancel_requested = 0, worker_id = NULL, "
+                "finished_at = NULL, error = NULL WHERE id = ? AND status IN ('failed', 'cancelled')",
+                (job_id,)
+            ).rowcount
+        return updated > 0
+
+    def _requeue(self, condition: str, params: tuple, reason: str) -> int:
+        with self._transaction() as conn:
+            rows = conn.execute(
+                f"SELECT id, attempts, max_attempts, cancel_requested FROM generation_jobs "
+                f"WHERE status = 'running' AND {condition}", params
+            ).fetchall()
+            now = time.time()
+            for row in rows:
+                if row["cancel_requested"]:
+                    status = "cancelled"
+                else:
+                    status = "queued" if row["attempts"] < row["max_attempts"] else "failed"
+                conn.execute(
+                    "UPDATE generation_jobs SET status = ?, worker_id = NULL, lease_expires_at = NULL, "
+                    "finished_at = ?, error = ? WHERE id = ?",
+                    (status, None if status == "queued" else now, reason, row["id"])
+                )
+        return len(rows)
+
+    def requeue_worker(self, worker_id: str, reason: str = "worker died") -> int:
+        """Re-queue every job a dead worker was running"""
+
+        return self._requeue("worker_id = ?", (worker_id,), reason)
+
+    def requeue_expired(self) -> int:
+        """Re-queue running jobs whose lease ran out (worker hung, or died on another supervisor's machine)"""
+
+        return self._requeue("lease_expires_at < ?", (time.time(),), "lease expired")
+
+def live_pipeline() -> "AdvancedResearchPipelineAgent":
+    from router import AdvancedResearchPipelineAgent
+
+    return AdvancedResearchPipelineAgent(metrics_file="./research_metrics.jsonl")
+
+def offline_pipeline() -> "AdvancedResearchPipelineAgent":
+    """The benchmark's stubbed model and search backends, so the service runs locally without API keys"""
+
+    from bench_pipeline import BenchRecorder, build_offline_pipeline
+
+    return build_offline_pipeline(tempfile.mkdtemp(prefix="research_worker_"), BenchRecorder(),
+                                  model_latency=0.05, tool_latency=0.05)
+
+class JobWorker:
+    """Claims jobs and runs them on one pipeline, up to `jobs_per_worker` at a time, until told to stop"""
+
+    def __init__(self, queue: JobQueue, worker_id: str, pipeline: "AdvancedResearchPipelineAgent",
+                 jobs_per_worker: int = 1, poll_interval: float = 1.0, stop_event: Optional[Any] = None):
+        self.queue = queue
+        self.worker_id = worker_id
+        self.pipeline = pipeline
+        self.jobs_per_worker = jobs_per_worker
+        self.poll_interval = poll_interval
+        self.stop_event = stop_event
+
+    def _stopping(self) -> bool:
+        return self.stop_event is not None and self.stop_event.is_set()
+
+    async def _keep_lease(self, job: GenerationJob, generation: asyncio.Task) -> None:
+        while True:
+            # Often enough that a cancellation lands within seconds, however long the lease
+            await asyncio.sleep(min(self.queue.lease_seconds / 4, 10.0))
+            if not self.queue.heartbeat(job.id, self.worker_id):
+                generation.cancel()
+                return
+
+    async def run_job(self, job: GenerationJob) -> None:
+        print(f"▶️ [{self.worker_id}] Job {job.id}: {job.topic} (attempt {job.attempts}/{job.max_attempts})")
+        generation = asyncio.create_task(run_topic_job(self.pipeline, job))
+        heartbeat = asyncio.create_task(self._keep_lease(job, generation))
+        try:
+            result = await generation
+        except asyncio.CancelledError:
+            if heartbeat.done():
+                # Stopped from the queue side; this worker carries on with other jobs
+                if self.queue.finish_cancelled(job.id, self.worker_id):
+                    print(f"🛑 [{self.worker_id}] Job {job.id} cancelled")
+                return
+            # The worker itself is shutting down: the job goes back on the queue and resumes from its checkpoints
+            if self.queue.release(job.id, self.worker_id):
+                print(f"↩️ [{self.worker_id}] Job {job.id} returned to the queue")
+            raise
+        finally:
+            heartbeat.cancel()
+
+        status = self.queue.finish(job.id, self.worker_id, result)
+        if status == "queued":
+            print(f"🔁 [{self.worker_id}] Job {job.id} failed, queued for another attempt: {result.error}")
+
+    async def run(self) -> None:
+        print(f"👷 Worker {self.worker_id} started (pid {os.getpid()})")
+        running: Dict[str, asyncio.Task] = {}
+        try:
+            while not self._stopping():
+                while len(running) < self.jobs_per_worker:
+                    job = self.queue.claim(self.worker_id)
+                    if job is None:
+                        break
+                    running[job.id] = asyncio.create_task(self.run_job(job))
+
+                if running:
+                    await asyncio.wait(running.values(), timeout=self.poll_interval,
+                                       return_when=asyncio.FIRST_COMPLETED)
+                    running = {job_id: task for job_id, task in running.items() if not task.done()}
+                else:
+                    await asyncio.sleep(self.poll_interval)
+        finally:
+            for task in running.values():
+                task.cancel()
+            await asyncio.gather(*running.values(), return_exceptions=True)
+        print(f"👋 Worker {self.worker_id} stopped")
+
+async def run_topic_job(pipeline: "AdvancedResearchPipelineAgent", job: GenerationJob) -> BatchResult:
+    # A fresh session per attempt, so a retry doesn't see the failed attempt's history
+    return await run_topic(pipeline, TopicRequest(topic=job.topic, focus_areas=job.focus_areas),
+                           job.options.output_dir, job.options.parallel_sections, job.options.collect_only,
+                           session_id=f"job-{job.id}-{job.attempts}")
+
+def run_worker(db_file: str, worker_id: str, pipeline_factory: Callable[[], "AdvancedResearchPipelineAgent"],
+               jobs_per_worker: int, lease_seconds: float, poll_interval: float, stop_event: Any) -> None:
+    """Worker process entry point: each process owns its own pipeline, databases handles and event loop"""
+
+    # Ctrl+C reaches the whole process group; the supervisor turns it into an orderly stop instead
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    queue = JobQueue(db_file, lease_seconds=lease_seconds)
+    worker = JobWorker(queue, worker_id, pipeline_factory(), jobs_per_worker, poll_interval, stop_event)
+    asyncio.run(worker.run())
+
+class WorkerPool:
+    """Supervises worker processes: a worker that dies is replaced and the jobs it held go back on the queue"""
+
+    def __init__(self, db_file: str = "./research_jobs.db", workers: Optional[int] = None, jobs_per_worker: int = 1,
+                 pipeline_factory: Callable[[], "AdvancedResearchPipelineAgent"] = live_pipeline,
+                 lease_seconds: float = 300.0, poll_interval: float = 1.0, shutdown_timeout: float = 30.0):
+        self.db_file = db_file
+        self.workers = workers or os.cpu_count() or 1
+        self.jobs_per_worker = jobs_per_worker
+        self.pipeline_factory = pipeline_factory
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.shutdown_timeout = shutdown_timeout
+        # Spawned, not forked: each worker starts clean instead of inheriting the supervisor's connections and threads
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = self._context.Event()
+
+    def _start_worker(self, slot: int) -> Tuple[str, Any]:
+        worker_id = f"{socket.gethostname()}-{slot}-{uuid4().hex[:6]}"
+        process = self._context.Process(
+            target=run_worker, name=f"research-worker-{slot}",
+            args=(self.db_file, worker_id, self.pipeline_factory, self.jobs_per_worker, self.lease_seconds,
+                  self.poll_interval, self._stop_event)
+        )
+        process.start()
+        return worker_id, process
+
+    def run(self, until_idle: bool = False) -> Dict[str, int]:
+        """Run workers until interrupted (or, with until_idle, until nothing is queued or running)"""
+
+        queue = JobQueue(self.db_file, lease_seconds=self.lease_seconds)
+        print(f"🚀 Starting {self.workers} workers × {self.jobs_per_worker} jobs on {self.db_file}")
+        processes = {slot: self._start_worker(slot) for slot in range(self.workers)}
+        try:
+            while True:
+                for slot, (worker_id, process) in list(processes.items()):
+                    if process.is_alive():
+                        continue
+                    requeued = queue.requeue_worker(worker_id, f"worker exited with code {process.exitcode}")
+                    print(f"💀 Worker {worker_id} exited (code {process.exitcode}); "
+                          f"{requeued} job(s) re-queued, starting a replacement")
+                    processes[slot] = self._start_worker(slot)
+
+                expired = queue.requeue_expired()
+                if expired:
+                    print(f"⏰ {expired} job(s) with expired leases re-queued")
+                if until_idle and not queue.has_pending():
+                    break
+                time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            print("🛑 Stopping workers; running jobs go back on the queue")
+        finally:
+            self._stop_event.set()
+            deadline = time.monotonic() + self.shutdown_timeout
+            for worker_id, process in processes.values():
+                process.join(max(0.0, deadline - time.monotonic()))
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+                queue.requeue_worker(worker_id, "worker stopped")
+
+        counts = queue.counts()
+        print("📊 Jobs: " + ", ".join(f"{status} {count}" for status, count in counts.items()))
+        return counts
+
+def print_job(job: GenerationJob) -> None:
+    detail = job.filepath if job.status == "succeeded" else job.error or ""
+    cancelling = " (cancelling)" if job.cancel_requested and job.status == "running" else ""
+    print(f"{STATUS_ICONS.get(job.status, '•')} {job.id}  {job.status:<9}{cancelling}  "
+          f"attempt {job.attempts}/{job.max_attempts}  {job.topic}  {detail}".rstrip())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Queue paper generation jobs and run them on a pool of workers")
+    parser.add_argument("--db-file", default="./research_jobs.db", help="Job queue database")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_job_options(subparser: argparse.ArgumentParser) -> None:
+        subparser.add_argument("--parallel-sections", action="store_true", help="Write each paper's sections concurrently")
+        subparser.add_argument("--collect-only", action="store_true", help="Only collect and save the research bundle")
+        subparser.add_argument("--output-dir", default="./generated_papers", help="Directory for generated papers")
+        subparser.add_argument("--priority", type=int, default=0, help="Higher priorities are claimed first")
+        subparser.add_argument("--max-attempts", type=int, default=3, help="Attempts before a job is marked failed")
+
+    submit_parser = subparsers.add_parser("submit", help="Queue one topic")
+    submit_parser.add_argument("topic")
+    submit_parser.add_argument("--focus-areas", nargs="+", default=[], help="Focus areas for the paper")
+    add_job_options(submit_parser)
+    submit_file_parser = subparsers.add_parser("submit-file", help="Queue every topic in a JSON/JSONL topics file")
+    submit_file_parser.add_argument("topics_file")
+    add_job_options(submit_file_parser)
+
+    status_parser = subparsers.add_parser("status", help="Show one job, or recent jobs and counts per status")
+    status_parser.add_argument("job_id", nargs="?")
+    status_parser.add_argument("--status", choices=JOB_STATUSES, help="Only list jobs with this status")
+    status_parser.add_argument("--limit", type=int, default=50)
+    cancel_parser = subparsers.add_parser("cancel", help="Cancel a queued job or stop a running one")
+    cancel_parser.add_argument("job_id")
+    retry_parser = subparsers.add_parser("retry", help="Queue a failed or cancelled job again")
+    retry_parser.add_argument("job_id")
+
+    run_parser = subparsers.add_parser("run", help="Run the worker pool")
+    run_parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    run_parser.add_argument("--jobs-per-worker", type=int, default=1, help="Papers generated at once per worker")
+    run_parser.add_argument("--lease-seconds", type=float, default=300.0,
+                            help="A job whose worker stops renewing it for this long is re-queued")
+    run_parser.add_argument("--until-idle", action="store_true", help="Exit once nothing is queued or running")
+    run_parser.add_argument("--offline", action="store_true",
+                            help="Use the stubbed model and search backends (no API keys or network)")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        pool = WorkerPool(args.db_file, args.workers, args.jobs_per_worker,
+                          offline_pipeline if args.offline else live_pipeline, args.lease_seconds)
+        pool.run(until_idle=args.until_idle)
+    else:
+        job_queue = JobQueue(args.db_file)
+        if args.command in ("submit", "submit-file"):
+            job_options = JobOptions(parallel_sections=args.parallel_sections, collect_only=args.collect_only,
+                                     output_dir=args.output_dir)
+            requests = ([TopicRequest(topic=args.topic, focus_areas=args.focus_areas)] if args.command == "submit"
+                        else load_topics(args.topics_file))
+            for request in requests:
+                job = job_queue.submit(request.topic, request.focus_areas, job_options, args.priority, args.max_attempts)
+                print(f"📥 Queued {job.id}: {job.topic}")
+        elif args.command == "status":
+            if args.job_id:
+                job = job_queue.get(args.job_id)
+                print(job.model_dump_json(indent=2) if job else f"❓ No job {args.job_id}")
+            else:
+                for job in job_queue.list(args.status, args.limit):
+                    print_job(job)
+                print("📊 " + ", ".join(f"{status} {count}" for status, count in job_queue.counts().items()))
+        elif args.command == "cancel":
+            status = job_queue.cancel(args.job_id)
+            if status is None:
+                print(f"❓ No job {args.job_id}")
+            elif status == "running":
+                print(f"🛑 Cancellation requested; the worker stops {args.job_id} at its next heartbeat")
+            else:
+                print(f"🛑 Job {args.job_id} is {status}")
+        elif args.command == "retry":
+            print(f"🔁 Job {args.job_id} queued again" if job_queue.retry(args.job_id)
+                  else f"⚠️ Job {args.job_id} is not failed or cancelled")
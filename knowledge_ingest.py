@@ -0,0 +1,230 @@
+import argparse
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from datetime import datetime
+from hashlib import md5
+from pathlib import Path
+from typing import Any, Dict, List
+from pydantic import BaseModel, Field
+
+# agno.vectordb and agno.knowledge import each other; loading agno.knowledge first resolves the cycle
+import agno.knowledge  # noqa: F401
+from agno.vectordb.lancedb import LanceDb
+from embedding_cache import CachedEmbedder, EmbeddingCache
+from vector_index import IndexedLanceDb
+
+class KnowledgeChunk(BaseModel):
+    """A piece of parsed document text ready to be embedded"""
+    content: str
+    meta_data: Dict[str, Any] = Field(default_factory=dict)
+
+    @property
+    def content_hash(self) -> str:
+        return hashlib.sha256(self.content.encode("utf-8")).hexdigest()
+
+    @property
+    def doc_id(self) -> str:
+        # Same row id LanceDb.insert uses, so agno sees these rows as regular knowledge
+        return md5(self.content.replace("\x00", "\ufffd").encode()).hexdigest()
+
+class IngestionReport(BaseModel):
+    """Counts and throughput for one ingestion run"""
+    source: str
+    total_chunks: int
+    embedded_chunks: int
+    skipped_chunks: int
+    removed_chunks: int
+    seconds: float
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.embedded_chunks / self.seconds if self.seconds else 0.0
+
+def chunk_markdown(text: str, source: str, max_chars: int = 1500) -> List[KnowledgeChunk]:
+    """Split markdown into heading-scoped chunks of whole paragraphs, at most `max_chars` each"""
+
+    chunks: List[KnowledgeChunk] = []
+    heading = ""
+    paragraphs: List[str] = []
+
+    def flush() -> None:
+        body = ""
+        for paragraph in paragraphs:
+            if body and len(body) + len(paragraph) > max_chars:
+                chunks.append(KnowledgeChunk(content=f"{heading}\n\n{body}".strip(),
+                                             meta_data={"source": source, "type": "text", "heading": heading}))
+                body = ""
+            body = f"{body}\n\n{paragraph}" if body else paragraph
+        if body:
+            chunks.append(KnowledgeChunk(content=f"{heading}\n\n{body}".strip(),
+                                         meta_data={"source": source, "type": "text", "heading": heading}))
+        paragraphs.clear()
+
+    for block in re.split(r"\n\s*\n", text):
+        block = block.strip()
+        if not block:
+            continue
+        if re.match(r"#{1,6}\s", block):
+            flush()
+            heading, _, rest = block.partition("\n")
+            if rest.strip():
+                paragraphs.append(rest.strip())
+        else:
+            paragraphs.append(block)
+    flush()
+    return chunks
+
+def chunk_image_captions(text: str, source: str) -> List[KnowledgeChunk]:
+    """Turn an images_with_text.md file into one chunk per image caption"""
+
+    chunks: List[KnowledgeChunk] = []
+    for block in re.split(r"(?m)^(?=!\[)", text):
+        match = re.match(r"!\[[^\]]*\]\((.*?)\)\s*(.*)", block.strip(), re.DOTALL)
+        if not match or not match.group(2).strip():
+            continue
+        image_path = match.group(1).strip("()")
+        chunks.append(KnowledgeChunk(content=match.group(2).strip(),
+                                     meta_data={"source": source, "type": "image_caption", "image": image_path}))
+    return chunks
+
+class KnowledgeIngestor:
+    """Incrementally chunk, embed and upsert parsed documents into the LanceDB knowledge table"""
+
+    def __init__(self, vector_db: LanceDb, index_db_file: str = "./research_ingest.db", batch_size: int = 64):
+        self.vector_db = vector_db
+        self.batch_size = batch_size
+
+        self._conn = sqlite3.connect(index_db_file)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS ingested_chunks (
+                source TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                ingested_at TEXT NOT NULL,
+                PRIMARY KEY (source, content_hash)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ingested_chunks_doc_id ON ingested_chunks (doc_id)")
+        self._conn.commit()
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        embedder = self.vector_db.embedder
+        if hasattr(embedder, "get_embeddings_batch"):
+            return embedder.get_embeddings_batch(texts, batch_size=self.batch_size)
+        return [embedder.get_embedding(text) for text in texts]
+
+    def _upsert_rows(self, chunks: List[KnowledgeChunk], embeddings: List[List[float]], source_hash: str) -> None:
+        rows = []
+        for chunk, embedding in zip(chunks, embeddings):
+            payload = {
+                "name": Path(chunk.meta_data["source"]).stem,
+                "meta_data": chunk.meta_data,
+                "content": chunk.content.replace("\x00", "\ufffd"),
+                "usage": None,
+                "content_id": None,
+                "content_hash": source_hash,
+            }
+            rows.append({
+                "id": chunk.doc_id,
+                "vector": self.vector_db._prepare_vector(embedding),
+                "payload": json.dumps(payload),
+            })
+
+        (
+            self.vector_db.table.merge_insert("id")
+            .when_matched_update_all()
+            .when_not_matched_insert_all()
+            .execute(rows)
+        )
+
+    def ingest_chunks(self, source: str, chunks: List[KnowledgeChunk]) -> IngestionReport:
+        """Embed only chunks not seen before for this source and drop chunks that disappeared"""
+
+        start = time.perf_counter()
+        source_hash = hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+        # Identical chunks inside one document only need one row
+        current = {chunk.content_hash: chunk for chunk in chunks}
+        previous = dict(self._conn.execute(
+            "SELECT content_hash, doc_id FROM ingested_chunks WHERE source = ?", (source,)
+        ).fetchall())
+
+        new_chunks = [chunk for content_hash, chunk in current.items() if content_hash not in previous]
+        removed = {content_hash: doc_id for content_hash, doc_id in previous.items() if content_hash not in current}
+
+        now = datetime.now().isoformat()
+        for i in range(0, len(new_chunks), self.batch_size):
+            batch = new_chunks[i:i + self.batch_size]
+            embeddings = self._embed_batch([chunk.content for chunk in batch])
+            self._upsert_rows(batch, embeddings, source_hash)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO ingested_chunks (source, content_hash, doc_id, ingested_at) VALUES (?, ?, ?, ?)",
+                [(source, chunk.content_hash, chunk.doc_id, now) for chunk in batch]
+            )
+            self._conn.commit()
+
+        for content_hash, doc_id in removed.items():
+            self._conn.execute(
+                "DELETE FROM ingested_chunks WHERE source = ? AND content_hash = ?", (source, content_hash)
+            )
+            # Rows are shared by identical chunks, so only drop ones no other source still uses
+            still_used = self._conn.execute(
+                "SELECT 1 FROM ingested_chunks WHERE doc_id = ? LIMIT 1", (doc_id,)
+            ).fetchone()
+            if not still_used:
+                self.vector_db.delete_by_id(doc_id)
+        self._conn.commit()
+
+        return IngestionReport(
+            source=source,
+            total_chunks=len(chunks),
+            embedded_chunks=len(new_chunks),
+            skipped_chunks=len(chunks) - len(new_chunks),
+            removed_chunks=len(removed),
+            seconds=time.perf_counter() - start
+        )
+
+    def ingest_markdown(self, markdown_file: str, max_chars: int = 1500) -> IngestionReport:
+        """Ingest a parsed markdown file, treating `![..](..)` caption files as image captions"""
+
+        text = Path(markdown_file).read_text(encoding="utf-8")
+        source = str(Path(markdown_file).resolve())
+        if re.match(r"\s*!\[", text):
+            chunks = chunk_image_captions(text, source)
+        else:
+            chunks = chunk_markdown(text, source, max_chars)
+        return self.ingest_chunks(source, chunks)
+
+def print_ingestion_report(report: IngestionReport) -> None:
+    print(f"📥 {report.source}")
+    print(f"   {report.total_chunks} chunks: {report.embedded_chunks} embedded, "
+          f"{report.skipped_chunks} unchanged, {report.removed_chunks} removed "
+          f"in {report.seconds:.1f}s ({report.chunks_per_second:.1f} chunks/sec)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest parsed markdown into the research knowledge base")
+    parser.add_argument("files", nargs="+", help="Markdown files, e.g. whole_document.md images_with_text.md")
+    parser.add_argument("--batch-size", type=int, default=64, help="Chunks embedded per request")
+    parser.add_argument("--max-chars", type=int, default=1500, help="Maximum characters per text chunk")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    # Same table that AdvancedResearchPipelineAgent searches
+    ingestor = KnowledgeIngestor(
+        IndexedLanceDb(table_name="research_knowledge", uri="./research_vectordb",
+                       embedder=CachedEmbedder(cache=EmbeddingCache(cache_dir="./research_embedding_cache"),
+                                               batch_size=args.batch_size)),
+        batch_size=args.batch_size
+    )
+    for markdown_file in args.files:
+        print_ingestion_report(ingestor.ingest_markdown(markdown_file, args.max_chars))
+
+    print(f"🧠 Embedding cache: {ingestor.vector_db.embedder.stats()}")
+
+    # Fold the new rows into the full-text and ANN indexes (or build them once the table is big enough)
+    print(f"🗂️  Index actions: {ingestor.vector_db.ensure_indexes() or 'none needed'}")
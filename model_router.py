@@ -0,0 +1,216 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+
+class ModelTier(BaseModel):
+    """A model the router can send calls to: its own rate limiter (budget and concurrency) and list prices"""
+    name: str
+    model_id: str
+    rate_limiter: str
+    input_cost_per_million: float
+    output_cost_per_million: float
+
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        return (input_tokens * self.input_cost_per_million + output_tokens * self.output_cost_per_million) / 1_000_000
+
+# OpenAI list prices (USD per million tokens); rate limits are per model, so each tier gets its own limiter
+DEFAULT_TIERS: Dict[str, ModelTier] = {
+    "small": ModelTier(name="small", model_id="gpt-4.1-mini", rate_limiter="openai_small",
+                       input_cost_per_million=0.40, output_cost_per_million=1.60),
+    "large": ModelTier(name="large", model_id="gpt-4.1", rate_limiter="openai",
+                       input_cost_per_million=2.00, output_cost_per_million=8.00),
+}
+
+# Which tier each kind of call goes to
+DEFAULT_POLICY: Dict[str, str] = {
+    "reasoning": "small",       # agno's think/analyze reasoning steps
+    "planning": "small",        # first tool turn of a run: breaking the topic into searches
+    "source_review": "small",   # reading search results and choosing follow-up queries
+    "synthesis": "large",       # the structured paper or outline at the end of a research run
+    "section": "large",         # writing one section in the parallel mode
+}
+
+# Everything on the large model, as before routing existed (for comparison runs)
+SINGLE_TIER_POLICY: Dict[str, str] = {kind: "large" for kind in DEFAULT_POLICY}
+
+# Appended to tool turns on a non-synthesis tier, so the small model searches but never drafts the final answer
+HANDOFF_PROMPT = (
+    "If more information is needed, call the appropriate tools now. If the research gathered so far is enough "
+    "to write the final answer, do not write it: reply with only the word READY."
+)
+
+def call_kind(kwargs: Dict[str, Any]) -> str:
+    """What a model call is for, from its response format, tools and message history"""
+
+    if getattr(kwargs.get("response_format"), "__name__", None) == "ReasoningSteps":
+        return "reasoning"
+    if kwargs.get("tools"):
+        messages = kwargs.get("messages") or []
+        return "source_review" if any(message.role == "tool" for message in messages) else "planning"
+    return "synthesis" if kwargs.get("response_format") is not None else "section"
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class ModelRouter:
+    """Sends each call of an agno model to a tier by what the call is for, with latency and cost per tier
+
+    Tool turns on a non-synthesis tier are sent without the output schema and with HANDOFF_PROMPT appended: the
+    small model either calls more tools or replies READY, and then the unchanged call goes to the synthesis tier.
+    """
+
+    def __init__(self, models: Dict[str, Any], tiers: Optional[Dict[str, ModelTier]] = None,
+                 policy: Optional[Dict[str, str]] = None):
+        self.models = models
+        self.tiers = tiers or DEFAULT_TIERS
+        self.policy = {**DEFAULT_POLICY, **(policy or {})}
+
+        self._lock = threading.Lock()
+        self._seconds: Dict[str, List[float]] = {name: [] for name in models}
+        self._calls: Dict[str, Dict[str, int]] = {name: {} for name in models}
+        self._tokens: Dict[str, List[int]] = {name: [0, 0] for name in models}
+        self._errors: Dict[str, int] = {name: 0 for name in models}
+        self.handoffs = 0
+
+    def tier_for(self, kind: str) -> str:
+        tier = self.policy.get(kind, "large")
+        return tier if tier in self.models else "large"
+
+    def _hands_off(self, kind: str, tier: str, kwargs: Dict[str, Any]) -> bool:
+        return (kind in ("planning", "source_review") and tier != self.tier_for("synthesis")
+                and bool(kwargs.get("tools")) and "messages" in kwargs)
+
+    @staticmethod
+    def _search_only(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        from agno.models.message import Message
+
+        # A new list: agno keeps appending to the original history, which must not include the hand-off prompt
+        messages = [*kwargs["messages"], Message(role="user", content=HANDOFF_PROMPT)]
+        return {**kwargs, "messages": messages, "response_format": None}
+
+    @staticmethod
+    def _usage(response: Any) -> Tuple[int, int]:
+        usage = getattr(response, "response_usage", None)
+        return getattr(usage, "input_tokens", 0) or 0, getattr(usage, "output_tokens", 0) or 0
+
+    def _record(self, tier: str, kind: str, seconds: float, response: Any = None) -> None:
+        input_tokens, output_tokens = self._usage(response)
+        with self._lock:
+            if response is None:
+                self._errors[tier] += 1
+                return
+            self._seconds[tier].append(seconds)
+            self._calls[tier][kind] = self._calls[tier].get(kind, 0) + 1
+            self._tokens[tier][0] += input_tokens
+            self._tokens[tier][1] += output_tokens
+
+    def _handed_off(self) -> None:
+        with self._lock:
+            self.handoffs += 1
+
+    def instrument_model(self, model: Any) -> Any:
+        """Route `model`'s provider calls across the tiers; `model` may itself be one of the tier models"""
+
+        if getattr(model, "_model_routed", False):
+            return model
+        # Captured before patching, so the tier that is `model` itself is called directly, not re-routed
+        invokes: Dict[str, Callable] = {name: tier_model.invoke for name, tier_model in self.models.items()}
+        ainvokes: Dict[str, Callable] = {name: tier_model.ainvoke for name, tier_model in self.models.items()}
+
+        def call(tier: str, kind: str, args: tuple, kwargs: Dict[str, Any]) -> Any:
+            start = time.perf_counter()
+            try:
+                response = invokes[tier](*args, **kwargs)
+            except Exception:
+                self._record(tier, kind, time.perf_counter() - start)
+                raise
+            self._record(tier, kind, time.perf_counter() - start, response)
+            return response
+
+        async def acall(tier: str, kind: str, args: tuple, kwargs: Dict[str, Any]) -> Any:
+            start = time.perf_counter()
+            try:
+                response = await ainvokes[tier](*args, **kwargs)
+            except Exception:
+                self._record(tier, kind, time.perf_counter() - start)
+                raise
+            self._record(tier, kind, time.perf_counter() - start, response)
+            return response
+
+        def routed_invoke(*args, **kwargs):
+            kind = call_kind(kwargs)
+            tier = self.tier_for(kind)
+            if not self._hands_off(kind, tier, kwargs):
+                return call(tier, kind, args, kwargs)
+            response = call(tier, kind, args, self._search_only(kwargs))
+            if getattr(response, "tool_calls", None):
+                return response
+            self._handed_off()
+            return call(self.tier_for("synthesis"), "synthesis", args, kwargs)
+
+        async def routed_ainvoke(*args, **kwargs):
+            kind = call_kind(kwargs)
+            tier = self.tier_for(kind)
+            if not self._hands_off(kind, tier, kwargs):
+                return await acall(tier, kind, args, kwargs)
+            response = await acall(tier, kind, args, self._search_only(kwargs))
+            if getattr(response, "tool_calls", None):
+                return response
+            self._handed_off()
+            return await acall(self.tier_for("synthesis"), "synthesis", args, kwargs)
+
+        model.invoke = routed_invoke
+        model.ainvoke = routed_ainvoke
+        model._model_routed = True
+        return model
+
+    def report(self, papers: Optional[int] = None) -> Dict[str, Any]:
+        """Calls, latency percentiles, tokens and estimated cost per tier, plus totals (per paper when given)"""
+
+        with self._lock:
+            tiers = {}
+            for name, tier_model in self.models.items():
+                seconds = self._seconds[name]
+                input_tokens, output_tokens = self._tokens[name]
+                spec = self.tiers.get(name)
+                tiers[name] = {
+                    "model": getattr(tier_model, "id", None) or (spec.model_id if spec else name),
+                    "calls": dict(self._calls[name]),
+                    "errors": self._errors[name],
+                    "seconds": round(sum(seconds), 3),
+                    "p50_seconds": round(_percentile(seconds, 0.5), 3),
+                    "p95_seconds": round(_percentile(seconds, 0.95), 3),
+                    "input_tokens": input_tokens,
+                    "output_tokens": output_tokens,
+                    "cost_usd": round(spec.cost(input_tokens, output_tokens), 4) if spec else 0.0,
+                }
+            handoffs = self.handoffs
+
+        total_cost = sum(entry["cost_usd"] for entry in tiers.values())
+        total_seconds = sum(entry["seconds"] for entry in tiers.values())
+        report = {"tiers": tiers, "handoffs": handoffs, "cost_usd": round(total_cost, 4),
+                  "model_seconds": round(total_seconds, 3)}
+        if papers:
+            report["cost_usd_per_paper"] = round(total_cost / papers, 4)
+            report["model_seconds_per_paper"] = round(total_seconds / papers, 3)
+        return report
+
+    def print_report(self, papers: Optional[int] = None) -> None:
+        report = self.report(papers)
+        print(f"\n{'='*80}")
+        print(f"💸 MODEL TIERS: ${report['cost_usd']:.4f} estimated, {report['model_seconds']:.1f}s of model time, "
+              f"{report['handoffs']} hand-offs to the synthesis tier")
+        print(f"{'='*80}")
+        print(f"{'tier':<8}{'model':<18}{'calls':>7}{'p50 (s)':>9}{'p95 (s)':>9}{'in tok':>10}{'out tok':>9}{'cost ($)':>10}")
+        for name, entry in report["tiers"].items():
+            print(f"{name:<8}{str(entry['model'])[:17]:<18}{sum(entry['calls'].values()):>7}{entry['p50_seconds']:>9.2f}"
+                  f"{entry['p95_seconds']:>9.2f}{entry['input_tokens']:>10}{entry['output_tokens']:>9}"
+                  f"{entry['cost_usd']:>10.4f}")
+        if papers:
+            print(f"📄 Per paper: ${report['cost_usd_per_paper']:.4f}, {report['model_seconds_per_paper']:.1f}s of model time")
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+from context_budget import STOPWORDS, WORD_PATTERN
+
+ResultModel = TypeVar("ResultModel", bound=BaseModel)
+
+
+def normalize_topic(topic: str) -> str:
+    return re.sub(r"\s+", " ", topic.strip().lower()).strip(" .?!:;")
+
+def normalize_focus_areas(focus_areas: Optional[List[str]]) -> List[str]:
+    """Order and duplicates of focus areas don't change the paper, so they don't change the key"""
+
+    return sorted({normalize_topic(area) for area in focus_areas or [] if area.strip()})
+
+def topic_terms(topic: str, focus_areas: Optional[List[str]] = None) -> set:
+    text = " ".join([topic, *(focus_areas or [])]).lower()
+    return {word for word in WORD_PATTERN.findall(text) if word not in STOPWORDS and len(word) > 1}
+
+def topic_similarity(a: set, b: set) -> float:
+    """Jaccard overlap of topic + focus-area terms"""
+
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+class CachedResult(BaseModel):
+    key: str
+    kind: str
+    topic: str
+    focus_areas: List[str]
+    created_at: float
+    similarity: float = 1.0
+
+class PaperResultCache:
+    """Generated papers and research outlines keyed on topic, focus areas, model and prompt version"""
+
+    def __init__(self, db_file: str = "./research_paper_cache.db", max_age_seconds: Optional[float] = 30 * 24 * 3600,
+                 similarity_threshold: Optional[float] = None, max_candidates: int = 500):
+        self.db_file = db_file
+        self.max_age_seconds = max_age_seconds
+        self.similarity_threshold = similarity_threshold
+        self.max_candidates = max_candidates
+
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+        # Parallel generations read and write from several tasks/threads, so share one connection behind a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS paper_results (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                normalized_topic TEXT NOT NULL,
+                focus_areas TEXT NOT NULL,
+                model_id TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_paper_results_topic ON paper_results (normalized_topic)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_paper_results_version ON paper_results (kind, model_id, prompt_version, created_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(kind: str, topic: str, focus_areas: Optional[List[str]], model_id: str, prompt_version: str) -> str:
+        payload = {
+            "kind": kind,
+            "topic": normalize_topic(topic),
+            "focus_areas": normalize_focus_areas(focus_areas),
+            "model_id": model_id,
+            "prompt_version": prompt_version,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _fresh_after(self, max_age_seconds: Optional[float]) -> float:
+        max_age = self.max_age_seconds if max_age_seconds is None else max_age_seconds
+        return time.time() - max_age if max_age is not None else 0.0
+
+    def get(self, kind: str, topic: str, focus_areas: Optional[List[str]], model_id: str, prompt_version: str,
+            schema: Type[ResultModel], max_age_seconds: Optional[float] = None) -> Optional[ResultModel]:
+        """Return the stored result for exactly this request, or None if missing or older than the max age"""
+
+        key = self.make_key(kind, topic, focus_areas, model_id, prompt_version)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM paper_results WHERE key = ? AND created_at >= ?",
+                (key, self._fresh_after(max_age_seconds))
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE paper_results SET hit_count = hit_count + 1 WHERE key = ?", (key,))
+            self._conn.commit()
+            self.hits += 1
+        return schema.model_validate_json(row[0])
+
+    def find_similar(self, kind: str, topic: str, focus_areas: Optional[List[str]], model_id: str,
+                     prompt_version: str, schema: Type[ResultModel],
+                     max_age_seconds: Optional[float] = None) -> Optional[Tuple[ResultModel, CachedResult]]:
+        """Most similar stored result at or above the similarity threshold (disabled when it is None)"""
+
+        if self.similarity_threshold is None:
+            return None
+        terms = topic_terms(topic, focus_areas)
+        best: Optional[Tuple[float, tuple]] = None
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, topic, focus_areas, value, created_at FROM paper_results "
+                "WHERE kind = ? AND model_id = ? AND prompt_version = ? AND created_at >= ? "
+                "ORDER BY created_at DESC LIMIT ?",
+                (kind, model_id, prompt_version, self._fresh_after(max_age_seconds), self.max_candidates)
+            ).fetchall()
+            for row in rows:
+                score = topic_similarity(terms, topic_terms(row[1], json.loads(row[2])))
+                if score >= self.similarity_threshold and (best is None or score > best[0]):
+                    best = (score, row)
+            if best is None:
+                return None
+            self._conn.execute("UPDATE paper_results SET hit_count = hit_count + 1 WHERE key = ?", (best[1][0],))
+            self._conn.commit()
+            self.similar_hits += 1
+
+        score, (key, stored_topic, stored_focus, value, created_at) = best
+        info = CachedResult(key=key, kind=kind, topic=stored_topic, focus_areas=json.loads(stored_focus),
+                            created_at=created_at, similarity=score)
+        return schema.model_validate_json(value), info
+
+    def put(self, kind: str, topic: str, focus_areas: Optional[List[str]], model_id: str, prompt_version: str,
+            result: BaseModel) -> None:
+        key = self.make_key(kind, topic, focus_areas, model_id, prompt_version)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO paper_results (key, kind, topic, normalized_topic, focus_areas, model_id, "
+                "prompt_version, value, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, kind, topic, normalize_topic(topic), json.dumps(normalize_focus_areas(focus_areas)), model_id,
+                 prompt_version, result.model_dump_json(), time.time())
+            )
+            self._conn.commit()
+
+    def invalidate(self, topic: str, focus_areas: Optional[List[str]] = None) -> int:
+        """Drop stored results for a topic (all focus-area variants unless `focus_areas` is given)"""
+
+        query = "DELETE FROM paper_results WHERE normalized_topic = ?"
+        params: List[Any] = [normalize_topic(topic)]
+        if focus_areas is not None:
+            query += " AND focus_areas = ?"
+            params.append(json.dumps(normalize_focus_areas(focus_areas)))
+        with self._lock:
+            removed = self._conn.execute(query, params).rowcount
+            self._conn.commit()
+        return removed
+
+    def purge_expired(self) -> int:
+        """Delete results older than the max age"""
+
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM paper_results WHERE created_at < ?", (self._fresh_after(None),)
+            ).rowcount
+            self._conn.commit()
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM paper_results")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit counts and stored results per kind"""
+
+        with self._lock:
+            stored = dict(self._conn.execute("SELECT kind, COUNT(*) FROM paper_results GROUP BY kind").fetchall())
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stored": stored,
+        }
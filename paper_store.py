@@ -0,0 +1,276 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+from pydantic import BaseModel, Field
+
+import arxiv
+import httpx
+from pypdf import PdfReader
+from agno.utils.log import logger
+
+if TYPE_CHECKING:
+    from rate_limiter import RateLimiter
+
+# Matches new-style (2103.03404v2) and old-style (hep-th/9901001v1) arXiv identifiers
+ARXIV_ID_PATTERN = re.compile(r"(\d{4}\.\d{4,5}|[a-z\-]+(?:\.[A-Za-z]{2})?/\d{7})(v\d+)?")
+
+def parse_arxiv_id(value: str) -> Tuple[str, Optional[str]]:
+    """Split an arXiv ID, URL or 'arXiv:' reference into (base id, version)"""
+
+    match = ARXIV_ID_PATTERN.search(value)
+    if not match:
+        raise ValueError(f"Not a valid arXiv identifier: {value}")
+    return match.group(1), match.group(2)
+
+class StoredPaper(BaseModel):
+    """Manifest entry for one downloaded arXiv paper version"""
+    arxiv_id: str
+    version: str
+    sha256: str
+    size: int
+    pdf_url: str
+    downloaded_at: str
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return f"{self.arxiv_id}{self.version}"
+
+MANIFEST_COLUMNS = ("arxiv_id", "version", "sha256", "size", "pdf_url", "downloaded_at", "metadata")
+
+class ArxivPaperStore:
+    """Content-addressed store of arXiv PDFs with a manifest index and lazily extracted text"""
+
+    def __init__(self, root_dir: str = "./research_papers", max_workers: int = 8, timeout: float = 60.0,
+                 rate_limiter: Optional["RateLimiter"] = None):
+        self.root_dir = Path(root_dir)
+        self.objects_dir = self.root_dir / "objects"
+        self.manifest_file = self.root_dir / "manifest.db"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+
+        self.max_workers = max_workers
+        # Paces PDF downloads from arxiv.org (only actual downloads, never stored papers)
+        self.rate_limiter = rate_limiter
+        self.downloads = 0
+        self.skipped_downloads = 0
+
+        # Job-queue workers and batch processes share one store: every download is one row, written under
+        # SQLite's lock, so no process overwrites entries another one added since it started
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.manifest_file, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS papers (
+                key TEXT PRIMARY KEY,
+                arxiv_id TEXT NOT NULL,
+                version TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                pdf_url TEXT NOT NULL,
+                downloaded_at TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_papers_arxiv_id ON papers (arxiv_id)")
+        self._conn.commit()
+        self._import_json_manifest()
+
+        # One pooled client so concurrent downloads reuse connections to arxiv.org
+        self._client = httpx.Client(
+            follow_redirects=True,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_workers, max_keepalive_connections=max_workers)
+        )
+
+    def _import_json_manifest(self) -> None:
+        # Stores created before the SQLite manifest kept it in manifest.json; its entries are imported once
+        json_file = self.root_dir / "manifest.json"
+        if not json_file.exists():
+            return
+        with open(json_file, 'r', encoding='utf-8') as f:
+            papers = [StoredPaper(**entry) for entry in json.load(f).values()]
+        for paper in papers:
+            self._put(paper, replace=False)
+        try:
+            os.replace(json_file, json_file.with_suffix(".json.imported"))
+        except FileNotFoundError:
+            pass  # another process imported it at the same time
+
+    def _put(self, paper: StoredPaper, replace: bool = True) -> None:
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR {'REPLACE' if replace else 'IGNORE'} INTO papers (key, {', '.join(MANIFEST_COLUMNS)}) "
+                f"VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (paper.key, paper.arxiv_id, paper.version, paper.sha256, paper.size, paper.pdf_url,
+                 paper.downloaded_at, json.dumps(paper.metadata))
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def _paper(row: Tuple[Any, ...]) -> StoredPaper:
+        values = dict(zip(MANIFEST_COLUMNS, row))
+        values["metadata"] = json.loads(values["metadata"])
+        return StoredPaper(**values)
+
+    def pdf_path(self, paper: StoredPaper) -> Path:
+        return self.objects_dir / f"{paper.sha256}.pdf"
+
+    def text_path(self, paper: StoredPaper) -> Path:
+        return self.objects_dir / f"{paper.sha256}.pages.json"
+
+    def get(self, arxiv_id: str) -> Optional[StoredPaper]:
+        """Look up a stored paper; an unversioned ID returns the latest stored version"""
+
+        base_id, version = parse_arxiv_id(arxiv_id)
+        columns = ", ".join(MANIFEST_COLUMNS)
+        with self._lock:
+            if version:
+                row = self._conn.execute(f"SELECT {columns} FROM papers WHERE key = ?",
+                                         (f"{base_id}{version}",)).fetchone()
+            else:
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM papers WHERE arxiv_id = ? "
+                    f"ORDER BY CAST(SUBSTR(version, 2) AS INTEGER) DESC LIMIT 1", (base_id,)
+                ).fetchone()
+        paper = self._paper(row) if row else None
+        if paper is not None and self.pdf_path(paper).exists():
+            return paper
+        return None
+
+    def _download(self, article: Dict[str, Any]) -> StoredPaper:
+        base_id, version = parse_arxiv_id(article["id"])
+        data = self.rate_limiter.call(self._get_pdf, article["pdf_url"]) if self.rate_limiter \
+            else self._get_pdf(article["pdf_url"])
+
+        sha256 = hashlib.sha256(data).hexdigest()
+        paper = StoredPaper(
+            arxiv_id=base_id,
+            version=version or "v1",
+            sha256=sha256,
+            size=len(data),
+            pdf_url=article["pdf_url"],
+            downloaded_at=datetime.now().isoformat(),
+            metadata=article
+        )
+
+        # Identical bytes (e.g. a re-uploaded version) share one file on disk
+        pdf_path = self.pdf_path(paper)
+        if not pdf_path.exists():
+            tmp_path = pdf_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, pdf_path)
+
+        self._put(paper)
+        with self._lock:
+            self.downloads += 1
+        return paper
+
+    def _get_pdf(self, url: str) -> bytes:
+        response = self._client.get(url)
+        response.raise_for_status()
+        return response.content
+
+    def fetch_many(self, articles: List[Dict[str, Any]]) -> Dict[str, StoredPaper]:
+        """Download every article not already stored, concurrently, keyed by versioned arXiv ID"""
+
+        stored: Dict[str, StoredPaper] = {}
+        to_download = []
+        for article in articles:
+            existing = self.get(article["id"]) if parse_arxiv_id(article["id"])[1] else None
+            if existing is not None:
+                stored[article["id"]] = existing
+                self.skipped_downloads += 1
+            elif article.get("pdf_url"):
+                to_download.append(article)
+
+        if to_download:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {executor.submit(self._download, article): article["id"] for article in to_download}
+                for future in as_completed(futures):
+                    try:
+                        stored[futures[future]] = future.result()
+                    except Exception as e:
+                        logger.error(f"Error downloading arXiv paper {futures[future]}: {e}")
+        return stored
+
+    def read_pages(self, paper: StoredPaper, pages_to_read: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return page texts, extracting and caching them next to the PDF on first read"""
+
+        text_path = self.text_path(paper)
+        if text_path.exists():
+            with open(text_path, 'r', encoding='utf-8') as f:
+                pages = json.load(f)
+        else:
+            pdf_reader = PdfReader(self.pdf_path(paper))
+            pages = [
+                {"page": page_number, "text": page.extract_text()}
+                for page_number, page in enumerate(pdf_reader.pages, start=1)
+            ]
+            with open(text_path, 'w', encoding='utf-8') as f:
+                json.dump(pages, f)
+
+        return pages[:pages_to_read] if pages_to_read else pages
+
+    def read_papers(self, client: arxiv.Client, id_list: List[str], pages_to_read: Optional[int] = None,
+                    api_limiter: Optional["RateLimiter"] = None) -> List[Dict[str, Any]]:
+        """Resolve, download (if needed) and read arXiv papers in the ArxivTools output format"""
+
+        # Versioned IDs already in the store need no arXiv API call at all
+        articles: List[Dict[str, Any]] = []
+        to_resolve = []
+        for arxiv_id in id_list:
+            base_id, version = parse_arxiv_id(arxiv_id)
+            paper = self.get(arxiv_id) if version else None
+            if paper is not None:
+                articles.append(dict(paper.metadata))
+            else:
+                to_resolve.append(f"{base_id}{version or ''}")
+
+        if to_resolve:
+            def lookup() -> List[arxiv.Result]:
+                return list(client.results(search=arxiv.Search(id_list=to_resolve)))
+
+            for result in api_limiter.call(lookup) if api_limiter else lookup():
+                articles.append({
+                    "title": result.title,
+                    "id": result.get_short_id(),
+                    "entry_id": result.entry_id,
+                    "authors": [author.name for author in result.authors],
+                    "primary_category": result.primary_category,
+                    "categories": result.categories,
+                    "published": result.published.isoformat() if result.published else None,
+                    "pdf_url": result.pdf_url,
+                    "links": [link.href for link in result.links],
+                    "summary": result.summary,
+                    "comment": result.comment,
+                })
+
+        stored = self.fetch_many(articles)
+        for article in articles:
+            paper = stored.get(article["id"])
+            if paper is None:
+                continue
+            try:
+                article["content"] = self.read_pages(paper, pages_to_read)
+            except Exception as e:
+                logger.error(f"Error reading arXiv paper {article['id']}: {e}")
+        return articles
+
+    def stats(self) -> Dict[str, Any]:
+        """Return download counters and store size"""
+
+        with self._lock:
+            papers, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM papers").fetchone()
+        return {
+            "papers": papers,
+            "bytes": size,
+            "downloads": self.downloads,
+            "skipped_downloads": self.skipped_downloads,
+        }
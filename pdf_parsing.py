@@ -0,0 +1,222 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, TYPE_CHECKING
+from pydantic import BaseModel, Field
+
+from pypdf import PdfReader
+
+if TYPE_CHECKING:
+    from figure_store import FigureStore
+
+# Parse mode for text-only extraction with pypdf, used when LlamaParse is unavailable
+LOCAL_PARSE_MODE = "local"
+
+# Same separator LlamaParse uses when joining pages into one markdown document
+PAGE_SEPARATOR = "\n---\n"
+
+class ParsedImage(BaseModel):
+    """An image extracted from a parsed page"""
+    image_path: str
+    text: str = ""
+    # Perceptual hash of the figure in the FigureStore, once deduplicated
+    image_hash: Optional[str] = None
+
+class ParsedPage(BaseModel):
+    """Markdown and images for one PDF page (pages are numbered from 1)"""
+    page: int
+    markdown: str
+    images: List[ParsedImage] = Field(default_factory=list)
+    parse_mode: str
+    cached: bool = False
+
+def file_sha256(file_path: str) -> str:
+    """Hash a file in blocks so large PDFs are never fully loaded into memory"""
+
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def extract_pages_local(pdf_path: str, pages: List[int]) -> List[ParsedPage]:
+    """Extract plain text for the given pages with pypdf (runs in a worker process)"""
+
+    reader = PdfReader(pdf_path)
+    return [
+        ParsedPage(page=page, markdown=reader.pages[page - 1].extract_text() or "", parse_mode=LOCAL_PARSE_MODE)
+        for page in pages
+    ]
+
+class PageCache:
+    """SQLite cache of parsed pages keyed by (file hash, page, parse mode)"""
+
+    def __init__(self, db_file: str = "./parsed_pages.db"):
+        # Batch workers in separate processes share this file, so wait on locks and use WAL
+        self._conn = sqlite3.connect(db_file, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS parsed_pages (
+                file_hash TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                parse_mode TEXT NOT NULL,
+                markdown TEXT NOT NULL,
+                images TEXT NOT NULL,
+                parsed_at TEXT NOT NULL,
+                PRIMARY KEY (file_hash, page, parse_mode)
+            )
+        """)
+        self._conn.commit()
+
+    def get_pages(self, file_hash: str, parse_mode: str) -> Dict[int, ParsedPage]:
+        rows = self._conn.execute(
+            "SELECT page, markdown, images FROM parsed_pages WHERE file_hash = ? AND parse_mode = ?",
+            (file_hash, parse_mode)
+        ).fetchall()
+        return {
+            page: ParsedPage(page=page, markdown=markdown, images=json.loads(images),
+                             parse_mode=parse_mode, cached=True)
+            for page, markdown, images in rows
+        }
+
+    def put_pages(self, file_hash: str, pages: List[ParsedPage]) -> None:
+        now = datetime.now().isoformat()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO parsed_pages (file_hash, page, parse_mode, markdown, images, parsed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (file_hash, p.page, p.parse_mode, p.markdown, json.dumps([i.model_dump() for i in p.images]), now)
+                for p in pages
+            ]
+        )
+        self._conn.commit()
+
+class PDFPageParser:
+    """Parse PDFs in parallel page ranges, reusing cached pages and falling back to local pypdf extraction"""
+
+    def __init__(self, parse_mode: str = "parse_page_with_agent", api_key: Optional[str] = None,
+                 cache_db_file: str = "./parsed_pages.db", pages_per_chunk: int = 5, max_concurrency: int = 4,
+                 image_download_dir: Optional[str] = "./images", include_screenshot_images: bool = True,
+                 include_object_images: bool = True, use_process_pool: bool = True,
+                 figure_store: Optional["FigureStore"] = None):
+        self.parse_mode = parse_mode
+        self.api_key = api_key
+        self.cache = PageCache(cache_db_file)
+        self.pages_per_chunk = pages_per_chunk
+        self.max_concurrency = max_concurrency
+        self.image_download_dir = image_download_dir
+        self.include_screenshot_images = include_screenshot_images
+        self.include_object_images = include_object_images
+        # Disable when the caller already parallelizes across processes (e.g. batch_parse.py)
+        self.use_process_pool = use_process_pool
+        # Collapses repeated and near-duplicate downloaded images before pages are cached
+        self.figure_store = figure_store
+
+    def _cloud_available(self) -> bool:
+        if self.parse_mode == LOCAL_PARSE_MODE:
+            return False
+        if not self.api_key:
+            print("⚠️  No LlamaCloud API key set, using local pypdf text extraction")
+            return False
+        try:
+            import llama_cloud_services  # noqa: F401
+        except ImportError:
+            print("⚠️  llama-cloud-services not installed, using local pypdf text extraction")
+            return False
+        return True
+
+    async def _parse_cloud(self, pdf_path: str, pages: List[int]) -> List[ParsedPage]:
+        from llama_cloud_services import LlamaParse
+
+        parser = LlamaParse(
+            api_key=self.api_key,
+            parse_mode=self.parse_mode,
+            result_type="markdown",
+            # LlamaParse numbers target pages from 0
+            target_pages=",".join(str(page - 1) for page in pages),
+            verbose=False,
+        )
+        result = await parser.aparse(pdf_path)
+
+        images_by_page: Dict[int, List[ParsedImage]] = {}
+        if self.image_download_dir:
+            image_documents = await result.aget_image_documents(
+                include_screenshot_images=self.include_screenshot_images,
+                include_object_images=self.include_object_images,
+                image_download_dir=self.image_download_dir
+            )
+            for img_doc in image_documents:
+                images_by_page.setdefault(img_doc.metadata["page_number"], []).append(
+                    ParsedImage(image_path=str(img_doc.image_path), text=img_doc.text or "")
+                )
+
+        return [
+            ParsedPage(page=page.page, markdown=page.md or "", images=images_by_page.get(page.page, []),
+                       parse_mode=self.parse_mode)
+            for page in result.pages
+        ]
+
+    async def aparse(self, pdf_path: str) -> List[ParsedPage]:
+        """Parse every page of a PDF, only sending pages not already cached to the parser"""
+
+        file_hash = file_sha256(pdf_path)
+        page_count = len(PdfReader(pdf_path).pages)
+        parse_mode = self.parse_mode if self._cloud_available() else LOCAL_PARSE_MODE
+
+        cached = self.cache.get_pages(file_hash, parse_mode)
+        missing = [page for page in range(1, page_count + 1) if page not in cached]
+        print(f"📄 {Path(pdf_path).name}: {page_count} pages, {len(cached)} cached, {len(missing)} to parse ({parse_mode})")
+        if not missing:
+            return [cached[page] for page in sorted(cached)]
+
+        chunks = [missing[i:i + self.pages_per_chunk] for i in range(0, len(missing), self.pages_per_chunk)]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_running_loop()
+
+        pool = ProcessPoolExecutor(max_workers=self.max_concurrency) if self.use_process_pool else None
+        try:
+            async def parse_chunk(pages: List[int]) -> List[ParsedPage]:
+                async with semaphore:
+                    if parse_mode != LOCAL_PARSE_MODE:
+                        try:
+                            return await self._parse_cloud(pdf_path, pages)
+                        except Exception as e:
+                            print(f"⚠️  Cloud parsing failed for pages {pages[0]}-{pages[-1]}, using local extraction: {e}")
+                    return await loop.run_in_executor(pool, extract_pages_local, pdf_path, pages)
+
+            results = await asyncio.gather(*(parse_chunk(pages) for pages in chunks))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        parsed = [page for chunk in results for page in chunk]
+        if self.figure_store is not None:
+            # Cached pages then point at the one kept copy of each figure, not at deleted duplicates
+            self.figure_store.dedupe(parsed)
+        self.cache.put_pages(file_hash, parsed)
+
+        pages_by_number = {**cached, **{page.page: page for page in parsed}}
+        return [pages_by_number[page] for page in sorted(pages_by_number)]
+
+    def parse(self, pdf_path: str) -> List[ParsedPage]:
+        """Synchronous version of aparse"""
+        return asyncio.run(self.aparse(pdf_path))
+
+def write_markdown(pages: List[ParsedPage], output_file: str) -> None:
+    """Save all pages as one markdown document"""
+
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(PAGE_SEPARATOR.join(page.markdown for page in pages))
+
+def write_image_markdown(pages: List[ParsedPage], output_file: str) -> None:
+    """Save every extracted image and its generated text as markdown"""
+
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for page in pages:
+            for image in page.images:
+                f.write(f"![Image]({image.image_path})\n\n")
+                f.write(f"{image.text}\n\n")
@@ -0,0 +1,327 @@
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import uuid4
+from pydantic import BaseModel, Field
+
+# Tool names that are knowledge-base lookups rather than external searches
+KNOWLEDGE_TOOLS = {"search_knowledge_base"}
+
+# agno logs this warning before every retry of a failed run
+RETRY_LOG_PATTERN = re.compile(r"Attempt (\d+)/(\d+) failed")
+
+class MetricEvent(BaseModel):
+    """One timed stage of a pipeline run, written as a JSON line"""
+    timestamp: str
+    trace_id: Optional[str] = None
+    topic: Optional[str] = None
+    stage: str
+    name: Optional[str] = None
+    seconds: float = 0.0
+    status: str = "ok"
+    input_tokens: int = 0
+    output_tokens: int = 0
+    retries: int = 0
+    error: Optional[str] = None
+    attributes: Dict[str, Any] = Field(default_factory=dict)
+
+class TraceContext:
+    """The run a stage belongs to, carried through asyncio tasks and tool threads by a ContextVar"""
+
+    def __init__(self, metrics: "PipelineMetrics", topic: str):
+        self.metrics = metrics
+        self.trace_id = uuid4().hex
+        self.topic = topic
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.retries = 0
+
+_current_trace: ContextVar[Optional[TraceContext]] = ContextVar("research_pipeline_trace", default=None)
+
+class _RetryLogHandler(logging.Handler):
+    """Counts agno's run retries against whichever trace is active when the warning is logged"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        trace = _current_trace.get()
+        if trace is None:
+            return
+        message = record.getMessage()
+        match = RETRY_LOG_PATTERN.search(message)
+        if match:
+            trace.metrics.record("retry", name=f"attempt_{match.group(1)}", status="error", retries=1,
+                                 error=message[:500])
+
+_retry_handler_lock = threading.Lock()
+_retry_handler: Optional[_RetryLogHandler] = None
+
+def _install_retry_handler() -> None:
+    global _retry_handler
+    with _retry_handler_lock:
+        if _retry_handler is None:
+            from agno.utils.log import logger
+            _retry_handler = _RetryLogHandler(level=logging.WARNING)
+            logger.addHandler(_retry_handler)
+
+def _prometheus_labels(labels: Dict[str, Optional[str]]) -> str:
+    parts = []
+    for key, value in labels.items():
+        if value is None:
+            continue
+        escaped = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+class PipelineMetrics:
+    """Per-stage timings, token counts and retries for the research pipeline, exported as JSON lines or Prometheus text"""
+
+    def __init__(self, jsonl_file: Optional[str] = None, max_events: int = 10000):
+        self.jsonl_file = jsonl_file
+        self.max_events = max_events
+        self.events: List[MetricEvent] = []
+
+        self._lock = threading.Lock()
+        self._seconds: Dict[Tuple[str, str], float] = defaultdict(float)
+        self._calls: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        self._tokens: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._retries = 0
+
+    def record(self, stage: str, seconds: float = 0.0, name: Optional[str] = None, status: str = "ok",
+               input_tokens: int = 0, output_tokens: int = 0, retries: int = 0, error: Optional[str] = None,
+               **attributes: Any) -> MetricEvent:
+        """Record one stage event against the active trace"""
+
+        trace = _current_trace.get()
+        event = MetricEvent(
+            timestamp=datetime.now().isoformat(),
+            trace_id=trace.trace_id if trace else None,
+            topic=trace.topic if trace else None,
+            stage=stage,
+            name=name,
+            seconds=seconds,
+            status=status,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            retries=retries,
+            error=error,
+            attributes=attributes
+        )
+
+        with self._lock:
+            self._seconds[(stage, name or "")] += seconds
+            self._calls[(stage, name or "", status)] += 1
+            self._tokens[(stage, "input")] += input_tokens
+            self._tokens[(stage, "output")] += output_tokens
+            self._retries += retries
+            if trace is not None:
+                trace.input_tokens += input_tokens
+                trace.output_tokens += output_tokens
+                trace.retries += retries
+
+            self._append_event(event)
+        return event
+
+    def _append_event(self, event: MetricEvent) -> None:
+        # Called with the lock held; aggregates keep everything, only the raw event history is bounded
+        self.events.append(event)
+        if len(self.events) > self.max_events:
+            del self.events[:len(self.events) - self.max_events]
+        if self.jsonl_file:
+            with open(self.jsonl_file, 'a', encoding='utf-8') as f:
+                f.write(event.model_dump_json() + "\n")
+
+    @contextmanager
+    def stage(self, stage: str, name: Optional[str] = None, **attributes: Any) -> Iterator[None]:
+        """Time a block of code as one stage event; failures are recorded with status "error" """
+
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            self.record(stage, time.perf_counter() - start, name, status="error", error=str(e)[:500], **attributes)
+            raise
+        self.record(stage, time.perf_counter() - start, name, **attributes)
+
+    @contextmanager
+    def trace(self, topic: str, mode: str) -> Iterator[TraceContext]:
+        """Group every stage recorded inside the block (including tasks and tool threads it starts) into one run"""
+
+        # Installed on first use so formatting-only callers never import agno
+        _install_retry_handler()
+        trace = TraceContext(self, topic)
+        token = _current_trace.set(trace)
+        start = time.perf_counter()
+        status, error = "ok", None
+        try:
+            yield trace
+        except BaseException as e:
+            status, error = "error", str(e)[:500]
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            try:
+                _current_trace.reset(token)
+            except ValueError:
+                # An async generator may be closed from a different context than it started in
+                _current_trace.set(None)
+            # The run totals were already counted stage by stage, so they only go into the event
+            event = MetricEvent(
+                timestamp=datetime.now().isoformat(), trace_id=trace.trace_id, topic=topic, stage="run", name=mode,
+                seconds=seconds, status=status, input_tokens=trace.input_tokens, output_tokens=trace.output_tokens,
+                retries=trace.retries, error=error
+            )
+            with self._lock:
+                self._seconds[("run", mode)] += seconds
+                self._calls[("run", mode, status)] += 1
+                self._append_event(event)
+
+    def tool_hook(self, function_name: str, function_call: Callable, arguments: Dict[str, Any]) -> Any:
+        """agno tool hook that times every Exa, ArXiv, reasoning and knowledge-search call"""
+
+        stage = "knowledge_search" if function_name in KNOWLEDGE_TOOLS else "tool"
+        start = time.perf_counter()
+        try:
+            result = function_call(**arguments)
+        except Exception as e:
+            self.record(stage, time.perf_counter() - start, function_name, status="error", error=str(e)[:500])
+            raise
+        # The toolkits report failures as "Error..." strings rather than raising
+        failed = isinstance(result, str) and result.startswith("Error")
+        self.record(stage, time.perf_counter() - start, function_name, status="error" if failed else "ok",
+                    error=result[:500] if failed else None,
+                    result_chars=len(result) if isinstance(result, str) else None)
+        return result
+
+    def instrument_model(self, model: Any) -> Any:
+        """Time each provider call and record its token usage, splitting reasoning from generation"""
+
+        if getattr(model, "_pipeline_metrics_instrumented", False):
+            return model
+        invoke, ainvoke = model.invoke, model.ainvoke
+
+        def stage_for(kwargs: Dict[str, Any]) -> str:
+            # agno's default reasoning agent asks the same model for ReasoningSteps
+            return "reasoning" if getattr(kwargs.get("response_format"), "__name__", None) == "ReasoningSteps" \
+                else "model_generation"
+
+        def record_response(stage: str, start: float, response: Any) -> None:
+            usage = getattr(response, "response_usage", None)
+            self.record(stage, time.perf_counter() - start, getattr(model, "id", None),
+                        input_tokens=getattr(usage, "input_tokens", 0) or 0,
+                        output_tokens=getattr(usage, "output_tokens", 0) or 0,
+                        tool_calls=len(getattr(response, "tool_calls", None) or []))
+
+        def timed_invoke(*args, **kwargs):
+            stage, start = stage_for(kwargs), time.perf_counter()
+            try:
+                response = invoke(*args, **kwargs)
+            except Exception as e:
+                self.record(stage, time.perf_counter() - start, getattr(model, "id", None), status="error",
+                            error=str(e)[:500])
+                raise
+            record_response(stage, start, response)
+            return response
+
+        async def timed_ainvoke(*args, **kwargs):
+            stage, start = stage_for(kwargs), time.perf_counter()
+            try:
+                response = await ainvoke(*args, **kwargs)
+            except Exception as e:
+                self.record(stage, time.perf_counter() - start, getattr(model, "id", None), status="error",
+                            error=str(e)[:500])
+                raise
+            record_response(stage, start, response)
+            return response
+
+        model.invoke = timed_invoke
+        model.ainvoke = timed_ainvoke
+        model._pipeline_metrics_instrumented = True
+        return model
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregated seconds, calls, errors and tokens per stage"""
+
+        with self._lock:
+            stages: Dict[str, Dict[str, Any]] = {}
+            for (stage, name, status), calls in self._calls.items():
+                key = f"{stage}:{name}" if name else stage
+                entry = stages.setdefault(key, {"calls": 0, "errors": 0, "seconds": self._seconds[(stage, name)]})
+                entry["calls"] += calls
+                if status != "ok":
+                    entry["errors"] += calls
+            return {
+                "stages": stages,
+                "input_tokens": sum(v for (_, direction), v in self._tokens.items() if direction == "input"),
+                "output_tokens": sum(v for (_, direction), v in self._tokens.items() if direction == "output"),
+                "retries": self._retries,
+            }
+
+    def prometheus_text(self) -> str:
+        """Render the aggregates in the Prometheus text exposition format"""
+
+        with self._lock:
+            lines = [
+                "# HELP research_pipeline_stage_seconds Time spent in each pipeline stage",
+                "# TYPE research_pipeline_stage_seconds summary",
+            ]
+            counts: Dict[Tuple[str, str], int] = defaultdict(int)
+            for (stage, name, _), calls in self._calls.items():
+                counts[(stage, name)] += calls
+            for (stage, name), seconds in sorted(self._seconds.items()):
+                labels = _prometheus_labels({"stage": stage, "name": name or None})
+                lines.append(f"research_pipeline_stage_seconds_sum{labels} {seconds:.6f}")
+                lines.append(f"research_pipeline_stage_seconds_count{labels} {counts[(stage, name)]}")
+
+            lines += [
+                "# HELP research_pipeline_stage_calls_total Stage executions by outcome",
+                "# TYPE research_pipeline_stage_calls_total counter",
+            ]
+            for (stage, name, status), calls in sorted(self._calls.items()):
+                labels = _prometheus_labels({"stage": stage, "name": name or None, "status": status})
+                lines.append(f"research_pipeline_stage_calls_total{labels} {calls}")
+
+            lines += [
+                "# HELP research_pipeline_tokens_total Model tokens by stage and direction",
+                "# TYPE research_pipeline_tokens_total counter",
+            ]
+            for (stage, direction), tokens in sorted(self._tokens.items()):
+                if tokens:
+                    labels = _prometheus_labels({"stage": stage, "direction": direction})
+                    lines.append(f"research_pipeline_tokens_total{labels} {tokens}")
+
+            lines += [
+                "# HELP research_pipeline_retries_total Agent run retries after a failed attempt",
+                "# TYPE research_pipeline_retries_total counter",
+                f"research_pipeline_retries_total {self._retries}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    def write_jsonl(self, output_file: str) -> None:
+        """Write the retained events as JSON lines"""
+
+        with self._lock:
+            events = list(self.events)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            for event in events:
+                f.write(event.model_dump_json() + "\n")
+
+    def write_prometheus(self, output_file: str) -> None:
+        """Write a Prometheus text snapshot (e.g. for the node_exporter textfile collector)"""
+
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+
+    def print_summary(self) -> None:
+        summary = self.summary()
+        print(f"\n{'='*80}")
+        print(f"📈 PIPELINE METRICS: {summary['input_tokens']} input tokens, "
+              f"{summary['output_tokens']} output tokens, {summary['retries']} retries")
+        print(f"{'='*80}")
+        print(f"{'stage':<48}{'calls':>8}{'errors':>8}{'seconds':>12}")
+        for key, entry in sorted(summary["stages"].items(), key=lambda item: -item[1]["seconds"]):
+            print(f"{key:<48}{entry['calls']:>8}{entry['errors']:>8}{entry['seconds']:>12.2f}")
@@ -0,0 +1,319 @@
+import asyncio
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from context_budget import estimate_tokens
+
+THROTTLE_STATUSES = {429, 503}
+THROTTLE_PATTERN = re.compile(r"\b429\b|rate.?limit|too many requests", re.IGNORECASE)
+# How often a caller waiting only for a free concurrency slot checks again
+POLL_INTERVAL = 0.05
+
+# Per-provider budgets; OpenAI's are gpt-4.1 tier 1, arXiv asks for one request every 3 seconds
+DEFAULT_LIMITS: Dict[str, Dict[str, Any]] = {
+    "openai": {"requests_per_minute": 500, "tokens_per_minute": 30000, "max_concurrency": 8},
+    # gpt-4.1-mini, the router's small tier: same request rate, a much larger token budget, more in flight
+    "openai_small": {"requests_per_minute": 500, "tokens_per_minute": 200000, "max_concurrency": 16},
+    "exa": {"requests_per_minute": 300, "max_concurrency": 5},
+    "arxiv": {"requests_per_minute": 20, "max_concurrency": 1},
+    "arxiv_pdf": {"requests_per_minute": 60, "max_concurrency": 4},
+}
+
+
+def _error_chain(error: BaseException) -> Iterator[BaseException]:
+    # SDK errors are often re-raised wrapped (e.g. agno's ModelProviderError from openai.RateLimitError)
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or error.__context__
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Retry-After / retry-after-ms from the HTTP response behind an error, if the provider sent one"""
+
+    for exc in _error_chain(error):
+        headers = getattr(getattr(exc, "response", None), "headers", None)
+        if not headers:
+            continue
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                # HTTP-date form
+                return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    return None
+
+def is_throttled(error: BaseException) -> bool:
+    for exc in _error_chain(error):
+        status = getattr(exc, "status_code", None) or getattr(exc, "status", None) \
+            or getattr(getattr(exc, "response", None), "status_code", None)
+        if status in THROTTLE_STATUSES:
+            return True
+    return bool(THROTTLE_PATTERN.search(str(error)))
+
+def is_throttled_result(result: Any) -> bool:
+    """Toolkits such as ExaTools catch their errors and return them as "Error: ..." strings"""
+
+    return isinstance(result, str) and result.startswith("Error") and bool(THROTTLE_PATTERN.search(result[:500]))
+
+class RateLimitExceeded(Exception):
+    """A call was still being throttled after every retry"""
+
+class RateLimiter:
+    """Request and token budgets with adaptive concurrency for one provider, shared by every caller in the process"""
+
+    def __init__(self, name: str, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None,
+                 max_concurrency: int = 8, max_retries: int = 6, base_delay: float = 1.0, max_delay: float = 60.0,
+                 output_token_reserve: int = 4000):
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.output_token_reserve = output_token_reserve
+
+        # Threads (sync agents, tool workers) and event loops share the state, so it lives behind a plain lock
+        self._lock = threading.Lock()
+        self._request_allowance = float(requests_per_minute or 0)
+        self._token_allowance = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._active = 0
+        self.concurrency_limit = float(max_concurrency)
+
+        self.calls = 0
+        self.throttled = 0
+        self.retries = 0
+        self.gave_up = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._request_allowance = min(self.requests_per_minute,
+                                          self._request_allowance + elapsed * self.requests_per_minute / 60)
+        if self.tokens_per_minute:
+            self._token_allowance = min(self.tokens_per_minute,
+                                        self._token_allowance + elapsed * self.tokens_per_minute / 60)
+
+    def _try_acquire(self, tokens: int) -> float:
+        """Take a concurrency slot plus budget and return 0, or return how long to wait before trying again"""
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            waits = [self._blocked_until - now]
+            if self._active >= max(1, int(self.concurrency_limit)):
+                waits.append(POLL_INTERVAL)
+            if self.requests_per_minute and self._request_allowance < 1:
+                waits.append((1 - self._request_allowance) * 60 / self.requests_per_minute)
+            # A request bigger than the whole budget waits for a full bucket instead of forever
+            needed = min(tokens, self.tokens_per_minute or 0)
+            if self.tokens_per_minute and self._token_allowance < needed:
+                waits.append((needed - self._token_allowance) * 60 / self.tokens_per_minute)
+            wait = max(waits)
+            if wait > 0:
+                return wait
+            self._active += 1
+            self._request_allowance -= 1
+            self._token_allowance -= needed
+            return 0.0
+
+    def _release(self, reserved_tokens: int, used_tokens: Optional[int] = None, outcome: str = "ok",
+                 retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            self._active -= 1
+            if used_tokens is not None and self.tokens_per_minute:
+                # Settle the estimate against what the provider actually counted
+                reserved = min(reserved_tokens, self.tokens_per_minute)
+                self._token_allowance = min(self.tokens_per_minute, self._token_allowance + reserved - used_tokens)
+            if outcome == "throttled":
+                self.throttled += 1
+                # Multiplicative decrease, and assume the provider's window is full whatever our bucket says
+                self.concurrency_limit = max(1.0, self.concurrency_limit / 2)
+                self._request_allowance = min(self._request_allowance, 0.0)
+                if retry_after:
+                    # Every caller pauses until then, instead of each one finding out with its own 429
+                    self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            elif outcome == "ok":
+                # Additive increase: about one more slot per `limit` successful calls
+                self.concurrency_limit = min(float(self.max_concurrency),
+                                             self.concurrency_limit + 1 / self.concurrency_limit)
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential delay, on top of Retry-After so retries don't wake in lock-step"""
+
+        return (retry_after or 0.0) + random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _wait_for_slot(self, tokens: int) -> None:
+        start = time.monotonic()
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                break
+            time.sleep(wait)
+        self._add_wait(time.monotonic() - start)
+
+    async def _async_wait_for_slot(self, tokens: int) -> None:
+        start = time.monotonic()
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+        self._add_wait(time.monotonic() - start)
+
+    def _add_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.waited_seconds += seconds
+
+    def _throttled(self, attempt: int, error: Optional[BaseException], tokens: int) -> Optional[float]:
+        """Record a throttled attempt; returns the delay before the next one, or None when out of retries"""
+
+        retry_after = retry_after_seconds(error) if error is not None else None
+        self._release(tokens, outcome="throttled", retry_after=retry_after)
+        if attempt >= self.max_retries:
+            with self._lock:
+                self.gave_up += 1
+            return None
+        with self._lock:
+            self.retries += 1
+        return self.backoff(attempt, retry_after)
+
+    def run(self, func: Callable[..., Any], args: tuple = (), kwargs: Optional[Dict[str, Any]] = None, tokens: int = 0,
+            usage: Optional[Callable[[Any], Optional[int]]] = None) -> Any:
+        """Call `func` within the budget, retrying throttled attempts with backoff"""
+
+        kwargs = kwargs or {}
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_slot(tokens)
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if not is_throttled(e):
+                    self._release(tokens, outcome="error")
+                    raise
+                delay = self._throttled(attempt, e, tokens)
+                if delay is None:
+                    raise RateLimitExceeded(f"{self.name}: still rate limited after {self.max_retries} retries") from e
+                time.sleep(delay)
+                continue
+            if is_throttled_result(result):
+                delay = self._throttled(attempt, None, tokens)
+                if delay is None:
+                    # The agent sees the toolkit's own error message
+                    return result
+                time.sleep(delay)
+                continue
+            self._release(tokens, usage(result) if usage else None)
+            return result
+
+    async def arun(self, func: Callable[..., Any], args: tuple = (), kwargs: Optional[Dict[str, Any]] = None,
+                   tokens: int = 0, usage: Optional[Callable[[Any], Optional[int]]] = None) -> Any:
+        """Async version of run() for coroutine functions"""
+
+        kwargs = kwargs or {}
+        for attempt in range(self.max_retries + 1):
+            await self._async_wait_for_slot(tokens)
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                if not is_throttled(e):
+                    self._release(tokens, outcome="error")
+                    raise
+                delay = self._throttled(attempt, e, tokens)
+                if delay is None:
+                    raise RateLimitExceeded(f"{self.name}: still rate limited after {self.max_retries} retries") from e
+                await asyncio.sleep(delay)
+                continue
+            if is_throttled_result(result):
+                delay = self._throttled(attempt, None, tokens)
+                if delay is None:
+                    return result
+                await asyncio.sleep(delay)
+                continue
+            self._release(tokens, usage(result) if usage else None)
+            return result
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        return self.run(func, args, kwargs)
+
+    def instrument_model(self, model: Any) -> Any:
+        """Route an agno model's provider calls through this limiter, budgeting prompt plus expected output tokens"""
+
+        if getattr(model, "_rate_limited", False):
+            return model
+        invoke, ainvoke = model.invoke, model.ainvoke
+
+        def reserve(args: tuple, kwargs: Dict[str, Any]) -> int:
+            messages = kwargs.get("messages", args[0] if args else [])
+            prompt = sum(estimate_tokens(message.get_content_string()) for message in messages)
+            return prompt + (getattr(model, "max_completion_tokens", None) or getattr(model, "max_tokens", None)
+                             or self.output_token_reserve)
+
+        def used(response: Any) -> Optional[int]:
+            usage = getattr(response, "response_usage", None)
+            if usage is None:
+                return None
+            return (getattr(usage, "input_tokens", 0) or 0) + (getattr(usage, "output_tokens", 0) or 0)
+
+        def limited_invoke(*args, **kwargs):
+            return self.run(invoke, args, kwargs, reserve(args, kwargs), used)
+
+        async def limited_ainvoke(*args, **kwargs):
+            return await self.arun(ainvoke, args, kwargs, reserve(args, kwargs), used)
+
+        model.invoke = limited_invoke
+        model.ainvoke = limited_ainvoke
+        model._rate_limited = True
+        return model
+
+    def stats(self) -> Dict[str, Any]:
+        """Calls, throttled attempts, retries, time spent waiting and the current adaptive concurrency"""
+
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "throttled": self.throttled,
+                "retries": self.retries,
+                "gave_up": self.gave_up,
+                "waited_seconds": round(self.waited_seconds, 3),
+                "concurrency_limit": round(self.concurrency_limit, 2),
+                "active": self._active,
+            }
+
+_limiters: Dict[str, RateLimiter] = {}
+_registry_lock = threading.Lock()
+
+def get_rate_limiter(name: str) -> RateLimiter:
+    """The process-wide limiter for a provider, created with its default budget on first use"""
+
+    with _registry_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = _limiters[name] = RateLimiter(name, **DEFAULT_LIMITS.get(name, {}))
+        return limiter
+
+def configure_rate_limiter(name: str, **limits: Any) -> RateLimiter:
+    """Replace a provider's budget (e.g. for a higher usage tier); call before the pipeline is built"""
+
+    with _registry_lock:
+        limiter = _limiters[name] = RateLimiter(name, **{**DEFAULT_LIMITS.get(name, {}), **limits})
+        return limiter
+
+def rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
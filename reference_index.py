@@ -0,0 +1,381 @@
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+from pydantic import BaseModel
+
+from agno.tools import Toolkit
+
+from context_budget import DOI_PATTERN
+from paper_store import ARXIV_ID_PATTERN, parse_arxiv_id
+
+ARXIV_REFERENCE_PATTERN = re.compile(r"arxiv(?:\.org/(?:abs|pdf)/|:\s*)([A-Za-z\-.]*/?\d{4}\.?\d{3,5}(?:v\d+)?)", re.IGNORECASE)
+URL_PATTERN = re.compile(r"https?://[^\s<>\"]+")
+YEAR_IN_PARENS_PATTERN = re.compile(r"\((\d{4})[a-z]?\)")
+YEAR_PATTERN = re.compile(r"\b(19\d{2}|20\d{2})\b")
+
+# Titles shorter than this are too generic to match on alone
+MIN_TITLE_WORDS = 3
+
+class ReferenceRecord(BaseModel):
+    """One cited work, identified by DOI, arXiv ID and/or normalized title"""
+    id: Optional[int] = None
+    doi: Optional[str] = None
+    arxiv_id: Optional[str] = None
+    title: Optional[str] = None
+    normalized_title: Optional[str] = None
+    authors: Optional[str] = None
+    year: Optional[int] = None
+    url: Optional[str] = None
+    formatted: Optional[str] = None
+    cite_count: int = 0
+    seen_count: int = 0
+
+def normalize_title(title: Optional[str]) -> Optional[str]:
+    """Lower-case alphanumeric words only, so punctuation and casing differences still match"""
+
+    if not title:
+        return None
+    words = re.findall(r"[a-z0-9]+", title.lower())
+    return " ".join(words) if len(words) >= MIN_TITLE_WORDS else None
+
+def normalize_doi(value: Optional[str]) -> Optional[str]:
+    match = DOI_PATTERN.search(value or "")
+    return match.group(1).rstrip(".,;)]").lower() if match else None
+
+def normalize_arxiv_id(value: Optional[str]) -> Optional[str]:
+    """Base arXiv ID without version, so every version of a preprint is one reference"""
+
+    if not value:
+        return None
+    try:
+        return parse_arxiv_id(value)[0]
+    except ValueError:
+        return None
+
+def parse_reference(text: str) -> ReferenceRecord:
+    """Pull DOI, arXiv ID, URL, year, authors and title out of a free-text APA-style reference"""
+
+    text = text.strip()
+    arxiv_match = ARXIV_REFERENCE_PATTERN.search(text)
+    url_match = URL_PATTERN.search(text)
+    year_match = YEAR_IN_PARENS_PATTERN.search(text) or YEAR_PATTERN.search(text)
+
+    authors = title = None
+    quoted = re.search(r"[\"“]([^\"”]+)[\"”]", text)
+    if quoted:
+        title = quoted.group(1)
+    if year_match and year_match.re is YEAR_IN_PARENS_PATTERN:
+        authors = text[:year_match.start()].strip(" .,") or None
+        if title is None:
+            # APA: "Authors (Year). Title. Venue."
+            rest = text[year_match.end():].lstrip(" .")
+            title = re.split(r"\.\s|\?\s|$", rest, maxsplit=1)[0]
+    if title is None:
+        title = re.split(r"\.\s", text, maxsplit=1)[0]
+    title = title.strip(" .*_\"") or None
+
+    return ReferenceRecord(
+        doi=normalize_doi(text),
+        arxiv_id=normalize_arxiv_id(arxiv_match.group(1)) if arxiv_match else None,
+        title=title,
+        normalized_title=normalize_title(title),
+        authors=authors,
+        year=int(year_match.group(1)) if year_match else None,
+        url=url_match.group(0).rstrip(".,;)") if url_match else None,
+        formatted=text
+    )
+
+def records_from_tool_output(output: str) -> List[ReferenceRecord]:
+    """Turn Exa or ArXiv toolkit JSON output into reference records"""
+
+    try:
+        items = json.loads(output)
+    except (TypeError, ValueError):
+        return []
+    if not isinstance(items, list):
+        return []
+
+    records = [record_from_tool_item(item) for item in items if isinstance(item, dict)]
+    return [record for record in records if record is not None]
+
+def record_from_tool_item(item: Dict[str, Any]) -> Optional[ReferenceRecord]:
+    """Reference record for one Exa or ArXiv result, or None if it has no title"""
+
+    if not item.get("title"):
+        return None
+    url = item.get("url") or item.get("entry_id")
+    # ArXiv results carry the ID in "id"; Exa results may link to arxiv.org
+    if "entry_id" in item or "pdf_url" in item:
+        arxiv_id = normalize_arxiv_id(item.get("id"))
+    else:
+        arxiv_id = normalize_arxiv_id(url) if url and "arxiv.org" in url else None
+    authors = item.get("authors") if isinstance(item.get("authors"), list) else None
+    published = str(item.get("published") or item.get("published_date") or "")
+    year_match = YEAR_PATTERN.search(published)
+    return ReferenceRecord(
+        doi=normalize_doi(item.get("doi") or url),
+        arxiv_id=arxiv_id,
+        title=item["title"].strip(),
+        normalized_title=normalize_title(item["title"]),
+        authors=", ".join(authors) if authors else item.get("author"),
+        year=int(year_match.group(1)) if year_match else None,
+        url=url
+    )
+
+def format_reference(record: ReferenceRecord) -> str:
+    """APA-style citation line for a record that has no stored free-text form"""
+
+    parts = [record.authors or "Unknown author", f"({record.year or 'n.d.'}).", f"{record.title}."]
+    if record.doi:
+        parts.append(f"https://doi.org/{record.doi}")
+    elif record.arxiv_id:
+        parts.append(f"arXiv:{record.arxiv_id}")
+    elif record.url:
+        parts.append(record.url)
+    return " ".join(parts)
+
+class ReferenceIndex:
+    """Persistent index of every cited or discovered work, shared across papers and runs"""
+
+    COLUMNS = ("id", "doi", "arxiv_id", "title", "normalized_title", "authors", "year", "url", "formatted",
+               "cite_count", "seen_count")
+
+    def __init__(self, db_file: str = "./research_references.db"):
+        self.db_file = db_file
+        self.lookups = 0
+        self.hits = 0
+
+        # Tools may run in worker threads, so share one connection behind a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS reference_entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                doi TEXT,
+                arxiv_id TEXT,
+                title TEXT,
+                normalized_title TEXT,
+                authors TEXT,
+                year INTEGER,
+                url TEXT,
+                formatted TEXT,
+                cite_count INTEGER NOT NULL DEFAULT 0,
+                seen_count INTEGER NOT NULL DEFAULT 0,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_reference_doi ON reference_entries (doi) WHERE doi IS NOT NULL"
+        )
+        self._conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_reference_arxiv ON reference_entries (arxiv_id) "
+            "WHERE arxiv_id IS NOT NULL"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_reference_title ON reference_entries (normalized_title)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_reference_cite_count ON reference_entries (cite_count)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS reference_citations (
+                reference_id INTEGER NOT NULL,
+                paper TEXT NOT NULL,
+                cited_at TEXT NOT NULL,
+                PRIMARY KEY (reference_id, paper)
+            )
+        """)
+        self._conn.commit()
+
+    def _row_to_record(self, row: Optional[tuple]) -> Optional[ReferenceRecord]:
+        return ReferenceRecord(**dict(zip(self.COLUMNS, row))) if row else None
+
+    def _find(self, doi: Optional[str], arxiv_id: Optional[str],
+              normalized_title: Optional[str]) -> Optional[ReferenceRecord]:
+        columns = ", ".join(self.COLUMNS)
+        for column, value in (("doi", doi), ("arxiv_id", arxiv_id), ("normalized_title", normalized_title)):
+            if value:
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM reference_entries WHERE {column} = ? LIMIT 1", (value,)
+                ).fetchone()
+                if row:
+                    return self._row_to_record(row)
+        return None
+
+    def _owned_elsewhere(self, column: str, value: Optional[str], record_id: int) -> bool:
+        return value is not None and self._conn.execute(
+            f"SELECT 1 FROM reference_entries WHERE {column} = ? AND id != ?", (value, record_id)
+        ).fetchone() is not None
+
+    def _upsert(self, record: ReferenceRecord, cited: bool) -> int:
+        # Called with the lock held; fills gaps in an existing entry rather than overwriting it
+        now = datetime.now().isoformat()
+        existing = self._find(record.doi, record.arxiv_id, record.normalized_title)
+        if existing is None:
+            cursor = self._conn.execute(
+                "INSERT INTO reference_entries (doi, arxiv_id, title, normalized_title, authors, year, url, formatted, "
+                "cite_count, seen_count, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (record.doi, record.arxiv_id, record.title, record.normalized_title, record.authors, record.year,
+                 record.url, record.formatted, int(cited), int(not cited), now, now)
+            )
+            return cursor.lastrowid
+
+        # An identifier already attached to another entry stays there
+        doi = None if self._owned_elsewhere("doi", record.doi, existing.id) else record.doi
+        arxiv_id = None if self._owned_elsewhere("arxiv_id", record.arxiv_id, existing.id) else record.arxiv_id
+        self._conn.execute(
+            "UPDATE reference_entries SET doi = COALESCE(doi, ?), arxiv_id = COALESCE(arxiv_id, ?), "
+            "title = COALESCE(title, ?), normalized_title = COALESCE(normalized_title, ?), "
+            "authors = COALESCE(authors, ?), year = COALESCE(year, ?), url = COALESCE(url, ?), "
+            "formatted = COALESCE(formatted, ?), cite_count = cite_count + ?, seen_count = seen_count + ?, "
+            "last_seen = ? WHERE id = ?",
+            (doi, arxiv_id, record.title, record.normalized_title, record.authors, record.year, record.url,
+             record.formatted, int(cited), int(not cited), now, existing.id)
+        )
+        return existing.id
+
+    def add(self, record: ReferenceRecord, cited: bool = False) -> int:
+        """Insert or merge one record and return its id"""
+
+        with self._lock:
+            record_id = self._upsert(record, cited)
+            self._conn.commit()
+        return record_id
+
+    def add_tool_results(self, output: str) -> int:
+        """Index every work in an Exa/ArXiv JSON result; returns how many records were indexed"""
+
+        records = records_from_tool_output(output)
+        if records:
+            with self._lock:
+                for record in records:
+                    self._upsert(record, cited=False)
+                self._conn.commit()
+        return len(records)
+
+    def add_paper_references(self, references: List[str], paper: str) -> List[str]:
+        """Index a paper's references and return them deduplicated, in a consistent form across papers"""
+
+        now = datetime.now().isoformat()
+        canonical: List[str] = []
+        seen_ids = set()
+        with self._lock:
+            for reference in references:
+                record = parse_reference(reference)
+                record_id = self._upsert(record, cited=True)
+                if record_id in seen_ids:
+                    continue
+                seen_ids.add(record_id)
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO reference_citations (reference_id, paper, cited_at) VALUES (?, ?, ?)",
+                    (record_id, paper, now)
+                )
+                stored = self._row_to_record(self._conn.execute(
+                    f"SELECT {', '.join(self.COLUMNS)} FROM reference_entries WHERE id = ?", (record_id,)
+                ).fetchone())
+                canonical.append(stored.formatted or format_reference(stored))
+            self._conn.commit()
+        return canonical
+
+    def lookup(self, doi: Optional[str] = None, arxiv_id: Optional[str] = None,
+               title: Optional[str] = None) -> Optional[ReferenceRecord]:
+        """Find a work by DOI, arXiv ID (any version) or title using the indexed columns"""
+
+        with self._lock:
+            self.lookups += 1
+            record = self._find(normalize_doi(doi), normalize_arxiv_id(arxiv_id), normalize_title(title))
+            if record is not None:
+                self.hits += 1
+        return record
+
+    def resolve(self, identifier: str) -> Optional[ReferenceRecord]:
+        """Look up a free-form identifier: a DOI, an arXiv ID/URL, a full reference string or a title"""
+
+        parsed = parse_reference(identifier)
+        arxiv_id = parsed.arxiv_id
+        if arxiv_id is None and ARXIV_ID_PATTERN.fullmatch(identifier.strip()):
+            # A bare ID carries no "arXiv" marker; IDs inside other text (e.g. a DOI suffix) are not arXiv IDs
+            arxiv_id = identifier
+        return self.lookup(doi=parsed.doi, arxiv_id=arxiv_id, title=parsed.title)
+
+    def search(self, query: str, limit: int = 10) -> List[ReferenceRecord]:
+        """Titles containing every query word, most cited first"""
+
+        words = re.findall(r"[a-z0-9]+", query.lower())
+        if not words:
+            return []
+        conditions = " AND ".join("normalized_title LIKE ?" for _ in words)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM reference_entries WHERE {conditions} "
+                "ORDER BY cite_count DESC, seen_count DESC LIMIT ?",
+                (*(f"%{word}%" for word in words), limit)
+            ).fetchall()
+        return [self._row_to_record(row) for row in rows]
+
+    def most_cited(self, limit: int = 20) -> List[ReferenceRecord]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM reference_entries WHERE cite_count > 0 "
+                "ORDER BY cite_count DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._row_to_record(row) for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return index size and lookup hit rate"""
+
+        with self._lock:
+            references, cited = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(cite_count > 0), 0) FROM reference_entries"
+            ).fetchone()
+            papers = self._conn.execute("SELECT COUNT(DISTINCT paper) FROM reference_citations").fetchone()[0]
+        return {
+            "references": references,
+            "cited_references": cited,
+            "papers": papers,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+        }
+
+class ReferenceIndexTools(Toolkit):
+    """Lets the agent check the local reference index before searching externally"""
+
+    def __init__(self, reference_index: ReferenceIndex, **kwargs):
+        self.reference_index = reference_index
+        super().__init__(name="reference_index", tools=[self.lookup_reference, self.search_references], **kwargs)
+
+    @staticmethod
+    def _to_json(records: Union[ReferenceRecord, List[ReferenceRecord], None]) -> str:
+        if records is None:
+            return json.dumps({"found": False})
+        if isinstance(records, ReferenceRecord):
+            records = [records]
+        return json.dumps([
+            {**r.model_dump(exclude={"id", "normalized_title"}), "citation": r.formatted or format_reference(r)}
+            for r in records
+        ], indent=4)
+
+    def lookup_reference(self, identifier: str) -> str:
+        """Use this function to check whether a paper is already known locally before searching for it.
+
+        Args:
+            identifier (str): A DOI, an arXiv ID or URL, a full reference string or a paper title.
+
+        Returns:
+            str: JSON with the stored reference (title, authors, year, DOI, arXiv ID, URL, citation), or {"found": false}.
+        """
+        return self._to_json(self.reference_index.resolve(identifier))
+
+    def search_references(self, query: str, limit: int = 10) -> str:
+        """Use this function to find previously cited or discovered papers whose titles match a query.
+
+        Args:
+            query (str): Words that must all appear in the title.
+            limit (int): Maximum number of references to return. Defaults to 10.
+
+        Returns:
+            str: JSON list of matching references, most frequently cited first.
+        """
+        return self._to_json(self.reference_index.search(query, limit))
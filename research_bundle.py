@@ -0,0 +1,199 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from context_budget import STOPWORDS, TEXT_FIELDS, WORD_PATTERN, ContextCompactor, estimate_tokens, identity_keys
+from paper_cache import normalize_focus_areas, normalize_topic
+from reference_index import record_from_tool_item
+from router import ResearchOutline
+
+# Bump when the bundle layout changes; older bundles are then collected again instead of loaded
+BUNDLE_VERSION = 1
+MAX_PASSAGES_PER_SOURCE = 6
+MAX_PASSAGE_CHARS = 1200
+MIN_PASSAGE_WORDS = 8
+
+
+class BundleSource(BaseModel):
+    """One work found during research, with the passages the model was shown from it"""
+    title: Optional[str] = None
+    url: Optional[str] = None
+    doi: Optional[str] = None
+    arxiv_id: Optional[str] = None
+    authors: Optional[str] = None
+    year: Optional[int] = None
+    tools: List[str] = Field(default_factory=list)
+    queries: List[str] = Field(default_factory=list)
+    passages: List[str] = Field(default_factory=list)
+
+class ResearchBundle(BaseModel):
+    """Output of the collect phase: everything the write phase needs, with no searching left to do"""
+    bundle_version: int = BUNDLE_VERSION
+    topic: str
+    focus_areas: List[str] = Field(default_factory=list)
+    created_at: str
+    model_id: str
+    prompt_version: str
+    outline: ResearchOutline
+    sources: List[BundleSource] = Field(default_factory=list)
+
+    @property
+    def citations(self) -> List[str]:
+        return self.outline.references
+
+    @property
+    def gap_notes(self) -> List[str]:
+        return self.outline.research_gaps_identified
+
+    def excerpts(self, query: str, max_tokens: int = 1500) -> List[str]:
+        """Source passages most relevant to `query` (BM25), as "Title: passage" lines within a token budget"""
+
+        items = [{"title": source.title or "", "text": passage} for source in self.sources for passage in source.passages]
+        terms = [word for word in WORD_PATTERN.findall(query.lower()) if word not in STOPWORDS and len(word) > 1]
+        selected, used = [], 0
+        for item in ContextCompactor.rank(items, terms):
+            line = f"{item['title']}: {item['text']}" if item["title"] else item["text"]
+            cost = estimate_tokens(line)
+            if used + cost <= max_tokens:
+                selected.append(line)
+                used += cost
+        return selected
+
+def _trim(text: str, max_chars: int = MAX_PASSAGE_CHARS) -> str:
+    return text if len(text) <= max_chars else text[:max_chars].rsplit(" ", 1)[0] + " …"
+
+def item_passages(item: Dict[str, Any]) -> List[str]:
+    """Paragraphs of a tool result's prose fields (text, summary, highlights, page content)"""
+
+    passages = []
+    for field in TEXT_FIELDS:
+        value = item.get(field)
+        for part in value if isinstance(value, list) else [value]:
+            text = part.get("text") if isinstance(part, dict) else part
+            if not isinstance(text, str):
+                continue
+            for paragraph in re.split(r"\n\s*\n", text):
+                paragraph = " ".join(paragraph.split())
+                if len(paragraph.split()) >= MIN_PASSAGE_WORDS:
+                    passages.append(_trim(paragraph))
+    return passages
+
+def sources_from_tool_items(items: List[Dict[str, Any]]) -> List[BundleSource]:
+    """Merge collected tool results into one source per work (same DOI, arXiv ID or URL), in first-seen order"""
+
+    sources: List[BundleSource] = []
+    by_key: Dict[str, BundleSource] = {}
+    for item in items:
+        keys = identity_keys(item)
+        source = next((by_key[key] for key in keys if key in by_key), None)
+        if source is None:
+            record = record_from_tool_item(item)
+            if record is None and not keys:
+                continue
+            source = BundleSource(**record.model_dump(include={"title", "url", "doi", "arxiv_id", "authors", "year"})
+                                  if record else {"url": item.get("url")})
+            sources.append(source)
+        for key in keys:
+            by_key[key] = source
+
+        if item.get("_tool") and item["_tool"] not in source.tools:
+            source.tools.append(item["_tool"])
+        if item.get("_query") and item["_query"] not in source.queries:
+            source.queries.append(item["_query"])
+        for passage in item_passages(item):
+            if len(source.passages) >= MAX_PASSAGES_PER_SOURCE:
+                break
+            if passage not in source.passages:
+                source.passages.append(passage)
+    return sources
+
+class BundleStore:
+    """Research bundles as JSON files, one per normalized topic and focus-area set"""
+
+    def __init__(self, root_dir: str = "./research_bundles"):
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, topic: str, focus_areas: Optional[List[str]] = None) -> Path:
+        normalized = normalize_topic(topic)
+        key = json.dumps([normalized, normalize_focus_areas(focus_areas)])
+        slug = re.sub(r"[^a-z0-9]+", "_", normalized).strip("_")[:60]
+        return self.root_dir / f"{slug}_{hashlib.sha256(key.encode('utf-8')).hexdigest()[:12]}.json"
+
+    def save(self, bundle: ResearchBundle) -> Path:
+        path = self.path_for(bundle.topic, bundle.focus_areas)
+        # Write then rename, so a concurrent reader never sees half a bundle
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(bundle.model_dump_json(indent=2), encoding="utf-8")
+        os.replace(tmp_path, path)
+        return path
+
+    @staticmethod
+    def load(path: str) -> ResearchBundle:
+        return ResearchBundle.model_validate_json(Path(path).read_text(encoding="utf-8"))
+
+    def find(self, topic: str, focus_areas: Optional[List[str]] = None) -> Optional[ResearchBundle]:
+        """The saved bundle for this topic and focus areas, or None if missing or from an older layout"""
+
+        path = self.path_for(topic, focus_areas)
+        if not path.exists():
+            return None
+        bundle = self.load(str(path))
+        return bundle if bundle.bundle_version == BUNDLE_VERSION else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Topic, age and size of every saved bundle"""
+
+        summaries = []
+        for path in sorted(self.root_dir.glob("*.json")):
+            bundle = self.load(str(path))
+            summaries.append({
+                "path": str(path),
+                "topic": bundle.topic,
+                "focus_areas": bundle.focus_areas,
+                "created_at": bundle.created_at,
+                "sources": len(bundle.sources),
+                "passages": sum(len(source.passages) for source in bundle.sources),
+                "citations": len(bundle.citations),
+            })
+        return summaries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List research bundles or write a paper from one without re-researching")
+    parser.add_argument("--bundle-dir", default="./research_bundles", help="Directory holding the bundles")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="Show every saved bundle")
+    write_parser = subparsers.add_parser("write", help="Write a paper from a bundle (generation cost only)")
+    write_parser.add_argument("bundle", help="Bundle JSON file")
+    write_parser.add_argument("--topic", help="Write on a related angle instead of the bundle's topic")
+    write_parser.add_argument("--focus-areas", nargs="+", help="Focus areas for the written paper")
+    write_parser.add_argument("--section-words", type=int, nargs=2, default=[300, 450], metavar=("MIN", "MAX"),
+                              help="Target words per section")
+    write_parser.add_argument("--max-concurrency", type=int, default=4, help="Sections written at once")
+    write_parser.add_argument("--output-dir", default="./generated_papers", help="Directory for the paper")
+    args = parser.parse_args()
+
+    store = BundleStore(args.bundle_dir)
+    if args.command == "list":
+        for summary in store.list():
+            print(f"📦 {summary['topic']}  ({summary['sources']} sources, {summary['passages']} passages, "
+                  f"{summary['citations']} citations, {summary['created_at']})  →  {summary['path']}")
+    else:
+        from router import AdvancedResearchPipelineAgent
+
+        pipeline = AdvancedResearchPipelineAgent(lazy=True)
+        pipeline.bundle_store = store
+        bundle = store.load(args.bundle)
+        paper = asyncio.run(pipeline.write_from_bundle(bundle, args.topic, args.focus_areas, args.max_concurrency,
+                                                       tuple(args.section_words)))
+        pipeline.save_paper(pipeline.format_research_paper(paper), args.topic or bundle.topic, args.output_dir)
+        pipeline.metrics.print_summary()
+        pipeline.print_model_report(papers=1)
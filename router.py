@@ -1,31 +1,59 @@
 import asyncio
+import hashlib
 import json
+import os
+from functools import cached_property
 from pathlib import Path
 from textwrap import dedent
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, AsyncIterator, Tuple, Union, TYPE_CHECKING
 from datetime import datetime
 from pydantic import BaseModel, Field
 
-from agno.agent import Agent
-from agno.models.aws import Claude
-from agno.models.openai import OpenAIChat
-from agno.tools.exa import ExaTools
-from agno.tools.arxiv import ArxivTools
-from agno.tools.reasoning import ReasoningTools
-from agno.knowledge.knowledge import Knowledge
-from agno.vectordb.lancedb import LanceDb
-from agno.db.sqlite import SqliteDb
 from dotenv import load_dotenv
 
+from context_budget import collect_tool_sources, research_focus
+
+# agno, the model SDKs, LanceDB and the search backends are imported on first use,
+# so importing this module or formatting a paper doesn't pay for them
+if TYPE_CHECKING:
+    from agno.agent import Agent
+    from agno.models.openai import OpenAIChat
+    from agno.knowledge.knowledge import Knowledge
+    from agno.db.sqlite import SqliteDb
+    from tool_cache import ToolResultCache
+    from paper_store import ArxivPaperStore
+    from pipeline_metrics import PipelineMetrics
+    from context_budget import ContextCompactor
+    from reference_index import ReferenceIndex
+    from session_store import SessionStore
+    from vector_index import IndexedLanceDb
+    from embedding_cache import CachedEmbedder
+    from paper_cache import PaperResultCache
+    from research_bundle import BundleSource, BundleStore, ResearchBundle
+    from citation_verifier import CitationReport, CitationVerifier
+    from checkpoint_store import CheckpointStore
+    from model_router import ModelRouter
+
 load_dotenv()
 
-# Set up AWS credentials
-import os
-AWS_ACCESS_KEY = os.environ["AWS_ACCESS_KEY_ID"]
-AWS_SECRET_ACCESS_KEY = os.environ["AWS_SECRET_ACCESS_KEY"]
-AWS_REGION = os.environ["AWS_S3_REGION"]
-EXA_API_KEY = os.environ["EXA_API_KEY"]
-OPENAI_API_KEY = os.environ["OPENAI_API_KEY"]
+# Credentials are resolved from the environment when first needed, not at import time
+CREDENTIAL_ENV_VARS = {
+    "AWS_ACCESS_KEY": "AWS_ACCESS_KEY_ID",
+    "AWS_SECRET_ACCESS_KEY": "AWS_SECRET_ACCESS_KEY",
+    "AWS_REGION": "AWS_S3_REGION",
+    "EXA_API_KEY": "EXA_API_KEY",
+    "OPENAI_API_KEY": "OPENAI_API_KEY",
+}
+
+def get_credential(name: str) -> str:
+    """Return a credential by its module-level name; raises KeyError if the variable is unset"""
+    return os.environ[CREDENTIAL_ENV_VARS[name]]
+
+def __getattr__(name: str) -> str:
+    # Keeps `router.OPENAI_API_KEY` and friends working without reading them on import
+    if name in CREDENTIAL_ENV_VARS:
+        return get_credential(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class ResearchPaper(BaseModel):
     """Comprehensive structured output for research paper generation"""
@@ -66,24 +94,276 @@ class ResearchPaper(BaseModel):
         description="Specific research gaps identified during the literature review"
     )
 
+MODEL_ID = "gpt-4.1"
+
+# Part of every result-cache key; bump it when the generation prompts change so older papers aren't served
+PROMPT_VERSION = "1"
+
+# Default target length of each written section, in words
+SECTION_WORDS = (300, 450)
+
+# Prose sections of ResearchPaper that can be written independently once the research is done
+PAPER_SECTIONS = [
+    "introduction",
+    "literature_review",
+    "methodology",
+    "results_and_discussion",
+    "implications_and_applications",
+    "limitations_and_future_work",
+    "conclusion",
+]
+
+# Numbered headings used by format_research_paper for each prose section
+PAPER_SECTION_HEADINGS = {
+    "introduction": "1. Introduction",
+    "literature_review": "2. Literature Review",
+    "methodology": "3. Methodology",
+    "results_and_discussion": "4. Results and Discussion",
+    "implications_and_applications": "5. Implications and Applications",
+    "limitations_and_future_work": "6. Limitations and Future Work",
+    "conclusion": "7. Conclusion",
+}
+
+class SectionOutline(BaseModel):
+    """Plan for a single paper section"""
+    section: str = Field(
+        description=f"Section identifier, one of: {', '.join(PAPER_SECTIONS)}"
+    )
+    key_points: List[str] = Field(
+        description="Arguments, findings and citations this section must cover"
+    )
+
+class ResearchOutline(BaseModel):
+    """Shared research context and outline used to write sections in parallel"""
+    title: str = Field(
+        description="Compelling, specific research paper title that clearly indicates the scope and focus"
+    )
+    abstract: str = Field(
+        description="Comprehensive abstract (200-300 words) including background, methods, key findings, and implications"
+    )
+    research_notes: str = Field(
+        description="Synthesized findings from all sources with (Author et al., Year) attributions, detailed enough to write every section from"
+    )
+    outline: List[SectionOutline] = Field(
+        description="One entry per paper section with the key points it must cover"
+    )
+    references: List[str] = Field(
+        description="Complete list of properly formatted academic references with DOIs/URLs where available"
+    )
+    key_insights: List[str] = Field(
+        description="3-5 bullet points highlighting the most important insights and contributions"
+    )
+    research_gaps_identified: List[str] = Field(
+        description="Specific research gaps identified during the literature review"
+    )
+
+class PaperFrontMatter(BaseModel):
+    """Title and abstract for a new topic, written from research collected for a near-identical one"""
+    title: str = Field(
+        description="Compelling, specific research paper title that clearly indicates the scope and focus"
+    )
+    abstract: str = Field(
+        description="Comprehensive abstract (200-300 words) including background, methods, key findings, and implications"
+    )
+
 class AdvancedResearchPipelineAgent:
-    def __init__(self):
+    def __init__(self, lazy: bool = False, metrics_file: Optional[str] = None,
+                 routing_policy: Optional[Dict[str, str]] = None):
+        # Stage events are appended here as JSON lines when set
+        self.metrics_file = metrics_file
+        # Overrides of model_router.DEFAULT_POLICY, e.g. {"source_review": "large"}
+        self.routing_policy = routing_policy
+
+        # With lazy=True the model, tools, databases and credentials are created on first use,
+        # so cache-hit and formatting-only paths never open them
+        if not lazy:
+            self.research_agent
+            self.outline_agent
+
+    @cached_property
+    def model(self) -> "OpenAIChat":
+        from agno.models.openai import OpenAIChat
+
         # Initialize AWS Bedrock Claude 3.5 Sonnet
-        # self.model = Claude(
+        # from agno.models.aws import Claude
+        # return Claude(
         #     id="us.anthropic.claude-sonnet-4-20250514-v1:0",
         #     max_tokens=8000,
-        #     aws_access_key=AWS_ACCESS_KEY,
-        #     aws_region=AWS_REGION,
-        #     aws_secret_key=AWS_SECRET_ACCESS_KEY
+        #     aws_access_key=get_credential("AWS_ACCESS_KEY"),
+        #     aws_region=get_credential("AWS_REGION"),
+        #     aws_secret_key=get_credential("AWS_SECRET_ACCESS_KEY")
         # )
         
-        self.model = OpenAIChat(api_key= OPENAI_API_KEY,
-                                id= "gpt-4.1")
-        
+        # The shared rate limiter retries 429s with backoff, so the SDK's own retries are turned off
+        return OpenAIChat(api_key= get_credential("OPENAI_API_KEY"),
+                          id= MODEL_ID,
+                          max_retries=0)
+
+    @cached_property
+    def small_model(self) -> "OpenAIChat":
+        from agno.models.openai import OpenAIChat
+        from model_router import DEFAULT_TIERS
+
+        # Planning, reasoning steps and reading search results; the main model only writes
+        return OpenAIChat(api_key= get_credential("OPENAI_API_KEY"),
+                          id= DEFAULT_TIERS["small"].model_id,
+                          max_retries=0)
+
+    @cached_property
+    def model_router(self) -> "ModelRouter":
+        from model_router import DEFAULT_TIERS, ModelRouter
+        from rate_limiter import get_rate_limiter
+
+        # Each tier has its own rate limiter (shared by every pipeline in the process), so its
+        # concurrency and budget are separate, as OpenAI's per-model limits are
+        return ModelRouter(
+            models={
+                "small": get_rate_limiter(DEFAULT_TIERS["small"].rate_limiter).instrument_model(self.small_model),
+                "large": get_rate_limiter(DEFAULT_TIERS["large"].rate_limiter).instrument_model(self.model),
+            },
+            tiers=DEFAULT_TIERS,
+            policy=self.routing_policy
+        )
+
+    @cached_property
+    def instrumented_model(self) -> "OpenAIChat":
+        # Routed to the small or large tier per call, timed by the metrics, then checkpointed
+        # so a failed run can replay the calls that already finished
+        model = self.model_router.instrument_model(self.model)
+        return self.checkpoints.instrument_model(self.metrics.instrument_model(model))
+
+    def print_model_report(self, papers: Optional[int] = None) -> None:
+        # All-cached runs never built the models, so there is nothing to report (and no credentials to need)
+        if "model_router" in self.__dict__:
+            self.model_router.print_report(papers)
+
+    @cached_property
+    def checkpoints(self) -> "CheckpointStore":
+        from checkpoint_store import CheckpointStore
+
+        # Steps of unfinished generations are kept for a week, then a rerun starts from scratch
+        return CheckpointStore(
+            db_file="./research_checkpoints.db",
+            max_age_seconds=7 * 24 * 3600,
+            metrics=self.metrics
+        )
+
+    @property
+    def model_id(self) -> str:
+        """The model each kind of call is routed to, e.g. "planning:gpt-4.1-mini,...,synthesis:gpt-4.1"
+
+        Part of the result cache and checkpoint keys, so papers from another model or routing policy never mix.
+        """
+        from model_router import DEFAULT_POLICY, DEFAULT_TIERS
+
+        # Cache lookups shouldn't build the models (or need their credentials) just to read their ids
+        tier_ids = {
+            "large": getattr(self.__dict__.get("model"), "id", None) or MODEL_ID,
+            "small": getattr(self.__dict__.get("small_model"), "id", None) or DEFAULT_TIERS["small"].model_id,
+        }
+        # Same resolution as ModelRouter.tier_for: unknown tiers fall back to the large model
+        policy = {**DEFAULT_POLICY, **(self.routing_policy or {})}
+        return ",".join(f"{kind}:{tier_ids.get(tier, tier_ids['large'])}" for kind, tier in sorted(policy.items()))
+
+    @cached_property
+    def prompt_version(self) -> str:
+        # Editing the agent instructions changes the version as well, without a manual bump
+        instructions = "\n".join(self._get_comprehensive_instructions())
+        return f"{PROMPT_VERSION}-{hashlib.sha256(instructions.encode('utf-8')).hexdigest()[:12]}"
+
+    @cached_property
+    def paper_cache(self) -> "PaperResultCache":
+        from paper_cache import PaperResultCache
+
+        # Finished papers are served for 30 days; near-identical topics (>= 80% term overlap) reuse the research
+        return PaperResultCache(
+            db_file="./research_paper_cache.db",
+            max_age_seconds=30 * 24 * 3600,
+            similarity_threshold=0.8
+        )
+
+    @cached_property
+    def bundle_store(self) -> "BundleStore":
+        from research_bundle import BundleStore
+
+        # Collected research, so rewrites and related papers don't repeat the searching
+        return BundleStore(
+            root_dir="./research_bundles"
+        )
+
+    @cached_property
+    def citation_verifier(self) -> "CitationVerifier":
+        from citation_verifier import CitationVerifier
+
+        # Cited sentences are checked against the passages the agent retrieved; one JSON report per paper
+        return CitationVerifier(
+            support_threshold=0.5,
+            weak_threshold=0.3,
+            report_dir="./citation_reports",
+            metrics=self.metrics
+        )
+
+    @cached_property
+    def metrics(self) -> "PipelineMetrics":
+        from pipeline_metrics import PipelineMetrics
+
+        # Stage timings, token counts and retries for every run of this pipeline
+        return PipelineMetrics(jsonl_file=self.metrics_file)
+
+    @cached_property
+    def tool_cache(self) -> "ToolResultCache":
+        from tool_cache import ToolResultCache
+
+        # Persistent cache so repeated or overlapping searches skip the network
+        return ToolResultCache(
+            db_file="./research_tool_cache.db"
+        )
+
+    @cached_property
+    def context_compactor(self) -> "ContextCompactor":
+        from context_budget import ContextCompactor
+
+        # Deduplicate, rank and trim each search/read result to ~6k tokens before the model sees it
+        return ContextCompactor(
+            max_tokens=6000,
+            metrics=self.metrics
+        )
+
+    @cached_property
+    def reference_index(self) -> "ReferenceIndex":
+        from reference_index import ReferenceIndex
+
+        # One deduplicated reference list shared by every paper, keyed on DOI, arXiv ID and title
+        return ReferenceIndex(
+            db_file="./research_references.db"
+        )
+
+    @cached_property
+    def paper_store(self) -> "ArxivPaperStore":
+        from paper_store import ArxivPaperStore
+        from rate_limiter import get_rate_limiter
+
+        # Deduplicated arXiv PDF store shared across runs and topics
+        return ArxivPaperStore(
+            root_dir="./research_papers",
+            rate_limiter=get_rate_limiter("arxiv_pdf")
+        )
+
+    @cached_property
+    def tools(self) -> List[Any]:
+        from agno.tools.reasoning import ReasoningTools
+        from tool_cache import CachedExaTools, CachedArxivTools
+        from reference_index import ReferenceIndexTools
+        from rate_limiter import get_rate_limiter
+
         # Configure comprehensive research tools
-        self.tools = [
+        return [
             # Enhanced Exa search with academic focus
-            ExaTools(
+            CachedExaTools(
+                result_cache=self.tool_cache,
+                compactor=self.context_compactor,
+                reference_index=self.reference_index,
+                rate_limiter=get_rate_limiter("exa"),
                 num_results=20,
                 include_domains=[
                     "arxiv.org", "scholar.google.com", "researchgate.net",
@@ -97,17 +377,27 @@ class AdvancedResearchPipelineAgent:
                 highlights=True,
                 summary=True,
                 use_autoprompt=True,
-                api_key=EXA_API_KEY,
+                api_key=get_credential("EXA_API_KEY"),
             ),
             
             # ArXiv tools for academic papers
-            ArxivTools(
+            CachedArxivTools(
+                result_cache=self.tool_cache,
+                paper_store=self.paper_store,
+                compactor=self.context_compactor,
+                reference_index=self.reference_index,
+                rate_limiter=get_rate_limiter("arxiv"),
                 enable_search_arxiv=True,
                 enable_read_arxiv_papers=True,
                 download_dir=Path("./research_papers"),
                 # max_results=15
             ),
             
+            # Lookups against references already found for earlier papers
+            ReferenceIndexTools(
+                reference_index=self.reference_index
+            ),
+            
             # Reasoning tools for structured thinking
             ReasoningTools(
                 enable_think=True,
@@ -116,32 +406,76 @@ class AdvancedResearchPipelineAgent:
                 add_few_shot=True
             )
         ]
-        
-        # Set up local databases
-        self.vector_db = LanceDb(
+
+    @cached_property
+    def embedder(self) -> "CachedEmbedder":
+        from agno.knowledge.embedder.openai import OpenAIEmbedder
+        from embedding_cache import CachedEmbedder, EmbeddingCache
+
+        # Identical chunks are embedded once per embedding model, across topics and documents
+        return CachedEmbedder(
+            embedder=OpenAIEmbedder(),
+            cache=EmbeddingCache(cache_dir="./research_embedding_cache")
+        )
+
+    # Set up local databases
+    @cached_property
+    def vector_db(self) -> "IndexedLanceDb":
+        from agno.vectordb.search import SearchType
+        from vector_index import IndexedLanceDb
+
+        # Hybrid BM25 + vector search; an ANN index is built once the table passes 50k chunks
+        return IndexedLanceDb(
             table_name="research_knowledge",
             uri="./research_vectordb",
+            embedder=self.embedder,
+            search_type=SearchType.hybrid,
+            index_threshold=50000
         )
-        
-        self.contents_db = SqliteDb(
+
+    @cached_property
+    def contents_db(self) -> "SqliteDb":
+        from agno.db.sqlite import SqliteDb
+
+        return SqliteDb(
             db_file="./research_content.db"
         )
-        
-        self.knowledge = Knowledge(
+
+    @cached_property
+    def knowledge(self) -> "Knowledge":
+        from agno.knowledge.knowledge import Knowledge
+
+        return Knowledge(
             vector_db=self.vector_db,
             contents_db=self.contents_db
         )
-        
-        self.agent_db = SqliteDb(
-            db_file="./research_agent_sessions.db"
+
+    @cached_property
+    def session_store(self) -> "SessionStore":
+        from session_store import SessionStore
+
+        # WAL-mode session database; each topic keeps its 10 newest sessions, and `compact` prunes by age
+        return SessionStore(
+            db_file="./research_agent_sessions.db",
+            max_age_days=30,
+            max_sessions_per_topic=10
         )
-        
+
+    @cached_property
+    def agent_db(self) -> "SqliteDb":
+        return self.session_store.create_db()
+
+    @cached_property
+    def research_agent(self) -> "Agent":
+        from agno.agent import Agent
+
         # Create the enhanced research agent
-        self.research_agent = Agent(
+        return Agent(
             name="Advanced Research Paper Generator",
             debug_mode=True,
-            model=self.model,
+            model=self.instrumented_model,
             tools=self.tools,
+            tool_hooks=[self.metrics.tool_hook, self.checkpoints.tool_hook],
             knowledge=self.knowledge,
             db=self.agent_db,
             search_knowledge=True,
@@ -154,7 +488,30 @@ class AdvancedResearchPipelineAgent:
             retries=2,
             delay_between_retries=3
         )
-    
+
+    @cached_property
+    def outline_agent(self) -> "Agent":
+        from agno.agent import Agent
+
+        # Research-only agent for the parallel mode: gathers sources and plans sections
+        return Agent(
+            name="Research Outline Planner",
+            debug_mode=True,
+            model=self.instrumented_model,
+            tools=self.tools,
+            tool_hooks=[self.metrics.tool_hook, self.checkpoints.tool_hook],
+            knowledge=self.knowledge,
+            db=self.agent_db,
+            search_knowledge=True,
+            reasoning=True,
+            instructions=self._get_comprehensive_instructions(),
+            output_schema=ResearchOutline,
+            add_datetime_to_context=True,
+            add_name_to_context=True,
+            retries=2,
+            delay_between_retries=3
+        )
+
     def _get_comprehensive_instructions(self) -> List[str]:
         return [
             # Core Research Methodology
@@ -165,13 +522,41 @@ class AdvancedResearchPipelineAgent:
             
             RESEARCH PROCESS:
             1. **Initial Analysis**: Use reasoning tools to break down the topic and identify key research areas
-            2. **Literature Discovery**: Search extensively using Exa for recent papers, reviews, and academic sources
-            3. **ArXiv Integration**: Find relevant preprints and cutting-edge research from ArXiv
-            4. **Knowledge Synthesis**: Analyze and synthesize findings from all sources
-            5. **Gap Analysis**: Identify research gaps and opportunities for contribution
-            6. **Original Insights**: Generate novel insights based on comprehensive analysis
+            2. **Known References**: Check search_references and lookup_reference for works already indexed from earlier papers
+            3. **Literature Discovery**: Search extensively using Exa for recent papers, reviews, and academic sources
+            4. **ArXiv Integration**: Find relevant preprints and cutting-edge research from ArXiv
+            5. **Knowledge Synthesis**: Analyze and synthesize findings from all sources
+            6. **Gap Analysis**: Identify research gaps and opportunities for contribution
+            7. **Original Insights**: Generate novel insights based on comprehensive analysis
+            """),
+            
+            *self._get_writing_instructions(),
+            
+            # Quality Assurance
+            dedent("""
+            **QUALITY ASSURANCE:**
+            - Verify all facts and figures against multiple sources
+            - Ensure methodological rigor in analysis and interpretation
+            - Address potential counterarguments and limitations honestly
+            - Provide practical implications and real-world applications
+            - Suggest specific, actionable future research directions
+            - Maintain objectivity while highlighting significance of findings
             """),
             
+            # Reasoning Integration
+            dedent("""
+            **REASONING INTEGRATION:**
+            - Use reasoning tools to think through complex problems step-by-step
+            - Analyze relationships between different research findings
+            - Evaluate the strength of evidence for different claims
+            - Consider multiple perspectives and potential biases
+            - Synthesize information from diverse sources into coherent insights
+            - Apply critical thinking to identify research gaps and opportunities
+            """)
+        ]
+    
+    def _get_writing_instructions(self) -> List[str]:
+        return [
             # Academic Writing Standards
             dedent("""
             **ACADEMIC WRITING STANDARDS:**
@@ -204,35 +589,13 @@ class AdvancedResearchPipelineAgent:
             - Use subsections where appropriate for complex topics
             - Include clear topic sentences and paragraph structure
             - Maintain consistent terminology throughout the paper
-            """),
-            
-            # Quality Assurance
-            dedent("""
-            **QUALITY ASSURANCE:**
-            - Verify all facts and figures against multiple sources
-            - Ensure methodological rigor in analysis and interpretation
-            - Address potential counterarguments and limitations honestly
-            - Provide practical implications and real-world applications
-            - Suggest specific, actionable future research directions
-            - Maintain objectivity while highlighting significance of findings
-            """),
-            
-            # Reasoning Integration
-            dedent("""
-            **REASONING INTEGRATION:**
-            - Use reasoning tools to think through complex problems step-by-step
-            - Analyze relationships between different research findings
-            - Evaluate the strength of evidence for different claims
-            - Consider multiple perspectives and potential biases
-            - Synthesize information from diverse sources into coherent insights
-            - Apply critical thinking to identify research gaps and opportunities
             """)
         ]
     
-    def format_research_paper(self, paper: ResearchPaper) -> str:
-        """Format the research paper with proper academic structure and styling"""
+    def format_paper_header(self, paper: Union[ResearchPaper, ResearchOutline]) -> str:
+        """Format the title, abstract and keywords that open the paper"""
         
-        formatted_paper = f"""
+        return f"""
 # {paper.title}
 
 ## Abstract
@@ -243,55 +606,172 @@ class AdvancedResearchPipelineAgent:
 
 ---
 
-## 1. Introduction
-
-{paper.introduction}
-
-## 2. Literature Review
+"""
+    
+    def format_paper_section(self, section: str, body: str, paper: Union[ResearchPaper, ResearchOutline]) -> str:
+        """Format one numbered section, including its research gaps or key insights subsection"""
+        
+        formatted_section = f"""## {PAPER_SECTION_HEADINGS[section]}
 
-{paper.literature_review}
+{body}
 
-### 2.1 Research Gaps Identified
+"""
+        if section == "literature_review":
+            formatted_section += f"""### 2.1 Research Gaps Identified
 
 {chr(10).join(f"• {gap}" for gap in paper.research_gaps_identified)}
 
-## 3. Methodology
+"""
+        elif section == "conclusion":
+            formatted_section += f"""### Key Insights
 
-{paper.methodology}
+{chr(10).join(f"• {insight}" for insight in paper.key_insights)}
 
-## 4. Results and Discussion
+"""
+        return formatted_section
+    
+    def format_paper_footer(self, paper: Union[ResearchPaper, ResearchOutline]) -> str:
+        """Format the reference list and generation footer"""
+        
+        return f"""## References
 
-{paper.results_and_discussion}
+{chr(10).join(f"{i+1}. {ref}" for i, ref in enumerate(paper.references))}
+
+---
 
-## 5. Implications and Applications
+*Generated on {datetime.now().strftime("%B %d, %Y")} using Advanced Research Pipeline*
+*Total References: {len(paper.references)}*
+"""
+    
+    def iter_paper_sections(self, paper: ResearchPaper) -> Iterator[str]:
+        """Yield the formatted paper piece by piece, in document order"""
+        
+        yield self.format_paper_header(paper)
+        for section in PAPER_SECTIONS:
+            yield self.format_paper_section(section, getattr(paper, section), paper)
+        yield self.format_paper_footer(paper)
+    
+    def canonicalize_references(self, paper: Union[ResearchPaper, ResearchOutline], topic: str) -> None:
+        """Replace the paper's references with deduplicated entries from the shared reference index"""
+        
+        paper.references = self.reference_index.add_paper_references(paper.references, topic)
+    
+    def cached_paper(self, topic: str, focus_areas: Optional[List[str]] = None) -> Optional[ResearchPaper]:
+        """Return the stored paper for this exact request, if there is a fresh one"""
+        
+        paper = self.paper_cache.get("paper", topic, focus_areas, self.model_id, self.prompt_version, ResearchPaper)
+        if paper is not None:
+            print(f"♻️  Using cached paper for: {topic}")
+            self.metrics.record("result_cache", name="paper", status="hit")
+        return paper
+    
+    async def _cached_outline(self, topic: str, focus_areas: Optional[List[str]]) -> Optional[ResearchOutline]:
+        outline = self.paper_cache.get("outline", topic, focus_areas, self.model_id, self.prompt_version,
+                                       ResearchOutline)
+        if outline is not None:
+            self.metrics.record("result_cache", name="outline", status="hit")
+            return outline
+        similar = self.paper_cache.find_similar("outline", topic, focus_areas, self.model_id, self.prompt_version,
+                                                ResearchOutline)
+        if similar is None:
+            return None
+        outline, match = similar
+        print(f"♻️  Reusing research for '{match.topic}' ({match.similarity:.0%} similar); rewriting the sections")
+        self.metrics.record("result_cache", name="outline", status="similar", similarity=match.similarity)
 
-{paper.implications_and_applications}
+        # The research carries over, but the title and abstract must describe this topic, not the matched one
+        outline = await self.rewrite_front_matter(topic, focus_areas, outline)
+        self.paper_cache.put("outline", topic, focus_areas, self.model_id, self.prompt_version, outline)
+        # This topic's bundle holds the matched topic's sources, so its citations are verified against them
+        bundle = self.bundle_store.find(match.topic, match.focus_areas)
+        if bundle is not None:
+            self.bundle_store.save(bundle.model_copy(update={
+                "topic": topic,
+                "focus_areas": focus_areas or [],
+                "created_at": datetime.now().isoformat(),
+                "outline": outline,
+            }))
+        return outline
 
-## 6. Limitations and Future Work
+    async def rewrite_front_matter(self, topic: str, focus_areas: Optional[List[str]],
+                                   outline: ResearchOutline) -> ResearchOutline:
+        """The outline with a title and abstract written for `topic` from its research notes"""
+        from agno.agent import Agent
 
-{paper.limitations_and_future_work}
+        focus_context = ""
+        if focus_areas:
+            focus_context = f"\n\n**FOCUS AREAS:**\n" + "\n".join(f"- {area}" for area in focus_areas)
+        front_matter_prompt = f"""
+        **WRITING ASSIGNMENT:** Write the title and a 200-300 word abstract of a paper on the topic "{topic}".
+        {focus_context}
 
-## 7. Conclusion
+        **SECTIONS THE PAPER WILL COVER:**
+        {chr(10).join(f"- {o.section}: {'; '.join(o.key_points)}" for o in outline.outline)}
 
-{paper.conclusion}
+        **RESEARCH NOTES:**
+        {outline.research_notes}
 
-### Key Insights
+        The research was collected for a closely related topic. Describe only what these notes support, framed
+        for "{topic}".
+        """
 
-{chr(10).join(f"• {insight}" for insight in paper.key_insights)}
+        agent = Agent(
+            name="Research Front Matter Writer",
+            model=self.instrumented_model,
+            instructions=self._get_writing_instructions(),
+            output_schema=PaperFrontMatter,
+            retries=2,
+            delay_between_retries=3
+        )
+        with self.metrics.stage("front_matter"):
+            response = await agent.arun(front_matter_prompt)
+        if not isinstance(response.content, PaperFrontMatter):
+            raise ValueError(f"Front matter writer did not return a title and abstract for '{topic}'")
+        return outline.model_copy(update={"title": response.content.title, "abstract": response.content.abstract})
+    
+    def _store_paper(self, topic: str, focus_areas: Optional[List[str]], paper: ResearchPaper) -> None:
+        self.paper_cache.put("paper", topic, focus_areas, self.model_id, self.prompt_version, paper)
 
-## References
+    def _bundle_sources(self, topic: str, focus_areas: Optional[List[str]]) -> List["BundleSource"]:
+        bundle = self.bundle_store.find(topic, focus_areas)
+        return bundle.sources if bundle is not None else []
 
-{chr(10).join(f"{i+1}. {ref}" for i, ref in enumerate(paper.references))}
+    def verify_citations(self, topic: str, paper: ResearchPaper,
+                         sources: List["BundleSource"]) -> Optional["CitationReport"]:
+        """Check every cited sentence and reference of the paper against the sources retrieved for it
 
----
+        Runs after the paper is stored and never raises: a failed check must not cost the finished paper.
+        """
 
-*Generated on {datetime.now().strftime("%B %d, %Y")} using Advanced Research Pipeline*
-*Total References: {len(paper.references)}*
-"""
-        return formatted_paper
+        if not sum(len(source.passages) for source in sources):
+            print("🔎 No retrieved source text was recorded for this paper; skipping citation verification")
+            return None
+        try:
+            report = self.citation_verifier.verify(paper, sources, topic)
+        except Exception as e:
+            print(f"⚠️  Citation verification failed: {e}")
+            self.metrics.record("citation_verification", status="error", error=str(e))
+            return None
+        self.citation_verifier.print_summary(report)
+        path = self.citation_verifier.save(report)
+        if path:
+            print(f"📄 Citation report saved to: {path}")
+        return report
+    
+    def format_research_paper(self, paper: ResearchPaper) -> str:
+        """Format the research paper with proper academic structure and styling"""
+        
+        with self.metrics.stage("formatting"):
+            return "".join(self.iter_paper_sections(paper))
     
-    async def generate_research_paper(self, topic: str, focus_areas: Optional[List[str]] = None) -> str:
+    async def generate_research_paper(self, topic: str, focus_areas: Optional[List[str]] = None,
+                                      session_id: Optional[str] = None) -> str:
         """Generate a comprehensive research paper with enhanced reasoning and formatting"""
+        from research_bundle import sources_from_tool_items
+        
+        cached = self.cached_paper(topic, focus_areas)
+        if cached is not None:
+            return self.format_research_paper(cached)
         
         # Construct detailed research prompt
         focus_context = ""
@@ -353,23 +833,52 @@ class AdvancedResearchPipelineAgent:
         **OUTPUT FORMAT:** Structure your response using the ResearchPaper schema with all required fields properly filled.
         """
         
-        # Generate the paper using the agent
-        print(f"🔬 Starting comprehensive research on: {topic}")
-        print("📚 Searching academic databases and ArXiv...")
-        print("🧠 Applying reasoning and analysis...")
-        print("✍️  Generating research paper...")
-        
-        response = await self.research_agent.arun(research_prompt)
-        
-        # Format the paper for display
-        if isinstance(response.content, ResearchPaper):
-            formatted_paper = self.format_research_paper(response.content)
-            return formatted_paper
-        else:
-            return str(response.content)
+        with self.metrics.trace(topic, "async"), research_focus(topic, focus_areas):
+            # A near-identical topic was researched before: keep that research and only rewrite the prose
+            outline = await self._cached_outline(topic, focus_areas)
+            if outline is not None:
+                paper = await self.write_paper_from_outline(topic, outline)
+                self._store_paper(topic, focus_areas, paper)
+                self.verify_citations(topic, paper, self._bundle_sources(topic, focus_areas))
+                return self.format_research_paper(paper)
+            
+            # Generate the paper using the agent
+            print(f"🔬 Starting comprehensive research on: {topic}")
+            print("📚 Searching academic databases and ArXiv...")
+            print("🧠 Applying reasoning and analysis...")
+            print("✍️  Generating research paper...")
+            
+            # A fresh session per run, unless the caller continues one; agno would otherwise reuse one session forever
+            session_id = self.session_store.start_session(topic, session_id)
+            # A failed or interrupted earlier attempt is replayed from its checkpoints up to where it stopped
+            # Every search result and paper the agent reads is kept for citation verification
+            with self.checkpoints.run(topic, focus_areas, self.model_id, self.prompt_version, "async") as checkpoint, \
+                    collect_tool_sources() as tool_items:
+                response = await self.research_agent.arun(research_prompt, session_id=session_id)
+                if isinstance(response.content, ResearchPaper):
+                    checkpoint.complete()
+            
+            # Format the paper for display
+            if isinstance(response.content, ResearchPaper):
+                self.canonicalize_references(response.content, topic)
+                self._store_paper(topic, focus_areas, response.content)
+                self.verify_citations(topic, response.content, sources_from_tool_items(tool_items))
+                formatted_paper = self.format_research_paper(response.content)
+                return formatted_paper
+            else:
+                return str(response.content)
     
     def generate_research_paper_sync(self, topic: str, focus_areas: Optional[List[str]] = None) -> str:
-        """Synchronous version of research paper generation"""
+        """Synchronous version of research paper generation
+
+        Only exact cache hits are served: reusing a similar topic's research means rewriting its sections
+        concurrently, which only the async entry points do.
+        """
+        from research_bundle import sources_from_tool_items
+        
+        cached = self.cached_paper(topic, focus_areas)
+        if cached is not None:
+            return self.format_research_paper(cached)
         
         focus_context = ""
         if focus_areas:
@@ -408,18 +917,258 @@ class AdvancedResearchPipelineAgent:
         print(f"🔬 Generating research paper on: {topic}")
         print("📊 This may take several minutes for comprehensive research...")
         
-        response = self.research_agent.run(research_prompt)
-        
-        # Format the paper for display
-        if isinstance(response.content, ResearchPaper):
-            formatted_paper = self.format_research_paper(response.content)
-            return formatted_paper
-        else:
-            return str(response.content)
-    
-    def save_paper(self, paper_content: str, topic: str, output_dir: str = "./generated_papers") -> str:
-        """Save the generated paper to a file with proper naming"""
-        
+        session_id = self.session_store.start_session(topic)
+        with self.metrics.trace(topic, "sync"), research_focus(topic, focus_areas):
+            with self.checkpoints.run(topic, focus_areas, self.model_id, self.prompt_version, "sync") as checkpoint, \
+                    collect_tool_sources() as tool_items:
+                response = self.research_agent.run(research_prompt, session_id=session_id)
+                if isinstance(response.content, ResearchPaper):
+                    checkpoint.complete()
+            
+            # Format the paper for display
+            if isinstance(response.content, ResearchPaper):
+                self.canonicalize_references(response.content, topic)
+                self._store_paper(topic, focus_areas, response.content)
+                self.verify_citations(topic, response.content, sources_from_tool_items(tool_items))
+                formatted_paper = self.format_research_paper(response.content)
+                return formatted_paper
+            else:
+                return str(response.content)
+
+    def _create_section_agent(self) -> "Agent":
+        """Create a lightweight, tool-free agent that writes a single section"""
+        from agno.agent import Agent
+
+        return Agent(
+            name="Research Section Writer",
+            model=self.instrumented_model,
+            instructions=self._get_writing_instructions(),
+            markdown=True,
+            retries=2,
+            delay_between_retries=3
+        )
+
+    async def build_research_outline(self, topic: str, focus_areas: Optional[List[str]] = None,
+                                     session_id: Optional[str] = None) -> ResearchOutline:
+        """Run the research stage once and return the shared context for section writing"""
+
+        outline = await self._cached_outline(topic, focus_areas)
+        if outline is not None:
+            return outline
+        return (await self.collect_research(topic, focus_areas, session_id)).outline
+
+    async def collect_research(self, topic: str, focus_areas: Optional[List[str]] = None,
+                               session_id: Optional[str] = None, refresh: bool = False) -> "ResearchBundle":
+        """Collect phase: search, read and reason once, and save the results as a research bundle on disk"""
+        from research_bundle import ResearchBundle, sources_from_tool_items
+
+        if not refresh:
+            bundle = self.bundle_store.find(topic, focus_areas)
+            if bundle is not None:
+                print(f"♻️  Using research bundle for: {topic}")
+                self.metrics.record("research_bundle", name="collect", status="hit")
+                return bundle
+
+        focus_context = ""
+        if focus_areas:
+            focus_context = f"\n\nSPECIFIC FOCUS AREAS:\n" + "\n".join(f"- {area}" for area in focus_areas)
+
+        outline_prompt = f"""
+        **RESEARCH ASSIGNMENT:** Research the topic "{topic}" and plan a comprehensive academic paper.
+        {focus_context}
+
+        **RESEARCH PROCESS:**
+        1. Use reasoning tools to analyze the topic and develop research strategy
+        2. Conduct extensive academic literature search using Exa tools
+        3. Search ArXiv for latest preprints and cutting-edge research
+        4. Synthesize findings from all sources and identify research gaps
+
+        **DELIVERABLES:**
+        - Title and a 200-300 word abstract for a 2500-3000 word paper
+        - Detailed research notes that other writers will use as their ONLY source material,
+          keeping every finding attributed as "(Author et al., Year)"
+        - An outline entry for each of these sections: {', '.join(PAPER_SECTIONS)}
+        - Minimum 15-20 academic references with DOI/ArXiv ID/URL
+
+        **OUTPUT FORMAT:** Structure your response using the ResearchOutline schema with all required fields properly filled.
+        """
+
+        session_id = self.session_store.start_session(topic, session_id)
+        # Every search result and paper the agent reads is kept, so the write phase can quote from it later
+        with research_focus(topic, focus_areas), collect_tool_sources() as tool_items:
+            response = await self.outline_agent.arun(outline_prompt, session_id=session_id)
+        if not isinstance(response.content, ResearchOutline):
+            raise ValueError(f"Research stage did not return an outline for '{topic}': {response.content}")
+        # Section writers cite from this list, so deduplicate it before they start
+        self.canonicalize_references(response.content, topic)
+        self.paper_cache.put("outline", topic, focus_areas, self.model_id, self.prompt_version, response.content)
+
+        bundle = ResearchBundle(
+            topic=topic,
+            focus_areas=focus_areas or [],
+            created_at=datetime.now().isoformat(),
+            model_id=self.model_id,
+            prompt_version=self.prompt_version,
+            outline=response.content,
+            sources=sources_from_tool_items(tool_items)
+        )
+        path = self.bundle_store.save(bundle)
+        print(f"📦 Research bundle saved: {path} ({len(bundle.sources)} sources)")
+        return bundle
+
+    async def write_from_bundle(self, bundle: "ResearchBundle", topic: Optional[str] = None,
+                                focus_areas: Optional[List[str]] = None, max_concurrency: int = 4,
+                                section_words: Tuple[int, int] = SECTION_WORDS) -> ResearchPaper:
+        """Write phase: a paper from a saved bundle with no searching, e.g. a rewrite, new length or related angle"""
+
+        topic = topic or bundle.topic
+        # Focus areas only go into the prompts when they steer away from what the bundle was collected for
+        angle = focus_areas if focus_areas is not None and focus_areas != bundle.focus_areas else None
+        print(f"✍️  Writing '{topic}' from the research bundle for '{bundle.topic}'")
+        with self.metrics.trace(topic, "write"), research_focus(topic, focus_areas or bundle.focus_areas):
+            paper = await self.write_paper_from_outline(topic, bundle.outline, max_concurrency, section_words,
+                                                        bundle, angle)
+            self.verify_citations(topic, paper, bundle.sources)
+            return paper
+
+    async def write_section(self, section: str, topic: str, outline: ResearchOutline,
+                            section_words: Tuple[int, int] = SECTION_WORDS, bundle: Optional["ResearchBundle"] = None,
+                            focus_areas: Optional[List[str]] = None) -> str:
+        """Write one section of the paper from the shared research outline"""
+
+        key_points = next((o.key_points for o in outline.outline if o.section == section), [])
+        # With a bundle, the writer also sees the source passages most relevant to this section
+        excerpts = bundle.excerpts(" ".join([topic, section.replace("_", " "), *key_points])) if bundle else []
+        extra_context = ""
+        if focus_areas:
+            extra_context += "\n\n**FOCUS AREAS:**\n" + "\n".join(f"- {area}" for area in focus_areas)
+        if excerpts:
+            extra_context += "\n\n**SOURCE EXCERPTS:**\n" + "\n".join(f"- {excerpt}" for excerpt in excerpts)
+        section_prompt = f"""
+        **WRITING ASSIGNMENT:** Write the "{section.replace('_', ' ').title()}" section of the paper
+        "{outline.title}" on the topic "{topic}".
+
+        **SECTION PURPOSE:** {ResearchPaper.model_fields[section].description}
+
+        **KEY POINTS TO COVER:**
+        {chr(10).join(f"- {point}" for point in key_points) or "- Use your judgement based on the research notes"}
+
+        **ABSTRACT:**
+        {outline.abstract}
+
+        **RESEARCH NOTES:**
+        {outline.research_notes}
+
+        **AVAILABLE REFERENCES:**
+        {chr(10).join(f"- {ref}" for ref in outline.references)}
+        {extra_context}
+
+        Write approximately {section_words[0]}-{section_words[1]} words of body text for this section only. Do not include the
+        section heading. Cite only the references listed above using "(Author et al., Year)".
+        """
+
+        with self.metrics.stage("section_writing", section):
+            response = await self._create_section_agent().arun(section_prompt)
+        return str(response.content).strip()
+
+    def _start_section_tasks(self, topic: str, outline: ResearchOutline, max_concurrency: int,
+                             section_words: Tuple[int, int] = SECTION_WORDS, bundle: Optional["ResearchBundle"] = None,
+                             focus_areas: Optional[List[str]] = None) -> List[asyncio.Task]:
+        """Schedule one writing task per section, at most `max_concurrency` running at once"""
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def write_limited(section: str) -> str:
+            async with semaphore:
+                print(f"✍️  Writing section: {section}")
+                return await self.write_section(section, topic, outline, section_words, bundle, focus_areas)
+
+        return [asyncio.create_task(write_limited(section)) for section in PAPER_SECTIONS]
+
+    async def generate_paper_sections(self, topic: str, focus_areas: Optional[List[str]] = None,
+                                      max_concurrency: int = 4, session_id: Optional[str] = None) -> ResearchPaper:
+        """Research once, then write all sections concurrently and assemble a ResearchPaper"""
+
+        cached = self.cached_paper(topic, focus_areas)
+        if cached is not None:
+            return cached
+
+        with self.metrics.trace(topic, "parallel"), research_focus(topic, focus_areas), \
+                self.checkpoints.run(topic, focus_areas, self.model_id, self.prompt_version, "parallel") as checkpoint:
+            outline = await self.build_research_outline(topic, focus_areas, session_id)
+            # Finished sections are checkpointed, so after a failure only the missing ones are written again
+            paper = await self.write_paper_from_outline(topic, outline, max_concurrency)
+            checkpoint.complete()
+            self._store_paper(topic, focus_areas, paper)
+            # The research stage saved what it retrieved as this topic's bundle
+            self.verify_citations(topic, paper, self._bundle_sources(topic, focus_areas))
+        return paper
+
+    @staticmethod
+    def assemble_paper(outline: ResearchOutline, sections: List[str]) -> ResearchPaper:
+        """Combine the research outline with the written section bodies (in PAPER_SECTIONS order)"""
+
+        return ResearchPaper(
+            title=outline.title,
+            abstract=outline.abstract,
+            **dict(zip(PAPER_SECTIONS, sections)),
+            references=outline.references,
+            key_insights=outline.key_insights,
+            research_gaps_identified=outline.research_gaps_identified
+        )
+
+    async def write_paper_from_outline(self, topic: str, outline: ResearchOutline, max_concurrency: int = 4,
+                                       section_words: Tuple[int, int] = SECTION_WORDS,
+                                       bundle: Optional["ResearchBundle"] = None,
+                                       focus_areas: Optional[List[str]] = None) -> ResearchPaper:
+        """Write every section concurrently from an existing outline"""
+
+        sections = await asyncio.gather(*self._start_section_tasks(topic, outline, max_concurrency, section_words,
+                                                                   bundle, focus_areas))
+        return self.assemble_paper(outline, sections)
+
+    async def generate_research_paper_parallel(self, topic: str, focus_areas: Optional[List[str]] = None,
+                                               max_concurrency: int = 4, session_id: Optional[str] = None) -> str:
+        """Generate a research paper with sections written concurrently after a shared research stage"""
+
+        print(f"🔬 Starting comprehensive research on: {topic}")
+        print(f"⚡ Sections will be written in parallel (max {max_concurrency} at a time)")
+
+        paper = await self.generate_paper_sections(topic, focus_areas, max_concurrency, session_id)
+        return self.format_research_paper(paper)
+
+    async def stream_research_paper(self, topic: str, focus_areas: Optional[List[str]] = None,
+                                    max_concurrency: int = 4, session_id: Optional[str] = None) -> AsyncIterator[str]:
+        """Yield formatted sections in document order as soon as each one is written"""
+
+        cached = self.cached_paper(topic, focus_areas)
+        if cached is not None:
+            for piece in self.iter_paper_sections(cached):
+                yield piece
+            return
+
+        print(f"🔬 Starting comprehensive research on: {topic}")
+        with self.metrics.trace(topic, "stream"), research_focus(topic, focus_areas):
+            outline = await self.build_research_outline(topic, focus_areas, session_id)
+            yield self.format_paper_header(outline)
+
+            tasks = self._start_section_tasks(topic, outline, max_concurrency)
+            bodies = []
+            try:
+                for section, task in zip(PAPER_SECTIONS, tasks):
+                    bodies.append(await task)
+                    yield self.format_paper_section(section, bodies[-1], outline)
+            finally:
+                # Stop outstanding writers if the consumer stops early or a section fails
+                for task in tasks:
+                    task.cancel()
+
+            yield self.format_paper_footer(outline)
+            paper = self.assemble_paper(outline, bodies)
+            self._store_paper(topic, focus_areas, paper)
+            self.verify_citations(topic, paper, self._bundle_sources(topic, focus_areas))
+
+    def _paper_filepath(self, topic: str, output_dir: str) -> Path:
         # Create output directory
         Path(output_dir).mkdir(exist_ok=True)
         
@@ -428,7 +1177,27 @@ class AdvancedResearchPipelineAgent:
         safe_topic = safe_topic.replace(' ', '_').lower()
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"research_paper_{safe_topic}_{timestamp}.md"
-        filepath = Path(output_dir) / filename
+        return Path(output_dir) / filename
+
+    async def save_paper_stream(self, sections: AsyncIterator[str], topic: str,
+                                output_dir: str = "./generated_papers") -> str:
+        """Append each section to the paper file as soon as it arrives, so partial papers survive failures"""
+
+        filepath = self._paper_filepath(topic, output_dir)
+        print(f"📄 Streaming paper to: {filepath}")
+
+        with open(filepath, 'w', encoding='utf-8') as f:
+            async for section in sections:
+                f.write(section)
+                f.flush()
+
+        print(f"📄 Paper saved to: {filepath}")
+        return str(filepath)
+
+    def save_paper(self, paper_content: str, topic: str, output_dir: str = "./generated_papers") -> str:
+        """Save the generated paper to a file with proper naming"""
+        
+        filepath = self._paper_filepath(topic, output_dir)
         
         # Save the paper
         with open(filepath, 'w', encoding='utf-8') as f:
@@ -438,11 +1207,11 @@ class AdvancedResearchPipelineAgent:
         return str(filepath)
 
 # Usage Examples and Main Functions
-async def main():
+async def main(parallel_sections: bool = False):
     """Main function demonstrating the research pipeline"""
     
     # Initialize the advanced pipeline
-    pipeline = AdvancedResearchPipelineAgent()
+    pipeline = AdvancedResearchPipelineAgent(metrics_file="./research_metrics.jsonl")
     
     # Example topics with focus areas
     research_topics = [
@@ -478,7 +1247,10 @@ async def main():
         
         try:
             # Generate the paper
-            paper_content = await pipeline.generate_research_paper(topic, focus_areas)
+            if parallel_sections:
+                paper_content = await pipeline.generate_research_paper_parallel(topic, focus_areas)
+            else:
+                paper_content = await pipeline.generate_research_paper(topic, focus_areas)
             
             # Save the paper
             filepath = pipeline.save_paper(paper_content, topic)
@@ -497,10 +1269,15 @@ async def main():
             print(f"❌ Error generating paper for '{topic}': {str(e)}")
             continue
 
+    # Where the time went: search, model, reasoning or retries
+    pipeline.metrics.print_summary()
+    pipeline.print_model_report()
+    pipeline.metrics.write_prometheus("./research_metrics.prom")
+
 def generate_single_paper():
     """Synchronous function to generate a single research paper"""
     
-    pipeline = AdvancedResearchPipelineAgent()
+    pipeline = AdvancedResearchPipelineAgent(metrics_file="./research_metrics.jsonl")
     
     # Get topic from user or use default
     topic = input("Enter research topic (or press Enter for default): ").strip()
@@ -528,6 +1305,9 @@ def generate_single_paper():
         print(f"📁 File location: {filepath}")
         print(f"📚 Knowledge base updated with research findings")
         
+        pipeline.metrics.print_summary()
+        pipeline.print_model_report(papers=1)
+        pipeline.metrics.write_prometheus("./research_metrics.prom")
         return paper_content
         
     except Exception as e:
@@ -539,11 +1319,14 @@ if __name__ == "__main__":
     print("=" * 60)
     
     # Choose execution mode
-    mode = input("Choose mode - (1) Async multiple papers, (2) Single paper: ").strip()
+    mode = input("Choose mode - (1) Async multiple papers, (2) Single paper, (3) Async multiple papers with parallel sections: ").strip()
     
     if mode == "1":
         # Run async version for multiple papers
         asyncio.run(main())
+    elif mode == "3":
+        # Run async version with sections written concurrently
+        asyncio.run(main(parallel_sections=True))
     else:
         # Run sync version for single paper
         generate_single_paper()
@@ -0,0 +1,208 @@
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from agno.db.sqlite import SqliteDb
+from sqlalchemy import create_engine, event
+
+SESSION_TABLE = "agno_sessions"
+
+
+class SessionStore:
+    """Agent session database in WAL mode, with per-topic session tracking and retention"""
+
+    def __init__(self, db_file: str = "./research_agent_sessions.db", max_age_days: Optional[float] = 30,
+                 max_sessions_per_topic: Optional[int] = 10, max_runs_per_session: Optional[int] = 20,
+                 busy_timeout_ms: int = 30000):
+        self.db_file = str(Path(db_file).resolve())
+        self.max_age_days = max_age_days
+        self.max_sessions_per_topic = max_sessions_per_topic
+        self.max_runs_per_session = max_runs_per_session
+        self.busy_timeout_ms = busy_timeout_ms
+        Path(self.db_file).parent.mkdir(parents=True, exist_ok=True)
+
+        # Maintenance runs from worker threads too, so share one connection behind a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False, isolation_level=None,
+                                     timeout=busy_timeout_ms / 1000)
+        self._configure(self._conn)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS research_session_topics (
+                session_id TEXT PRIMARY KEY,
+                topic TEXT NOT NULL,
+                created_at INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_research_session_topics_topic ON research_session_topics (topic, created_at)"
+        )
+        self.ensure_indexes()
+
+    def _configure(self, conn: Any) -> None:
+        # WAL lets readers run alongside the single writer; writers wait out the busy timeout instead of failing
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+
+    def create_db(self) -> SqliteDb:
+        """Create the agno SqliteDb for agents, on an engine that applies the same pragmas to every connection"""
+
+        engine = create_engine(f"sqlite:///{self.db_file}",
+                               connect_args={"timeout": self.busy_timeout_ms / 1000, "check_same_thread": False})
+        event.listen(engine, "connect", lambda conn, _: self._configure(conn))
+        return SqliteDb(db_engine=engine, db_file=self.db_file)
+
+    def _session_table_exists(self) -> bool:
+        return self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SESSION_TABLE,)
+        ).fetchone() is not None
+
+    def ensure_indexes(self) -> None:
+        """Index the columns retention and lookups filter on (agno creates the table on first write)"""
+
+        with self._lock:
+            if not self._session_table_exists():
+                return
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{SESSION_TABLE}_updated_at ON {SESSION_TABLE} (updated_at)")
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{SESSION_TABLE}_agent_id ON {SESSION_TABLE} (agent_id)")
+
+    def _delete_sessions(self, session_ids: List[str]) -> int:
+        if not session_ids:
+            return 0
+        placeholders = ",".join("?" * len(session_ids))
+        deleted = 0
+        if self._session_table_exists():
+            deleted = self._conn.execute(
+                f"DELETE FROM {SESSION_TABLE} WHERE session_id IN ({placeholders})", session_ids
+            ).rowcount
+        self._conn.execute(f"DELETE FROM research_session_topics WHERE session_id IN ({placeholders})", session_ids)
+        return deleted
+
+    def _prune_topic(self, topic: str) -> List[str]:
+        if self.max_sessions_per_topic is None:
+            return []
+        rows = self._conn.execute(
+            "SELECT session_id FROM research_session_topics WHERE topic = ? ORDER BY created_at DESC LIMIT -1 OFFSET ?",
+            (topic, self.max_sessions_per_topic)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def start_session(self, topic: str, session_id: Optional[str] = None) -> str:
+        """Register a session for a topic run, dropping that topic's oldest sessions beyond the retention count"""
+
+        session_id = session_id or f"{uuid4()}"
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO research_session_topics (session_id, topic, created_at) VALUES (?, ?, ?)",
+                (session_id, topic, int(time.time()))
+            )
+            self._delete_sessions([s for s in self._prune_topic(topic) if s != session_id])
+        return session_id
+
+    def _trim_runs(self) -> int:
+        # agno stores runs as a JSON-encoded JSON list; keep only the most recent runs of long-lived sessions
+        trimmed = 0
+        rows = self._conn.execute(f"SELECT session_id, runs FROM {SESSION_TABLE} WHERE runs IS NOT NULL").fetchall()
+        for session_id, raw in rows:
+            runs = json.loads(raw)
+            if isinstance(runs, str):
+                runs = json.loads(runs)
+            if not isinstance(runs, list) or len(runs) <= self.max_runs_per_session:
+                continue
+            kept = runs[-self.max_runs_per_session:]
+            self._conn.execute(f"UPDATE {SESSION_TABLE} SET runs = ? WHERE session_id = ?",
+                               (json.dumps(json.dumps(kept)), session_id))
+            trimmed += len(runs) - len(kept)
+        return trimmed
+
+    def prune(self, dry_run: bool = False) -> Dict[str, int]:
+        """Apply age, per-topic count and per-session run limits; returns what was (or would be) removed"""
+
+        with self._lock:
+            expired: List[str] = []
+            if self.max_age_days is not None and self._session_table_exists():
+                cutoff = int(time.time() - self.max_age_days * 86400)
+                expired = [row[0] for row in self._conn.execute(
+                    f"SELECT session_id FROM {SESSION_TABLE} WHERE COALESCE(updated_at, created_at) < ?", (cutoff,)
+                )]
+            over_limit: List[str] = []
+            for (topic,) in self._conn.execute("SELECT DISTINCT topic FROM research_session_topics").fetchall():
+                over_limit.extend(self._prune_topic(topic))
+            doomed = sorted(set(expired) | set(over_limit))
+            if dry_run:
+                return {"expired": len(expired), "over_topic_limit": len(over_limit), "deleted": 0, "runs_trimmed": 0}
+
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                deleted = self._delete_sessions(doomed)
+                # Tags whose sessions were removed elsewhere (e.g. agno's delete_session)
+                if self._session_table_exists():
+                    self._conn.execute(
+                        f"DELETE FROM research_session_topics WHERE created_at < ? AND session_id NOT IN "
+                        f"(SELECT session_id FROM {SESSION_TABLE})", (int(time.time()) - 86400,)
+                    )
+                trimmed = self._trim_runs() if self.max_runs_per_session and self._session_table_exists() else 0
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return {"expired": len(expired), "over_topic_limit": len(over_limit), "deleted": deleted, "runs_trimmed": trimmed}
+
+    def compact(self, dry_run: bool = False) -> Dict[str, Any]:
+        """Prune, then checkpoint the WAL and VACUUM so the file actually shrinks"""
+
+        size_before = self.size_bytes()
+        pruned = self.prune(dry_run=dry_run)
+        if not dry_run:
+            self.ensure_indexes()
+            with self._lock:
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                self._conn.execute("VACUUM")
+                self._conn.execute("ANALYZE")
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return {**pruned, "bytes_before": size_before, "bytes_after": self.size_bytes()}
+
+    def size_bytes(self) -> int:
+        """Database plus WAL file size on disk"""
+
+        return sum(path.stat().st_size for path in (Path(self.db_file), Path(f"{self.db_file}-wal")) if path.exists())
+
+    def stats(self) -> Dict[str, Any]:
+        """Return session counts, tracked topics and on-disk size"""
+
+        with self._lock:
+            sessions = 0
+            if self._session_table_exists():
+                sessions = self._conn.execute(f"SELECT COUNT(*) FROM {SESSION_TABLE}").fetchone()[0]
+            topics = self._conn.execute("SELECT COUNT(DISTINCT topic) FROM research_session_topics").fetchone()[0]
+            journal_mode = self._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        return {"sessions": sessions, "topics": topics, "bytes": self.size_bytes(), "journal_mode": journal_mode}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prune and compact the agent session database")
+    parser.add_argument("command", choices=["compact", "stats"], help="'compact' prunes and VACUUMs; 'stats' only reports")
+    parser.add_argument("--db-file", default="./research_agent_sessions.db", help="Session database to maintain")
+    parser.add_argument("--max-age-days", type=float, default=30, help="Drop sessions not updated for this many days (0 disables)")
+    parser.add_argument("--max-per-topic", type=int, default=10, help="Newest sessions to keep per topic (0 disables)")
+    parser.add_argument("--max-runs", type=int, default=20, help="Most recent runs to keep inside a session (0 disables)")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be pruned without changing anything")
+    args = parser.parse_args()
+
+    store = SessionStore(
+        db_file=args.db_file,
+        max_age_days=args.max_age_days or None,
+        max_sessions_per_topic=args.max_per_topic or None,
+        max_runs_per_session=args.max_runs or None
+    )
+    if args.command == "compact":
+        result = store.compact(dry_run=args.dry_run)
+        print(f"🧹 {'Would prune' if args.dry_run else 'Pruned'}: {result['expired']} expired, "
+              f"{result['over_topic_limit']} over the per-topic limit, {result['runs_trimmed']} old runs trimmed")
+        print(f"💾 {result['bytes_before'] / 1024:.0f} KB -> {result['bytes_after'] / 1024:.0f} KB")
+    print(f"📊 {store.stats()}")
@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+from checkpoint_store import CheckpointStore
+
+class ScriptedModel:
+    """Answers from a fixed script and counts the calls that actually reach it"""
+
+    id = "scripted"
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = []
+
+    def invoke(self, messages, **kwargs):
+        key = messages[-1].content
+        self.calls.append(key)
+        return SimpleNamespace(content=self.answers[key], response_usage=None)
+
+    async def ainvoke(self, messages, **kwargs):
+        return self.invoke(messages, **kwargs)
+
+def message(role, content):
+    return SimpleNamespace(role=role, content=content, tool_calls=None, tool_call_id=None)
+
+def run_attempt(store, model, complete_on):
+    with store.run("Sparse attention", None, "scripted", "v1", "sync") as run:
+        plan = model.invoke(messages=[message("user", "plan")])
+        final = model.invoke(messages=[message("user", "plan"), message("assistant", plan.content),
+                                       message("user", "write")])
+        if final.content == complete_on:
+            run.complete()
+    return final.content
+
+def test_unparseable_final_response_is_not_replayed(tmp_path):
+    store = CheckpointStore(db_file=str(tmp_path / "checkpoints.db"))
+    model = store.instrument_model(ScriptedModel({"plan": "search first", "write": "not a paper"}))
+
+    assert run_attempt(store, model, complete_on="a paper") == "not a paper"
+    assert model.calls == ["plan", "write"]
+
+    # The rerun replays the planning step but asks the model for the final answer again
+    model.answers["write"] = "a paper"
+    assert run_attempt(store, model, complete_on="a paper") == "a paper"
+    assert model.calls == ["plan", "write", "write"]
+    assert store.stats()["steps"] == 0
@@ -0,0 +1,41 @@
+from pathlib import Path
+
+from PIL import Image
+
+import figure_store
+from figure_store import FigureStore
+from pdf_parsing import ParsedImage, ParsedPage
+
+def page_with(path: Path, color) -> ParsedPage:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", (200, 120), color).save(path)
+    return ParsedPage(page=1, markdown="", images=[ParsedImage(image_path=str(path), text="")], parse_mode="test")
+
+def test_workers_never_overwrite_each_others_figures(tmp_path, monkeypatch):
+    # Both figures get one pHash while their pixels differ, as two unrelated charts sometimes do
+    monkeypatch.setattr(figure_store, "_hash_pixels", lambda pixels: 0x1234)
+    kwargs = dict(db_file=str(tmp_path / "figure_cache.db"), image_dir=str(tmp_path / "figures"))
+    first, second = FigureStore(**kwargs), FigureStore(**kwargs)
+    # The second worker took its snapshot before the first one stored its figure
+    monkeypatch.setattr(second, "_load_hashes", lambda: None)
+
+    black = page_with(tmp_path / "a" / "page_1_img_0.png", "black")
+    white = page_with(tmp_path / "b" / "page_1_img_0.png", "white")
+    first.dedupe([black])
+    second.dedupe([white])
+
+    stored_black = first.get(black.images[0].image_hash)
+    stored_white = first.get(white.images[0].image_hash)
+    assert stored_black.image_hash == "0000000000001234"
+    assert stored_white.image_hash.startswith("0000000000001234-")
+    assert stored_black.sha256 != stored_white.sha256
+    with Image.open(stored_black.image_path) as img:
+        assert img.getpixel((0, 0)) == (0, 0, 0)
+    with Image.open(stored_white.image_path) as img:
+        assert img.getpixel((0, 0)) == (255, 255, 255)
+
+    # Bytes stored by the other worker since the snapshot are reused, not stored again
+    again = page_with(tmp_path / "c" / "page_1_img_0.png", "black")
+    second.dedupe([again])
+    assert again.images[0].image_hash == stored_black.image_hash
+    assert first.stats()["figures"] == 2
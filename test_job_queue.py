@@ -0,0 +1,92 @@
+import time
+
+from batch_runner import BatchResult
+from job_queue import JobOptions, JobQueue, WorkerPool, offline_pipeline
+
+def make_queue(tmp_path, **kwargs) -> JobQueue:
+    return JobQueue(str(tmp_path / "jobs.db"), **kwargs)
+
+def test_claim_takes_highest_priority_then_oldest(tmp_path):
+    queue = make_queue(tmp_path)
+    low = queue.submit("low priority")
+    first = queue.submit("first urgent", priority=5)
+    second = queue.submit("second urgent", priority=5)
+
+    assert [queue.claim("w1").id for _ in range(3)] == [first.id, second.id, low.id]
+    assert queue.claim("w1") is None
+    job = queue.get(first.id)
+    assert job.status == "running" and job.worker_id == "w1" and job.attempts == 1
+
+def test_cancel_queued_and_running(tmp_path):
+    queue = make_queue(tmp_path)
+    queued = queue.submit("never started")
+    running = queue.submit("in progress", priority=1)
+    assert queue.claim("w1").id == running.id
+
+    assert queue.cancel(queued.id) == "cancelled"
+    assert queue.get(queued.id).status == "cancelled"
+
+    # A running job only gets a cancel request; the worker sees it on its next heartbeat
+    assert queue.heartbeat(running.id, "w1")
+    assert queue.cancel(running.id) == "running"
+    assert not queue.heartbeat(running.id, "w1")
+    assert queue.finish_cancelled(running.id, "w1")
+    assert queue.get(running.id).status == "cancelled"
+    assert queue.cancel("missing") is None
+
+def test_expired_lease_is_requeued(tmp_path):
+    queue = make_queue(tmp_path, lease_seconds=0.5)
+    job = queue.submit("hung worker")
+    queue.claim("w1")
+    assert queue.requeue_expired() == 0
+
+    time.sleep(0.6)
+    assert queue.requeue_expired() == 1
+    job = queue.get(job.id)
+    assert job.status == "queued" and job.worker_id is None and job.error == "lease expired"
+    # The lease went back to the queue, so the old worker must stop
+    assert not queue.heartbeat(job.id, "w1")
+
+def test_failed_attempts_end_in_failed_and_retry_resets(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=2)
+    job = queue.submit("flaky topic")
+    failure = BatchResult(topic=job.topic, success=False, duration_seconds=0.0, error="boom")
+
+    queue.claim("w1")
+    assert queue.finish(job.id, "w1", failure) == "queued"
+    queue.claim("w1")
+    assert queue.finish(job.id, "w1", failure) == "failed"
+    job = queue.get(job.id)
+    assert job.status == "failed" and job.attempts == 2 and job.error == "boom"
+
+    assert queue.retry(job.id)
+    job = queue.get(job.id)
+    assert job.status == "queued" and job.attempts == 0
+    assert not queue.retry(job.id)
+
+def test_requeue_worker(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=1)
+    retried = queue.submit("has attempts left", max_attempts=3, priority=1)
+    exhausted = queue.submit("last attempt")
+    other = queue.submit("other worker's job")
+    queue.claim("dead")
+    queue.claim("dead")
+    queue.claim("alive")
+
+    assert queue.requeue_worker("dead") == 2
+    assert queue.get(retried.id).status == "queued"
+    assert queue.get(exhausted.id).status == "failed"
+    assert queue.get(other.id).status == "running"
+
+def test_worker_pool_runs_offline_jobs_until_idle(tmp_path):
+    db_file = str(tmp_path / "jobs.db")
+    queue = JobQueue(db_file)
+    options = JobOptions(output_dir=str(tmp_path / "papers"))
+    jobs = [queue.submit(topic, options=options) for topic in ("Sparse attention", "Retrieval augmentation")]
+
+    counts = WorkerPool(db_file, workers=2, pipeline_factory=offline_pipeline, poll_interval=0.2).run(until_idle=True)
+
+    assert counts["succeeded"] == 2 and counts["queued"] == counts["running"] == 0
+    for job in jobs:
+        job = queue.get(job.id)
+        assert job.status == "succeeded" and job.filepath
@@ -0,0 +1,38 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from bench_pipeline import HashEmbedder
+from embedding_cache import CachedEmbedder, EmbeddingCache
+from knowledge_ingest import KnowledgeIngestor
+from vector_index import IndexedLanceDb
+
+ROOT = Path(__file__).resolve().parent
+
+def test_cli_help_runs():
+    result = subprocess.run([sys.executable, str(ROOT / "knowledge_ingest.py"), "--help"], cwd=ROOT,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert "Markdown files" in result.stdout
+
+def test_ingest_markdown_and_captions(tmp_path):
+    document = tmp_path / "whole_document.md"
+    document.write_text("# Intro\n\nSparse attention lowers memory use.\n\n# Method\n\nWe prune heads.\n",
+                        encoding="utf-8")
+    captions = tmp_path / "images_with_text.md"
+    captions.write_text("![Image, pages 1, 2](figures/fig_a.png)\n\nA bar chart of memory use.\n\n",
+                        encoding="utf-8")
+
+    vector_db = IndexedLanceDb(table_name="research_knowledge", uri=str(tmp_path / "vectordb"),
+                               embedder=CachedEmbedder(embedder=HashEmbedder(),
+                                                       cache=EmbeddingCache(str(tmp_path / "embeddings"))))
+    ingestor = KnowledgeIngestor(vector_db, index_db_file=str(tmp_path / "ingest.db"))
+
+    first = ingestor.ingest_markdown(str(document))
+    assert first.total_chunks > 0 and first.embedded_chunks == first.total_chunks
+    caption_report = ingestor.ingest_markdown(str(captions))
+    assert caption_report.total_chunks == 1
+
+    # Unchanged files are not embedded again
+    again = ingestor.ingest_markdown(str(document))
+    assert again.embedded_chunks == 0 and again.skipped_chunks == first.total_chunks
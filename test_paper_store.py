@@ -0,0 +1,35 @@
+import json
+
+from paper_store import ArxivPaperStore
+
+def article(arxiv_id):
+    return {"id": arxiv_id, "pdf_url": f"https://arxiv.org/pdf/{arxiv_id}", "title": f"Paper {arxiv_id}"}
+
+def make_store(root):
+    store = ArxivPaperStore(root_dir=str(root))
+    store._get_pdf = lambda url: f"%PDF {url}".encode()
+    return store
+
+def test_concurrent_stores_keep_each_others_entries(tmp_path):
+    first, second = make_store(tmp_path), make_store(tmp_path)
+    first._download(article("2401.00001v1"))
+    second._download(article("2401.00002v1"))
+    first._download(article("2401.00001v2"))
+
+    # A store opened later, or either of the running ones, sees every download
+    for store in (first, second, make_store(tmp_path)):
+        assert store.stats()["papers"] == 3
+        assert store.get("2401.00001").version == "v2"
+        assert store.get("2401.00001v1").version == "v1"
+        assert store.get("2401.00002").metadata["title"] == "Paper 2401.00002v1"
+
+def test_json_manifest_is_imported(tmp_path):
+    legacy = make_store(tmp_path / "legacy")
+    paper = legacy._download(article("2312.01234v3"))
+    (tmp_path / "store").mkdir()
+    (tmp_path / "store" / "objects").symlink_to(tmp_path / "legacy" / "objects")
+    (tmp_path / "store" / "manifest.json").write_text(json.dumps({paper.key: paper.model_dump()}), encoding="utf-8")
+
+    store = make_store(tmp_path / "store")
+    assert store.get("2312.01234") == paper
+    assert not (tmp_path / "store" / "manifest.json").exists()
@@ -0,0 +1,313 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from agno.tools.exa import ExaTools
+from agno.tools.arxiv import ArxivTools
+
+from context_budget import ContextCompactor, record_tool_sources
+from paper_store import ArxivPaperStore
+from rate_limiter import RateLimiter
+from reference_index import ReferenceIndex
+
+class ToolResultCache:
+    """Persistent SQLite cache for search tool results with TTL and size-based LRU eviction"""
+
+    # Tools whose query is free text, so case and spacing differences ask the same question
+    SEARCH_TOOLS = ("exa.search", "arxiv.search")
+
+    def __init__(self, db_file: str = "./research_tool_cache.db", ttl_seconds: float = 7 * 24 * 3600,
+                 max_entries: int = 5000, max_bytes: int = 200 * 1024 * 1024):
+        self.db_file = db_file
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Tools may run in worker threads, so share one connection behind a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS tool_results (
+                key TEXT PRIMARY KEY,
+                tool TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tool_results_last_accessed ON tool_results (last_accessed)")
+        self._conn.commit()
+
+    @classmethod
+    def make_key(cls, tool: str, query: Any, **params: Any) -> str:
+        """Build a cache key from the tool name, query and tool parameters
+
+        Only search queries are normalized: URL paths are case-sensitive and ID lists are answered in order.
+        """
+        if tool in cls.SEARCH_TOOLS and isinstance(query, str):
+            query = re.sub(r"\s+", " ", query.strip().lower())
+
+        payload = {"tool": tool, "query": query, "params": params}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached value, or None if it is missing or expired"""
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM tool_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM tool_results WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE tool_results SET last_accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return value
+
+    def set(self, key: str, tool: str, value: str) -> None:
+        """Store a value and evict least recently used entries beyond the size limits"""
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tool_results (key, tool, value, size, created_at, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, tool, value, len(value.encode("utf-8")), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        count, total_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM tool_results"
+        ).fetchone()
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        expired_before = time.time() - self.ttl_seconds
+        self.evictions += self._conn.execute(
+            "DELETE FROM tool_results WHERE created_at < ?", (expired_before,)
+        ).rowcount
+
+        victims = []
+        count, total_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM tool_results"
+        ).fetchone()
+        for key, size in self._conn.execute("SELECT key, size FROM tool_results ORDER BY last_accessed ASC"):
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            victims.append((key,))
+            count -= 1
+            total_bytes -= size
+
+        self._conn.executemany("DELETE FROM tool_results WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    def get_or_compute(self, tool: str, query: Any, params: Dict[str, Any], compute: Callable[[], str]) -> str:
+        """Return the cached result for this call, running `compute` only on a miss"""
+
+        key = self.make_key(tool, query, **params)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        value = compute()
+        # Tools report failures as "Error: ..." strings; never cache those
+        if isinstance(value, str) and not value.startswith("Error"):
+            self.set(key, tool, value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current cache size"""
+
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM tool_results"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": total_bytes,
+        }
+
+    def clear(self) -> None:
+        """Remove every cached entry"""
+
+        with self._lock:
+            self._conn.execute("DELETE FROM tool_results")
+            self._conn.commit()
+
+class CachedExaTools(ExaTools):
+    """ExaTools that serves repeated searches from a ToolResultCache, optionally compacted to a token budget"""
+
+    def __init__(self, result_cache: ToolResultCache, compactor: Optional[ContextCompactor] = None,
+                 reference_index: Optional[ReferenceIndex] = None, rate_limiter: Optional[RateLimiter] = None,
+                 **kwargs):
+        self.result_cache = result_cache
+        self.compactor = compactor
+        self.reference_index = reference_index
+        self.rate_limiter = rate_limiter
+        super().__init__(**kwargs)
+
+    def _limited(self, func: Callable[..., str], *args: Any) -> str:
+        # Only cache misses reach the provider, so only they count against its rate limit
+        return self.rate_limiter.call(func, *args) if self.rate_limiter else func(*args)
+
+    def _compact(self, output: str, query: str, tool: str) -> str:
+        # Every discovered work is indexed before compaction drops any of them
+        if self.reference_index is not None:
+            self.reference_index.add_tool_results(output)
+        # The cache keeps the full results; compaction depends on the current topic, so it runs per call
+        output = self.compactor.compact_json(output, query, tool) if self.compactor else output
+        record_tool_sources(output, query, tool)
+        return output
+
+    def _search_params(self) -> Dict[str, Any]:
+        return {
+            "include_domains": self.include_domains,
+            "exclude_domains": self.exclude_domains,
+            "text_length_limit": self.text_length_limit,
+            "highlights": self.highlights,
+            "summary": self.summary,
+            "type": self.type,
+            "start_published_date": self.start_published_date,
+            "end_published_date": self.end_published_date,
+        }
+
+    def search_exa(self, query: str, num_results: int = 5, category: Optional[str] = None) -> str:
+        """Use this function to search Exa (a web search engine) for a query.
+
+        Args:
+            query (str): The query to search for.
+            num_results (int): Number of results to return. Defaults to 5.
+            category (Optional[str]): The category to filter search results.
+                Options are "company", "research paper", "news", "pdf", "github",
+                "tweet", "personal site", "linkedin profile", "financial report".
+
+        Returns:
+            str: The search results in JSON format.
+        """
+        params = {
+            **self._search_params(),
+            "num_results": self.num_results or num_results,
+            "category": self.category or category,
+        }
+        return self._compact(self.result_cache.get_or_compute(
+            "exa.search", query, params,
+            lambda: self._limited(super(CachedExaTools, self).search_exa, query, num_results, category)
+        ), query, "search_exa")
+
+    def get_contents(self, urls: list[str]) -> str:
+        """
+        Retrieve detailed content from specific URLs using the Exa API.
+
+        Args:
+            urls (list(str)): A list of URLs from which to fetch content.
+
+        Returns:
+            str: The search results in JSON format.
+        """
+        params = {"text_length_limit": self.text_length_limit, "highlights": self.highlights}
+        return self._compact(self.result_cache.get_or_compute(
+            "exa.get_contents", urls, params, lambda: self._limited(super(CachedExaTools, self).get_contents, urls)
+        ), "", "get_contents")
+
+    def find_similar(self, url: str, num_results: int = 5) -> str:
+        """
+        Find similar links to a given URL using the Exa API.
+
+        Args:
+            url (str): The URL for which to find similar links.
+            num_results (int, optional): The number of similar links to return. Defaults to 5.
+
+        Returns:
+            str: The search results in JSON format.
+        """
+        params = {**self._search_params(), "num_results": self.num_results or num_results}
+        return self._compact(self.result_cache.get_or_compute(
+            "exa.find_similar", url, params,
+            lambda: self._limited(super(CachedExaTools, self).find_similar, url, num_results)
+        ), "", "find_similar")
+
+class CachedArxivTools(ArxivTools):
+    """ArxivTools that serves repeated searches from a ToolResultCache and PDFs from an ArxivPaperStore"""
+
+    def __init__(self, result_cache: ToolResultCache, paper_store: Optional[ArxivPaperStore] = None,
+                 compactor: Optional[ContextCompactor] = None, reference_index: Optional[ReferenceIndex] = None,
+                 rate_limiter: Optional[RateLimiter] = None, **kwargs):
+        self.result_cache = result_cache
+        self.paper_store = paper_store
+        self.compactor = compactor
+        self.reference_index = reference_index
+        self.rate_limiter = rate_limiter
+        super().__init__(**kwargs)
+
+    def _limited(self, func: Callable[..., Any], *args: Any) -> Any:
+        return self.rate_limiter.call(func, *args) if self.rate_limiter else func(*args)
+
+    def _compact(self, output: str, query: str, tool: str) -> str:
+        if self.reference_index is not None:
+            self.reference_index.add_tool_results(output)
+        output = self.compactor.compact_json(output, query, tool) if self.compactor else output
+        record_tool_sources(output, query, tool)
+        return output
+
+    def search_arxiv_and_return_articles(self, query: str, num_articles: int = 10) -> str:
+        """Use this function to search arXiv for a query and return the top articles.
+
+        Args:
+            query (str): The query to search arXiv for.
+            num_articles (int, optional): The number of articles to return. Defaults to 10.
+        Returns:
+            str: A JSON of the articles with title, id, authors, pdf_url and summary.
+        """
+        return self._compact(self.result_cache.get_or_compute(
+            "arxiv.search", query, {"num_articles": num_articles},
+            lambda: self._limited(super(CachedArxivTools, self).search_arxiv_and_return_articles, query, num_articles)
+        ), query, "search_arxiv_and_return_articles")
+
+    def read_arxiv_papers(self, id_list: List[str], pages_to_read: Optional[int] = None) -> str:
+        """Use this function to read a list of arxiv papers and return the content.
+
+        Args:
+            id_list (list, str): The list of `id` of the papers to add to the knowledge base.
+                    Should be of the format: ["2103.03404v1", "2103.03404v2"]
+            pages_to_read (int, optional): The number of pages to read from the paper.
+                    None means read all pages. Defaults to None.
+        Returns:
+            str: JSON of the papers.
+        """
+        if self.paper_store is not None:
+            # The store already skips known downloads and caches extracted text on disk
+            return self._compact(
+                json.dumps(self.paper_store.read_papers(self.client, id_list, pages_to_read, self.rate_limiter), indent=4),
+                "", "read_arxiv_papers"
+            )
+
+        return self._compact(self.result_cache.get_or_compute(
+            "arxiv.read", id_list, {"pages_to_read": pages_to_read},
+            lambda: self._limited(super(CachedArxivTools, self).read_arxiv_papers, id_list, pages_to_read)
+        ), "", "read_arxiv_papers")
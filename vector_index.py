@@ -0,0 +1,203 @@
+import argparse
+import json
+import math
+from typing import Any, Dict, List, Optional
+
+from agno.knowledge.document import Document
+from agno.utils.log import logger
+from agno.vectordb.distance import Distance
+from agno.vectordb.lancedb import LanceDb
+from lancedb.rerankers import RRFReranker
+
+from embedding_cache import CachedEmbedder
+
+DISTANCE_METRICS = {Distance.cosine: "cosine", Distance.l2: "l2", Distance.max_inner_product: "dot"}
+VECTOR_INDEX_TYPES = ("IVF_PQ", "IVF_HNSW_SQ")
+FTS_COLUMN = "payload"
+
+
+def num_sub_vectors(dimensions: int) -> int:
+    """PQ sub-vectors of 8 dimensions each; 16-dim sub-vectors lose too much recall for refinement to recover"""
+
+    for width in (8, 4):
+        if dimensions % width == 0:
+            return dimensions // width
+    return 1
+
+class IndexedLanceDb(LanceDb):
+    """LanceDb with row-count-driven ANN indexes, native full-text search and RRF-reranked hybrid search"""
+
+    def __init__(self, *args, index_type: str = "IVF_HNSW_SQ", index_threshold: int = 50000, rebuild_growth: float = 2.0,
+                 max_unindexed_fraction: float = 0.1, nprobes: int = 20, refine_factor: Optional[int] = 10,
+                 ef: int = 64, hybrid_reranker: Optional[Any] = None, **kwargs):
+        if index_type not in VECTOR_INDEX_TYPES:
+            raise ValueError(f"index_type must be one of {VECTOR_INDEX_TYPES}, got {index_type}")
+        # Lance's native full-text index needs no tantivy install and is kept up to date by optimize()
+        kwargs.setdefault("use_tantivy", False)
+        super().__init__(*args, nprobes=nprobes, **kwargs)
+        self.index_type = index_type
+        self.index_threshold = index_threshold
+        self.rebuild_growth = rebuild_growth
+        self.max_unindexed_fraction = max_unindexed_fraction
+        self.refine_factor = refine_factor
+        self.ef = ef
+        self.hybrid_reranker = hybrid_reranker or RRFReranker()
+        self.metric = DISTANCE_METRICS.get(self.distance, "cosine")
+
+    def _indices(self) -> Dict[str, Any]:
+        return {index.columns[0]: index for index in self.table.list_indices()} if self.table is not None else {}
+
+    def index_status(self) -> Dict[str, Any]:
+        """Row count plus indexed/unindexed rows for the vector and full-text indexes"""
+
+        status: Dict[str, Any] = {"rows": self.table.count_rows() if self.table is not None else 0}
+        for column, index in self._indices().items():
+            stats = self.table.index_stats(index.name)
+            key = "fts" if column == FTS_COLUMN else "vector"
+            status[key] = {
+                "name": index.name,
+                "type": stats.index_type,
+                "indexed_rows": stats.num_indexed_rows,
+                "unindexed_rows": stats.num_unindexed_rows,
+            }
+        return status
+
+    def _build_vector_index(self, rows: int) -> None:
+        options: Dict[str, Any] = {}
+        if self.index_type == "IVF_PQ":
+            # ~sqrt(n) partitions keeps both the centroid scan and each probed partition small
+            options.update(num_partitions=max(1, int(math.sqrt(rows))), num_sub_vectors=num_sub_vectors(self.dimensions))
+        else:
+            # HNSW does the fine-grained search, so partitions only need to bound graph size
+            options.update(num_partitions=max(1, rows // 250000))
+        self.table.create_index(metric=self.metric, vector_column_name=self._vector_col, index_type=self.index_type,
+                                replace=True, **options)
+
+    def ensure_indexes(self) -> Dict[str, str]:
+        """Build, rebuild or incrementally update the indexes this table needs at its current size"""
+
+        actions: Dict[str, str] = {}
+        fresh_columns = set()
+        rows = self.table.count_rows() if self.table is not None else 0
+        if rows == 0:
+            return actions
+
+        indices = self._indices()
+        if FTS_COLUMN not in indices:
+            self.table.create_fts_index(FTS_COLUMN, use_tantivy=False, replace=True)
+            actions["fts"] = "built"
+            fresh_columns.add(FTS_COLUMN)
+        self.fts_index_exists = True
+
+        vector_index = indices.get(self._vector_col)
+        if vector_index is None:
+            # Below the threshold an exact scan is fast enough and has perfect recall
+            if rows >= self.index_threshold:
+                self._build_vector_index(rows)
+                actions["vector"] = f"built {self.index_type}"
+                fresh_columns.add(self._vector_col)
+        else:
+            stats = self.table.index_stats(vector_index.name)
+            # Partitions were sized for the table at build time, so retrain once it has grown enough
+            if stats.index_type != self.index_type or rows >= stats.num_indexed_rows * self.rebuild_growth:
+                self._build_vector_index(rows)
+                actions["vector"] = f"rebuilt {self.index_type}"
+                fresh_columns.add(self._vector_col)
+
+        # New rows are searched by brute force until indexed; fold them in once there are enough of them
+        for column, index in self._indices().items():
+            if column in fresh_columns:
+                continue
+            stats = self.table.index_stats(index.name)
+            if stats.num_unindexed_rows > self.max_unindexed_fraction * max(stats.num_indexed_rows, 1):
+                self.table.optimize()
+                actions["optimize"] = "indexed new rows"
+                break
+        return actions
+
+    def optimize(self) -> None:
+        self.ensure_indexes()
+
+    def insert(self, content_hash: str, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        # The base class embeds one document per request; embed them all in batches first so those become cache hits
+        if isinstance(self.embedder, CachedEmbedder):
+            self.embedder.get_embeddings_batch([document.content for document in documents])
+        super().insert(content_hash, documents, filters)
+
+    def _ensure_fts_index(self) -> None:
+        if not self.fts_index_exists:
+            if FTS_COLUMN not in self._indices():
+                self.table.create_fts_index(FTS_COLUMN, use_tantivy=False, replace=True)
+            self.fts_index_exists = True
+
+    def _tune(self, query: Any, limit: int) -> Any:
+        # These only take effect when a matching index exists; an exact scan ignores them.
+        # HNSW needs ef >= the candidates it returns, which refinement multiplies.
+        candidates = limit * (self.refine_factor or 1)
+        query = query.distance_type(self.metric).nprobes(self.nprobes).ef(max(self.ef, candidates))
+        if self.refine_factor:
+            query = query.refine_factor(self.refine_factor)
+        return query.limit(limit)
+
+    def vector_search(self, query: str, limit: int = 5) -> Optional[List[Dict[str, Any]]]:
+        query_embedding = self.embedder.get_embedding(query)
+        if query_embedding is None or self.table is None:
+            logger.error(f"Cannot run vector search for query: {query}")
+            return None
+
+        return self._tune(self.table.search(query_embedding, vector_column_name=self._vector_col), limit).to_list()
+
+    def hybrid_search(self, query: str, limit: int = 5) -> Optional[List[Dict[str, Any]]]:
+        query_embedding = self.embedder.get_embedding(query)
+        if query_embedding is None or self.table is None:
+            logger.error(f"Cannot run hybrid search for query: {query}")
+            return None
+
+        self._ensure_fts_index()
+        results = self.table.search(query_type="hybrid", vector_column_name=self._vector_col).vector(query_embedding)
+        return self._tune(results.text(query), limit).rerank(self.hybrid_reranker).to_list()
+
+    def keyword_search(self, query: str, limit: int = 5) -> Optional[List[Dict[str, Any]]]:
+        if self.table is None:
+            logger.error("Table not initialized. Please create the table first")
+            return None
+
+        self._ensure_fts_index()
+        return self.table.search(query, query_type="fts").limit(limit).to_list()
+
+    def _build_search_results(self, results: List[Dict[str, Any]]) -> List[Document]:
+        # Rows come back as plain dicts, which skips the pandas round trip of the base class
+        search_results: List[Document] = []
+        for row in results:
+            try:
+                payload = json.loads(row[FTS_COLUMN])
+                search_results.append(Document(
+                    name=payload["name"],
+                    meta_data=payload["meta_data"],
+                    content=payload["content"],
+                    embedder=self.embedder,
+                    embedding=row[self._vector_col],
+                    usage=payload["usage"],
+                    content_id=payload.get("content_id"),
+                ))
+            except Exception as e:
+                logger.error(f"Error building search result: {e}")
+        return search_results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or update the knowledge table's vector and full-text indexes")
+    parser.add_argument("--uri", default="./research_vectordb", help="LanceDB directory")
+    parser.add_argument("--table", default="research_knowledge", help="Table to index")
+    parser.add_argument("--index-type", default="IVF_HNSW_SQ", choices=VECTOR_INDEX_TYPES,
+                        help="ANN index to build (IVF_PQ uses less memory at lower recall)")
+    parser.add_argument("--threshold", type=int, default=50000, help="Rows before an ANN index is built")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    vector_db = IndexedLanceDb(table_name=args.table, uri=args.uri, index_type=args.index_type,
+                               index_threshold=args.threshold)
+    print(f"🗂️  Index actions: {vector_db.ensure_indexes() or 'none needed'}")
+    print(f"📊 {vector_db.index_status()}")